@@ -0,0 +1,32 @@
+"""Composite (country_iso2, swift_code) index
+
+Revision ID: 18c7155511c3
+Revises: ae9e77abcdf0
+Create Date: 2026-10-18 13:02:07.541126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '18c7155511c3'
+down_revision: Union[str, None] = 'ae9e77abcdf0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves both the country filter and ORDER BY swift_code of keyset pagination,
+    # which makes the single-column country_iso2 index redundant.
+    op.create_index('ix_swift_codes_country_iso2_swift_code', 'swift_codes', ['country_iso2', 'swift_code'], unique=False)
+    op.drop_index(op.f('ix_swift_codes_country_iso2'), table_name='swift_codes')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_swift_codes_country_iso2'), 'swift_codes', ['country_iso2'], unique=False)
+    op.drop_index('ix_swift_codes_country_iso2_swift_code', table_name='swift_codes')
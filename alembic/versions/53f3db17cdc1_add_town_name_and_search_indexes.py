@@ -0,0 +1,36 @@
+"""add town_name and search indexes
+
+Revision ID: 53f3db17cdc1
+Revises: 671f50daed1e
+Create Date: 2026-10-18 09:06:22.405207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '53f3db17cdc1'
+down_revision: Union[str, None] = '671f50daed1e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Town filter of the search endpoint, filled in by the next seed
+    op.add_column('swift_codes', sa.Column('town_name', sa.String(length=100), nullable=True))
+    # Trigram index for fuzzy bank name search, pg_trgm ships with the standard contrib package
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_swift_codes_bank_name_trgm', 'swift_codes', ['bank_name'], unique=False, postgresql_using='gin', postgresql_ops={'bank_name': 'gin_trgm_ops'})
+    # The unique index only serves LIKE 'prefix%' under the "C" collation, text_pattern_ops does under any
+    op.create_index('ix_swift_codes_swift_code_pattern', 'swift_codes', ['swift_code'], unique=False, postgresql_ops={'swift_code': 'text_pattern_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_swift_codes_swift_code_pattern', table_name='swift_codes')
+    op.drop_index('ix_swift_codes_bank_name_trgm', table_name='swift_codes')
+    op.drop_column('swift_codes', 'town_name')
@@ -0,0 +1,32 @@
+"""create dataset_versions table
+
+Revision ID: 671f50daed1e
+Revises: 18c7155511c3
+Create Date: 2026-10-18 14:21:53.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '671f50daed1e'
+down_revision: Union[str, None] = '18c7155511c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('dataset_versions',
+    sa.Column('scope', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('scope')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('dataset_versions')
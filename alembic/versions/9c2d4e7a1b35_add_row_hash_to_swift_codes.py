@@ -0,0 +1,42 @@
+"""Add row_hash to swift_codes
+
+Revision ID: 9c2d4e7a1b35
+Revises: 53f3db17cdc1
+Create Date: 2026-10-18 11:02:17.540183
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c2d4e7a1b35'
+down_revision: Union[str, None] = '53f3db17cdc1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same expression as app.models.swift_code.ROW_HASH_SQL at this revision
+ROW_HASH_SQL = (
+    "md5(bank_name || chr(31) || coalesce('+' || address, '-') || chr(31) || country_iso2 || chr(31) || "
+    "country_name || chr(31) || CASE WHEN is_headquarter THEN 't' ELSE 'f' END || chr(31) || "
+    "coalesce('+' || town_name, '-'))"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Backfilled for every existing row while the column is added (one table rewrite),
+    # then kept in sync by Postgres on every INSERT/UPDATE/COPY.
+    op.add_column('swift_codes', sa.Column(
+        'row_hash',
+        sa.String(length=32),
+        sa.Computed(ROW_HASH_SQL, persisted=True),
+        nullable=False
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('swift_codes', 'row_hash')
@@ -0,0 +1,37 @@
+"""Add bank_prefix to swift_codes
+
+Revision ID: ae9e77abcdf0
+Revises: 65aed48f204f
+Create Date: 2026-10-18 10:12:41.318902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ae9e77abcdf0'
+down_revision: Union[str, None] = '65aed48f204f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A stored generated column is backfilled by Postgres for every existing row
+    # while the column is added, and kept in sync on every later INSERT/UPDATE/COPY.
+    op.add_column('swift_codes', sa.Column(
+        'bank_prefix',
+        sa.String(length=8),
+        sa.Computed('substr(swift_code, 1, 8)', persisted=True),
+        nullable=False
+    ))
+    op.create_index(op.f('ix_swift_codes_bank_prefix'), 'swift_codes', ['bank_prefix'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_swift_codes_bank_prefix'), table_name='swift_codes')
+    op.drop_column('swift_codes', 'bank_prefix')
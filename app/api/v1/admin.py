@@ -0,0 +1,44 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import ORJSONResponse
+
+from app.core.config import settings
+from app.core.database import ReadConnection, get_read_db
+from app.core.metrics import InstrumentedRoute
+from app.ingestion.reload import reload_job
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Admin endpoints need X-Admin-Token to match ADMIN_TOKEN, and are disabled while it is empty.
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin endpoints are disabled.")
+
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token.")
+
+
+@router.post("/reload", dependencies=[Depends(require_admin)])
+async def start_reload(db: ReadConnection = Depends(get_read_db)) -> ORJSONResponse:
+    """
+    Starts a full reload of swift_codes from INPUT_SOURCE through a shadow table, in the background.
+    Poll GET /v1/admin/reload for its progress.
+    """
+    # The engine behind the read dependency, so the reload targets the database the API serves
+    if not await reload_job.start(db.bind):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A reload is already running.")
+
+    return ORJSONResponse(status_code=status.HTTP_202_ACCEPTED, content=reload_job.progress.as_dict())
+
+
+@router.get("/reload", dependencies=[Depends(require_admin)])
+async def get_reload_progress() -> ORJSONResponse:
+    """
+    Progress of the current or last reload of this process.
+    """
+    return ORJSONResponse(content=reload_job.progress.as_dict())
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from app.core.metrics import InstrumentedRoute
+from app.services.cache import response_cache
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+
+@router.get("/stats", response_model=dict)
+async def get_cache_stats():
+    """
+    Hit / miss counters of this process' response cache (see RESPONSE_CACHE_BACKEND).
+    """
+    return response_cache.stats()
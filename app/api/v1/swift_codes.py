@@ -1,155 +1,489 @@
-import re
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Tuple
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.exc import IntegrityError
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import ReadConnection, get_db, get_read_db
+from app.core.metrics import InstrumentedRoute
+from app.core.replicas import fill_from_primary, get_replica_db, pin_reads_to_primary, reads_primary
 from app.models.swift_code import SwiftCode
+from app.services.cache import code_key, country_key, invalidation_keys, response_cache
+from app.services.coalescer import swift_code_loader
+from app.services.serialization import branch_dict, country_dict, full_branch_dict, swift_code_dict
+from app.services.snapshot import snapshot
+from app.services.swift_code_reads import (
+    country_codes_query,
+    find_code,
+    find_codes,
+    find_country_codes,
+    search_codes
+)
+from app.services.swift_code_writes import delete_codes, entry_error, insert_entries, parse_entry, to_row
+from app.services.versioning import bump_version, etag_matches, get_version, make_etag
 from app.schemas.swift_code import (
-    BranchSwiftCodeResponse,
-    FullBranchSwiftCodeResponse,
-    HeadquarterSwiftCodeResponse,
     SwiftCodeCreate,
-    CountrySwiftCodesResponse
+    CountrySwiftCodesResponse,
+    SwiftCodeLookupRequest,
+    SwiftCodeLookupResponse,
+    SwiftCodeSearchResponse,
+    SwiftCodeBulkCreate,
+    SwiftCodeBulkDelete,
+    BulkItemResult,
+    BulkOperationResponse
 )
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
+
+# Rows fetched per round trip of the server-side cursor used by NDJSON streaming
+STREAM_BATCH_SIZE = 500
+
+
+async def current_etag(db: ReadConnection) -> str:
+    """
+    ETag of the data the read endpoints would serve right now.
+    Read it before the data: a write in between only makes the ETag older, never wrongly matching.
+    """
+    version = snapshot.version if snapshot.loaded else await get_version(db)
+    return make_etag(version)
+
+
+def cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": settings.CACHE_CONTROL}
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    Returns a 304 response if the client's If-None-Match already matches the current ETag.
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
+    return None
+
+
+async def versioned(db: ReadConnection, fetch: Callable[[], Awaitable[Optional[dict]]]) -> Optional[Tuple[str, dict]]:
+    """
+    Reads the current ETag, then the body. Returns both, or None if there's nothing to serve.
+    """
+    etag = await current_etag(db)
+    content = await fetch()
+    return None if content is None else (etag, content)
+
+
+def uses_cache(request: Request, db: ReadConnection) -> bool:
+    """
+    Whether the response cache serves a GET request. Clients reading their own writes (see
+    app.core.replicas) bypass it entirely, the others fill it from the primary, never from a replica.
+    """
+    if not response_cache.enabled or reads_primary(request):
+        return False
+    fill_from_primary(db)
+    return True
+
+
+async def cached_response(
+    request: Request,
+    key: str,
+    load: Callable[[], Awaitable[Optional[Tuple[str, dict]]]],
+    not_found_detail: str
+) -> Response:
+    """
+    Serves a GET response through the response cache. The body is cached together with its ETag,
+    so a hit, including a 304, doesn't touch the database.
+    """
+    async def load_serialized():
+        loaded = await load()
+        return None if loaded is None else (loaded[0], orjson.dumps(loaded[1]))
+
+    cached = await response_cache.get_or_load(key, load_serialized)
+    if cached is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found_detail)
+
+    etag, body = cached
+    if (response := not_modified(request, etag)) is not None:
+        return response
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag))
+
+
+@router.post("/lookup", response_model=SwiftCodeLookupResponse)
+async def lookup_swift_codes(lookup: SwiftCodeLookupRequest, db: ReadConnection = Depends(get_read_db)) -> ORJSONResponse:
+    """
+    Retrieve many SWIFT codes in one request, each one shaped like GET /{swift_code}.
+    Codes that don't exist are listed in notFound instead of failing the whole request.
+    """
+
+    # Uppercase & de-duplicated, keeping the request order
+    codes = list(dict.fromkeys(code.strip().upper() for code in lookup.swiftCodes))
+
+    if snapshot.loaded:
+        found = {
+            code: swift_code_dict(record, snapshot.branches(code) if code.endswith("XXX") else ())
+            for code in codes if (record := snapshot.get(code)) is not None
+        }
+    else:
+        found = await find_codes(db, codes)
+
+    return ORJSONResponse(content={
+        "swiftCodes": [found[code] for code in codes if code in found],
+        "notFound": [code for code in codes if code not in found],
+    })
+
+
+# Declared before /{swift_code}, which would otherwise capture "search"
+@router.get("/search", response_model=SwiftCodeSearchResponse)
+async def search_swift_codes(
+    q: Optional[str] = Query(None, description="Bank name, matched fuzzily (typos & partial words)"),
+    code: Optional[str] = Query(None, description="SWIFT code prefix, for autocomplete"),
+    country: Optional[str] = Query(None, description="Country ISO2 code filter"),
+    town: Optional[str] = Query(None, description="Town name filter"),
+    limit: int = Query(20, ge=1, description="Maximum number of results"),
+    db: ReadConnection = Depends(get_read_db)
+) -> ORJSONResponse:
+    """
+    Search SWIFT codes by bank name and / or SWIFT code prefix, optionally within a country and town.
+    Results are ordered by bank name similarity (when q is given), then by SWIFT code.
+    """
+    q = q.strip() if q else None
+    code = code.strip().upper() if code else None
+    if not q and not code:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide a bank name (q) or a SWIFT code prefix (code) to search for."
+        )
+
+    # Alphanumeric only, so the prefix can't carry LIKE wildcards
+    if code and not (code.isascii() and code.isalnum() and len(code) <= 11):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="code must be up to 11 letters and digits."
+        )
+
+    if limit > settings.SEARCH_MAX_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"limit must not exceed {settings.SEARCH_MAX_LIMIT}."
+        )
+
+    records = await search_codes(
+        db,
+        bank_name=q,
+        code_prefix=code,
+        country_iso2=country.strip().upper() if country else None,
+        town_name=town.strip().upper() if town else None,
+        limit=limit,
+    )
+    return ORJSONResponse(content={"swiftCodes": [full_branch_dict(record) for record in records]})
+
 
 @router.get("/{swift_code}")
-async def get_swift_code(swift_code: str, db: AsyncSession = Depends(get_db)) -> JSONResponse:
+async def get_swift_code(swift_code: str, request: Request, db: ReadConnection = Depends(get_replica_db)) -> ORJSONResponse:
     """
     Retrieve details of a single SWIFT code. If the code represents a headquarters (ends with "XXX"),
     include a list of SWIFT codes that share the first 8 characters (branches).
+    Supports conditional requests, a matching If-None-Match returns 304 without querying the code.
+    With COALESCE_LOOKUPS, concurrent requests are resolved together in one query (see SwiftCodeLoader),
+    otherwise the code is read from a replica when DATABASE_REPLICA_URLS is set.
     """
 
     # Using uppercase for safety
-    query = select(SwiftCode).where(SwiftCode.swift_code == swift_code.upper())
-    result = await db.execute(query)
-    record = result.scalar_one_or_none()
+    swift_code = swift_code.upper()
+    coalesce = swift_code_loader.enabled and not snapshot.loaded
 
-    if not record:
+    async def load() -> Optional[Tuple[str, dict]]:
+        if coalesce:
+            return await swift_code_loader.load(swift_code)
+        return await versioned(db, lambda: fetch_swift_code(db, swift_code))
+
+    if uses_cache(request, db):
+        return await cached_response(request, code_key(swift_code), load, "Swift code not found")
+
+    if coalesce:
+        # Revalidations get their 304 before the batch fetches the row, only they pay for the version read
+        if request.headers.get("if-none-match"):
+            if (response := not_modified(request, await current_etag(db))) is not None:
+                return response
+        loaded = await load()
+    else:
+        etag = await current_etag(db)
+        if (response := not_modified(request, etag)) is not None:
+            return response
+        content = await fetch_swift_code(db, swift_code)
+        loaded = None if content is None else (etag, content)
+
+    if loaded is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Swift code not found")
 
-    # Headquarter Logic
-    if record.swift_code.endswith("XXX"):
-        head_prefix = record.swift_code[:8]
-        
-        branch_query = select(SwiftCode).where(
-            SwiftCode.swift_code.startswith(head_prefix),
-            SwiftCode.swift_code != record.swift_code
+    etag, content = loaded
+    if (response := not_modified(request, etag)) is not None:
+        return response
+    return ORJSONResponse(content=content, headers=cache_headers(etag))
+
+
+async def fetch_swift_code(db: ReadConnection, swift_code: str) -> Optional[dict]:
+    """
+    Body of GET /{swift_code} for an uppercased code, None if it doesn't exist.
+    """
+    if snapshot.loaded:
+        record = snapshot.get(swift_code)
+        if record is None:
+            return None
+        return swift_code_dict(record, snapshot.branches(swift_code) if swift_code.endswith("XXX") else [])
+
+    return await find_code(db, swift_code)
+
+
+@router.get("/country/{country_iso2}", response_model=CountrySwiftCodesResponse, response_model_by_alias=False)
+async def get_swift_codes_by_country(
+    country_iso2: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, description="Page size, enables keyset pagination"),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
+    db: ReadConnection = Depends(get_replica_db)
+):
+    """
+    Retrieve all SWIFT codes for a given country (both headquarters and branches), ordered by SWIFT code.
+
+    With `limit`, results are paginated: pass the returned nextCursor as `cursor` to get the next page.
+    With an `Accept: application/x-ndjson` header, every code is streamed as its own JSON line instead.
+    JSON responses support conditional requests, a matching If-None-Match returns 304 without querying.
+    Read from a replica when DATABASE_REPLICA_URLS is set.
+    """
+    country_iso2 = country_iso2.upper()
+
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return await stream_country_codes(db, country_iso2)
+
+    if limit is not None and limit > settings.COUNTRY_PAGE_MAX_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"limit must not exceed {settings.COUNTRY_PAGE_MAX_LIMIT}."
         )
-        branch_result = await db.execute(branch_query)
-        branch_records = branch_result.scalars().all()
-        
-        # Create branch responses using the model that skips countryName
-        branches = [BranchSwiftCodeResponse.model_validate(branch) for branch in branch_records]
-        
-        base_data = {
-            "address": record.address,
-            "bank_name": record.bank_name,
-            "country_iso2": record.country_iso2,
-            "country_name": record.country_name,
-            "is_headquarter": record.is_headquarter,
-            "swift_code": record.swift_code,
-        }
-        hq_response = HeadquarterSwiftCodeResponse(**base_data, branches=branches)
-        return JSONResponse(content=hq_response.model_dump(by_alias=False))
-    
-    # Branch Logic
-    else:
-        # Using FullBranchSwiftCodeResponse model instead, to include CountryName
-        branch_response = FullBranchSwiftCodeResponse.model_validate(record)
-        return JSONResponse(content=branch_response.model_dump(by_alias=False))
 
+    not_found_detail = "No SWIFT codes found for this country"
+
+    # Only full listings are cached, pages would all need invalidating on every write to the country
+    if limit is None and cursor is None and uses_cache(request, db):
+        return await cached_response(
+            request, country_key(country_iso2),
+            lambda: versioned(db, lambda: fetch_country_codes(db, country_iso2)), not_found_detail
+        )
+
+    etag = await current_etag(db)
+    if (response := not_modified(request, etag)) is not None:
+        return response
+
+    content = await fetch_country_codes(db, country_iso2, limit, cursor)
+    if content is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found_detail)
 
-@router.get("/country/{country_iso2}", response_model=CountrySwiftCodesResponse)
-async def get_swift_codes_by_country(country_iso2: str, db: AsyncSession = Depends(get_db)):
+    # Returning a response directly skips response_model validation, which only documents the shape
+    return ORJSONResponse(content=content, headers=cache_headers(etag))
+
+
+async def fetch_country_codes(
+    db: ReadConnection, country_iso2: str, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> Optional[dict]:
     """
-    Retrieve all SWIFT codes for a given country (both headquarters and branches).
+    Body of GET /country/{country_iso2} (one page of it with limit), None if the country has no codes.
     """
-    query = select(SwiftCode).where(SwiftCode.country_iso2 == country_iso2.upper())
-    result = await db.execute(query)
-    records = result.scalars().all()
+    # One extra row tells whether another page follows
+    fetch_limit = limit + 1 if limit is not None else None
+
+    if snapshot.loaded:
+        records = snapshot.by_country(country_iso2, after=cursor, limit=fetch_limit)
+    else:
+        records = await find_country_codes(db, country_iso2, after=cursor, limit=fetch_limit)
 
     if not records:
+        return None
+
+    next_cursor = None
+    if limit is not None and len(records) > limit:
+        records = records[:limit]
+        next_cursor = records[-1].swift_code
+
+    return country_dict(country_iso2, records, next_cursor)
+
+
+async def stream_country_codes(db: ReadConnection, country_iso2: str) -> StreamingResponse:
+    """
+    Streams a country's codes as NDJSON, one BranchSwiftCodeResponse per line.
+
+    Rows are read through a server-side cursor in batches of STREAM_BATCH_SIZE on a dedicated
+    connection, so memory and time-to-first-byte don't depend on the country size.
+    """
+    async def lines() -> AsyncIterator[bytes]:
+        if snapshot.loaded:
+            for record in snapshot.by_country(country_iso2):
+                yield orjson.dumps(branch_dict(record)) + b"\n"
+            return
+
+        query = country_codes_query(country_iso2).execution_options(yield_per=STREAM_BATCH_SIZE)
+        # The request connection may be closed before the body is sent, open another one the same way
+        conn = await db.connect()
+        try:
+            result = await conn.stream(query)
+            async for row in result:
+                yield orjson.dumps(branch_dict(row)) + b"\n"
+        finally:
+            await conn.close()
+
+    body = lines()
+    first_line = await anext(body, None)
+    if first_line is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No SWIFT codes found for this country"
         )
 
-    country_name = records[0].country_name  # Assuming DB consistency (potential edge case, refer to README)
-    swift_codes = [BranchSwiftCodeResponse.model_validate(record) for record in records]
+    async def content() -> AsyncIterator[bytes]:
+        yield first_line
+        async for line in body:
+            yield line
 
-    return CountrySwiftCodesResponse(
-        countryISO2=country_iso2.upper(),
-        countryName=country_name,
-        swiftCodes=swift_codes
-    )
+    return StreamingResponse(content(), media_type="application/x-ndjson")
 
 
-@router.post("", response_model=dict)
+@router.post("", response_model=dict, dependencies=[Depends(pin_reads_to_primary)])
 async def create_swift_code(entry: SwiftCodeCreate, db: AsyncSession = Depends(get_db)):
     """
     Add a new SWIFT code entry to the database.
     """
 
-    # Validation & Exception logic could be modulated further for code clarity & maintenance (refer to README)
-    swift = entry.swiftCode
-    if swift != swift.upper():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="A SWIFT code must be uppercase.")
+    error = entry_error(entry)
+    if error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
-    if entry.isHeadquarter and not swift.endswith("XXX"):
+    try:
+        created = await insert_entries(db, [entry])
+        version = await bump_version(db) if created else None
+        await db.commit()
+
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=f"Failed to create record: {str(e)}")
+
+    # ON CONFLICT DO NOTHING returned no row, the code already exists
+    if entry.swiftCode not in created:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="For a headquarter entry, the swiftCode must end with 'XXX'."
+            detail="A SWIFT code with this value already exists."
         )
-    
-    if not re.fullmatch(r'[A-Z0-9]+', swift):
+
+    if snapshot.loaded:
+        snapshot.add(SwiftCode(**to_row(entry)))
+        snapshot.advance(version)
+    await response_cache.invalidate(invalidation_keys(entry.swiftCode, entry.countryISO2.upper()))
+    return {"message": f"Swift code created successfully with ID {created[entry.swiftCode]}"}
+
+
+def raw_swift_code(item: Any) -> str:
+    """
+    swiftCode of a raw bulk entry for its result, whatever the entry's shape.
+    """
+    code = item.get("swiftCode") if isinstance(item, dict) else None
+    return "" if code is None else str(code)
+
+
+@router.post("/bulk", response_model=BulkOperationResponse, dependencies=[Depends(pin_reads_to_primary)])
+async def bulk_create_swift_codes(bulk: SwiftCodeBulkCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Add many SWIFT code entries in a single transaction.
+    Every entry gets its own status: created, duplicate (already stored or repeated in the request) or invalid.
+    """
+    if len(bulk.swiftCodes) > settings.BULK_MAX_BATCH_SIZE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="SWIFT code must contain only uppercase letters and digits (A-Z, 0-9)."
+            detail=f"At most {settings.BULK_MAX_BATCH_SIZE} SWIFT codes can be written at once."
         )
 
-    new_record = SwiftCode(
-        swift_code=entry.swiftCode,
-        bank_name=entry.bankName,
-        address=entry.address,
-        country_iso2=entry.countryISO2.upper(),
-        country_name=entry.countryName.upper(),
-        is_headquarter=entry.isHeadquarter
-    )
-    db.add(new_record)
+    parsed = [parse_entry(item) for item in bulk.swiftCodes]
+    first_valid = {}
+    for entry, error in parsed:
+        if error is None:
+            first_valid.setdefault(entry.swiftCode, entry)
 
     try:
+        created = await insert_entries(db, list(first_valid.values()))
+        version = await bump_version(db) if created else None
         await db.commit()
-        await db.refresh(new_record)
-        return {"message": f"Swift code created successfully with ID {new_record.id}"}
-    
-    except IntegrityError as e:
+
+    except Exception as e:
         await db.rollback()
-        if "duplicate key value violates unique constraint" in str(e):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=f"Failed to create records: {str(e)}")
+
+    results, stale_keys = [], []
+    for item, (entry, error) in zip(bulk.swiftCodes, parsed):
+        if error:
+            results.append(BulkItemResult(swiftCode=raw_swift_code(item), status="invalid", detail=error))
+        elif first_valid[entry.swiftCode] is entry and entry.swiftCode in created:
+            results.append(BulkItemResult(swiftCode=entry.swiftCode, status="created"))
+            if snapshot.loaded:
+                snapshot.add(SwiftCode(**to_row(entry)))
+                snapshot.advance(version)
+            stale_keys += invalidation_keys(entry.swiftCode, entry.countryISO2.upper())
+        else:
+            results.append(BulkItemResult(
+                swiftCode=entry.swiftCode,
+                status="duplicate",
                 detail="A SWIFT code with this value already exists."
-            )
-        
-        # Fallback, in case it's a different IntegrityError
+            ))
+
+    await response_cache.invalidate(stale_keys)
+    return BulkOperationResponse.from_results(results)
+
+
+@router.delete("/bulk", response_model=BulkOperationResponse, dependencies=[Depends(pin_reads_to_primary)])
+async def bulk_delete_swift_codes(bulk: SwiftCodeBulkDelete, db: AsyncSession = Depends(get_db)):
+    """
+    DELETE many SWIFT code entries in a single transaction.
+    Every code gets its own status: deleted or not_found.
+    """
+    if len(bulk.swiftCodes) > settings.BULK_MAX_BATCH_SIZE:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create record: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BULK_MAX_BATCH_SIZE} SWIFT codes can be deleted at once."
         )
 
+    # None marks an item that isn't a code
+    codes = [code.strip().upper() if isinstance(code, str) else None for code in bulk.swiftCodes]
+    try:
+        deleted = await delete_codes(db, list(dict.fromkeys(code for code in codes if code is not None)))
+        version = await bump_version(db) if deleted else None
+        await db.commit()
+
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=f"Failed to create record: {str(e)}")
+                            detail=f"Failed to delete records: {str(e)}")
+
+    if snapshot.loaded and deleted:
+        for code in deleted:
+            snapshot.discard(code)
+        snapshot.advance(version)
+    await response_cache.invalidate(
+        key for code, country_iso2 in deleted.items() for key in invalidation_keys(code, country_iso2)
+    )
+
+    # A code repeated in the request is only deleted once
+    results, seen = [], set()
+    for item, code in zip(bulk.swiftCodes, codes):
+        if code is None:
+            results.append(BulkItemResult(swiftCode=str(item), status="invalid", detail="A SWIFT code must be a string."))
+            continue
+        found = code in deleted and code not in seen
+        seen.add(code)
+        results.append(BulkItemResult(swiftCode=code, status="deleted" if found else "not_found"))
+
+    return BulkOperationResponse.from_results(results)
 
 
-@router.delete("/{swift_code}", response_model=dict)
+@router.delete("/{swift_code}", response_model=dict, dependencies=[Depends(pin_reads_to_primary)])
 async def delete_swift_code(swift_code: str, db: AsyncSession = Depends(get_db)):
     """
     DELETE a SWIFT code entry from database.
@@ -165,7 +499,12 @@ async def delete_swift_code(swift_code: str, db: AsyncSession = Depends(get_db))
     await db.delete(record)
 
     try:
+        version = await bump_version(db)
         await db.commit()
+        if snapshot.loaded:
+            snapshot.discard(record.swift_code)
+            snapshot.advance(version)
+        await response_cache.invalidate(invalidation_keys(record.swift_code, record.country_iso2))
         return {"message": f"Swift code {swift_code} deleted successfully"}
     
     except Exception as e:
@@ -7,9 +7,101 @@ class Settings(BaseSettings):
     XLSX_FILE_PATH: str = "data/swift_codes.xlsx"
     CSV_FILE_PATH: str = "data/swift_codes.csv"
     GOOGLE_SHEET_URL: str
+    # The sheet is downloaded here as CSV, with its ETag / Last-Modified next to it: an unchanged sheet answers 304
+    # and the seed skips it. Timeouts in seconds (read: between two chunks), connection errors, timeouts and
+    # 429 / 5xx answers are retried GOOGLE_SHEET_FETCH_ATTEMPTS times, GOOGLE_SHEET_RETRY_BACKOFF doubling every time
+    GOOGLE_SHEET_CACHE_PATH: str = ".cache/google_sheet.csv"
+    GOOGLE_SHEET_CONNECT_TIMEOUT: float = 5.0
+    GOOGLE_SHEET_READ_TIMEOUT: float = 30.0
+    GOOGLE_SHEET_FETCH_ATTEMPTS: int = 3
+    GOOGLE_SHEET_RETRY_BACKOFF: float = 1.0
+    # The API polls the sheet every N seconds and applies its changes with a diff seed (0 = off, needs INPUT_SOURCE=google)
+    GOOGLE_SHEET_REFRESH_INTERVAL: float = 0
+    # Comma-separated xlsx / csv files or globs, replaces INPUT_SOURCE when set: every file & workbook sheet is parsed
+    # in its own process (INGEST_WORKERS, 0 = one per core), a code differing between sources is an 'error' or the 'last' wins
+    INPUT_FILES: str = ""
+    INGEST_WORKERS: int = 0
+    INGEST_CONFLICTS: str = "error"
+    # pandas engine of xlsx sources: 'openpyxl' or 'calamine' (read-only, several times faster)
+    XLSX_ENGINE: str = "openpyxl"
+    # Parsed xlsx / csv sources are cached here as Arrow files, keyed by content hash (empty = no cache)
+    PARSE_CACHE_DIR: str = ".cache/parsed"
+    # Bulk seeding: 'copy' (COPY into a staging table + one upsert) or 'insert' (batched multi-row upserts)
+    SEED_METHOD: str = "copy"
+    SEED_BATCH_SIZE: int = 4000
+    # When set, invalid rows are written to this CSV file instead of aborting the seed
+    SEED_QUARANTINE_PATH: str = ""
+    # Stream the source in chunks of this many rows (0 = load it at once), with at most SEED_QUEUE_SIZE chunks in flight
+    SEED_CHUNK_SIZE: int = 0
+    SEED_QUEUE_SIZE: int = 2
+    # 'upsert' (insert & update, never delete) or 'diff' (row hash comparison, applies inserts, updates & deletes)
+    SEED_MODE: str = "upsert"
+    # Compute and print the changes without writing anything
+    SEED_DRY_RUN: bool = False
+    # Full reload table swap: wait at most this long for the table lock, retry up to RELOAD_SWAP_ATTEMPTS times
+    RELOAD_LOCK_TIMEOUT_MS: int = 2000
+    RELOAD_SWAP_ATTEMPTS: int = 5
     TEST_DATABASE_URL: str
     DEV_MODE: str
 
+    # Database engine: log every statement (development only) and connection pool sizing
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Test connections with a lightweight ping on checkout, recycle them after this many seconds (-1 = never)
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    # Prepared statements cached per asyncpg connection, set 0 behind pgbouncer in transaction mode
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    # Comma-separated read replica URLs for GET /v1/swift-codes/{swift_code} and /country/{country_iso2}: round-robin
+    # over the replicas that answer a ping every REPLICA_HEALTH_CHECK_INTERVAL seconds, the primary when none does
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_HEALTH_CHECK_INTERVAL: float = 5.0
+    # A client's reads go to the primary for this many seconds after its writes (read_primary_until cookie, 0 = off),
+    # X-Read-Consistency: primary does it for a single request
+    READ_YOUR_WRITES_WINDOW: float = 5.0
+
+    # Serve GET endpoints from an in-process copy of swift_codes loaded at startup
+    SNAPSHOT_ENABLED: bool = False
+    # Seconds between checks of dataset_versions picking up changes of other workers or `swift-ingest` commands
+    # (0 = only this process's writes): the in-process copy is reloaded, or one worker re-exports SNAPSHOT_FILE
+    SNAPSHOT_REFRESH_INTERVAL: float = 5.0
+    # With SNAPSHOT_ENABLED, serve a compact snapshot file memory-mapped by every worker instead of a copy per process
+    # (exported from the database at startup when missing, and by `swift-ingest export-snapshot` / seeds / reloads),
+    # workers check at most every SNAPSHOT_FILE_CHECK_INTERVAL seconds whether a new export replaced it
+    SNAPSHOT_FILE: str = ""
+    SNAPSHOT_FILE_CHECK_INTERVAL: float = 1.0
+    # Maximum number of codes accepted by POST /v1/swift-codes/lookup
+    LOOKUP_MAX_BATCH_SIZE: int = 1000
+    # Maximum number of entries accepted by the bulk create / delete endpoints
+    BULK_MAX_BATCH_SIZE: int = 5000
+    # Maximum page size of GET /v1/swift-codes/country/{iso2}?limit=
+    COUNTRY_PAGE_MAX_LIMIT: int = 1000
+    # Maximum number of results of GET /v1/swift-codes/search?limit=
+    SEARCH_MAX_LIMIT: int = 100
+    # Cache-Control sent with ETag'd GET responses, no-cache lets clients keep copies but revalidate (cheap 304s)
+    CACHE_CONTROL: str = "public, no-cache"
+    # Server-side cache of GET responses: '' (off), 'memory' (LRU per process) or 'redis' (shared by all replicas)
+    RESPONSE_CACHE_BACKEND: str = ""
+    # Seconds an entry lives, also bounds staleness after writes made outside the API (seeding)
+    RESPONSE_CACHE_TTL: int = 60
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    RESPONSE_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    # Resolve concurrent GET /v1/swift-codes/{code} requests in batches: one query per COALESCE_WINDOW_MS
+    # or COALESCE_MAX_BATCH distinct codes, whichever comes first
+    COALESCE_LOOKUPS: bool = False
+    COALESCE_WINDOW_MS: float = 1.0
+    COALESCE_MAX_BATCH: int = 100
+    # Prometheus metrics at GET /metrics: per-route latency & in-flight requests, SQL statements, pool, seeding stages
+    METRICS_ENABLED: bool = True
+    # Token expected in the X-Admin-Token header by /v1/admin endpoints, which are disabled while empty
+    ADMIN_TOKEN: str = ""
+    # Profile single requests sent with X-Profile: store|return and X-Admin-Token (see app.core.profiling),
+    # stored profiles go to PROFILING_DIR, the sampling interval is in milliseconds
+    PROFILING_ENABLED: bool = False
+    PROFILING_DIR: str = ".cache/profiles"
+    PROFILING_INTERVAL_MS: float = 1.0
+
     model_config = ConfigDict(
         env_file = ".env",
         extra = "ignore"
@@ -1,14 +1,75 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncConnection, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
-from typing import AsyncGenerator
+from app.core.metrics import InstrumentedPool, instrument_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import AsyncGenerator, Optional
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+
+def make_engine(url: str, primary: bool = True) -> AsyncEngine:
+    """
+    Engine with the pool settings of the app, for the primary or a read replica.
+    """
+    db_engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        # asyncpg prepares every statement, this many stay prepared per connection (0 disables the cache)
+        connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
+        # Same pool, plus checkout timing
+        poolclass=InstrumentedPool if settings.METRICS_ENABLED else AsyncAdaptedQueuePool,
+    )
+    if settings.METRICS_ENABLED:
+        # The pool gauges follow the primary only
+        instrument_engine(db_engine.sync_engine, pool_gauges=primary)
+    return db_engine
+
+
+engine = make_engine(DATABASE_URL)
 SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+class ReadConnection:
+    """
+    Read-only Core access for the GET handlers: statements return plain rows,
+    without a Session, identity map, autoflush or ORM loading.
+
+    The pooled connection is only checked out on the first execute, so requests answered
+    from memory (snapshot, response cache, 304s) never wait on the pool.
+    """
+
+    def __init__(self, bind: AsyncEngine) -> None:
+        self.bind = bind
+        self._conn: Optional[AsyncConnection] = None
+
+    async def execute(self, statement, parameters=None):
+        if self._conn is None:
+            self._conn = await self.connect()
+        return await self._conn.execute(statement, parameters)
+
+    async def connect(self) -> AsyncConnection:
+        return await self.bind.connect()
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            # Nothing to commit, closing rolls the read transaction back and returns the connection
+            await self._conn.close()
+            self._conn = None
+
+
+async def get_read_db() -> AsyncGenerator[ReadConnection, None]:
+    conn = ReadConnection(engine)
+    try:
+        yield conn
+    finally:
+        await conn.close()
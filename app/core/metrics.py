@@ -0,0 +1,175 @@
+"""
+Prometheus metrics of the API and the ingestion pipeline, served at GET /metrics.
+
+Cheap enough to stay on in production: label children are bound once (per route, per statement
+kind), timing is a perf_counter pair, and the pool gauges are plain sets on checkout & checkin.
+Under several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR so /metrics aggregates all of them.
+"""
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+
+from fastapi import Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+# Statements are mostly sub-millisecond, the default buckets start at 5 ms
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+STAGE_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to produce the response of a request (streamed bodies excluded)",
+    ["method", "route"]
+)
+HTTP_REQUESTS = Counter("http_requests_total", "Handled requests", ["method", "route", "status"])
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being handled", ["method", "route"], multiprocess_mode="livesum"
+)
+
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_duration_seconds", "Execution time of SQL statements", ["operation"], buckets=DB_BUCKETS
+)
+DB_STATEMENT_ROWS = Histogram(
+    "db_statement_rows", "Rows returned or affected by SQL statements", ["operation"], buckets=ROW_BUCKETS
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Time to get a pooled connection (waiting for a free one, connecting, pre-ping)",
+    buckets=DB_BUCKETS
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Connections kept by the pool", multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections in use", multiprocess_mode="livesum")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections opened beyond the pool size", multiprocess_mode="livesum")
+
+INGEST_STAGE_SECONDS = Histogram(
+    "ingest_stage_duration_seconds", "Time spent per seeding stage", ["stage"], buckets=STAGE_BUCKETS
+)
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    Route class recording latency, status and in-flight requests per route template (e.g. /v1/swift-codes/{swift_code}),
+    set on the API routers with APIRouter(route_class=InstrumentedRoute).
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if not settings.METRICS_ENABLED:
+            return handler
+
+        methods = ",".join(sorted(self.methods))
+        duration = HTTP_REQUEST_SECONDS.labels(methods, self.path)
+        in_progress = HTTP_IN_PROGRESS.labels(methods, self.path)
+        statuses: Dict[int, Counter] = {}
+
+        async def instrumented_handler(request: Request) -> Response:
+            status = 500
+            in_progress.inc()
+            start = time.perf_counter()
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except RequestValidationError:
+                status = 422
+                raise
+            except Exception as e:
+                # HTTPException and any other exception carrying its status, 500 otherwise
+                status = getattr(e, "status_code", 500)
+                raise
+            finally:
+                duration.observe(time.perf_counter() - start)
+                in_progress.dec()
+                counter = statuses.get(status)
+                if counter is None:
+                    counter = statuses[status] = HTTP_REQUESTS.labels(methods, self.path, str(status))
+                counter.inc()
+
+        return instrumented_handler
+
+
+def statement_operation(statement: str) -> str:
+    """
+    First keyword of a statement (SELECT, INSERT, ...), the label of its metrics.
+    """
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+
+
+def instrument_engine(engine: Engine, pool_gauges: bool = True) -> None:
+    """
+    Records statement durations & row counts of an engine (the sync_engine of an AsyncEngine),
+    and exposes the occupancy of its pool when it is a QueuePool (unless pool_gauges is False).
+    """
+    # Label children by statement text, SQLAlchemy reuses the same compiled strings
+    children: Dict[str, tuple] = {}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info.pop("query_start", time.perf_counter())
+        metrics = children.get(statement)
+        if metrics is None:
+            operation = statement_operation(statement)
+            metrics = (DB_STATEMENT_SECONDS.labels(operation), DB_STATEMENT_ROWS.labels(operation))
+            if len(children) < 1000:
+                children[statement] = metrics
+        metrics[0].observe(elapsed)
+        # -1 when the driver doesn't know (DDL, executemany)
+        if cursor.rowcount >= 0:
+            metrics[1].observe(cursor.rowcount)
+
+    if pool_gauges and isinstance(engine.pool, QueuePool):
+        instrument_pool(engine)
+
+
+def instrument_pool(engine: Engine) -> None:
+    """
+    Keeps the pool gauges up to date on every checkout & checkin. Set values rather than set_function
+    callbacks, which the multiprocess collector (PROMETHEUS_MULTIPROC_DIR) doesn't read.
+    Listening on the engine, not its pool, keeps the gauges working after dispose() replaces the pool.
+    """
+    DB_POOL_SIZE.set(engine.pool.size())
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        DB_POOL_CHECKED_OUT.inc()
+        DB_POOL_OVERFLOW.set(max(engine.pool.overflow(), 0))
+
+    @event.listens_for(engine, "checkin")
+    def checkin(dbapi_connection, connection_record) -> None:
+        DB_POOL_CHECKED_OUT.dec()
+        DB_POOL_OVERFLOW.set(max(engine.pool.overflow(), 0))
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Pool of the app engine timing every checkout, there is no pool event before one.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    """
+    Times one seeding stage (fetch, parse, validate, load...) into ingest_stage_duration_seconds.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        INGEST_STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
@@ -0,0 +1,131 @@
+"""
+Opt-in profiling of single requests with a sampling profiler (pyinstrument), as speedscope JSON.
+
+Only installed when PROFILING_ENABLED is set, so other deployments don't run it at all. Once
+installed, a request is profiled when it carries X-Profile (or ?profile=) and a valid X-Admin-Token:
+    - 'store': the profile is written to PROFILING_DIR, its file name returned in X-Profile-File,
+    - 'return': the speedscope JSON replaces the response body, the original status is in X-Profiled-Status.
+Open the files at https://www.speedscope.app or with the speedscope CLI.
+"""
+import os
+import re
+import secrets
+import time
+import uuid
+from typing import List, Optional
+from urllib.parse import parse_qs
+
+import orjson
+
+from app.core.config import settings
+
+PROFILE_MODES = ("store", "return")
+
+
+def requested_mode(scope: dict) -> Optional[str]:
+    """
+    Profiling mode asked for by the request (header first, then query flag), None for a normal request.
+    """
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value.decode("latin-1").lower() or "store"
+
+    query = scope.get("query_string", b"")
+    if b"profile=" in query:
+        values = parse_qs(query.decode("latin-1")).get("profile")
+        if values:
+            return values[0].lower()
+    return None
+
+
+def admin_token(scope: dict) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"x-admin-token":
+            return value.decode("latin-1")
+    return None
+
+
+def profile_name(scope: dict) -> str:
+    """
+    <time>-<method>-<path>-<random>.speedscope.json, sortable and telling which request it was.
+    """
+    path = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_")[:80] or "root"
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{path}-{uuid.uuid4().hex[:8]}.speedscope.json"
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware, a request without the profile flag costs one scan of its header list.
+    """
+
+    def __init__(self, app, output_dir: str, interval: float) -> None:
+        self.app = app
+        self.output_dir = output_dir
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        mode = requested_mode(scope)
+        if mode is None:
+            return await self.app(scope, receive, send)
+
+        token = admin_token(scope)
+        if not settings.ADMIN_TOKEN or token is None or not secrets.compare_digest(token, settings.ADMIN_TOKEN):
+            return await self.reject(send, 403, "Profiling requires a valid X-Admin-Token.")
+        if mode not in PROFILE_MODES:
+            return await self.reject(send, 400, f"Unsupported profile mode: {mode}, use one of {', '.join(PROFILE_MODES)}.")
+
+        # Deferred import, only profiled requests load the profiler
+        from pyinstrument import Profiler
+        from pyinstrument.renderers import SpeedscopeRenderer
+
+        name = profile_name(scope)
+        messages: List[dict] = []
+
+        async def capture(message: dict) -> None:
+            messages.append(message)
+
+        async def tag(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-file", name.encode())]}
+            await send(message)
+
+        # async_mode 'enabled' only samples the task of this request, not the other requests it interleaves with
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, capture if mode == "return" else tag)
+        finally:
+            profiler.stop()
+
+        profile = profiler.output(SpeedscopeRenderer())
+        if mode == "store":
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(os.path.join(self.output_dir, name), "w") as sink:
+                sink.write(profile)
+            return
+
+        status = next((message["status"] for message in messages if message["type"] == "http.response.start"), 500)
+        body = profile.encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profiled-status", str(status).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def reject(send, status: int, detail: str) -> None:
+        body = orjson.dumps({"detail": detail})
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
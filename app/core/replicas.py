@@ -0,0 +1,206 @@
+"""
+Routing of GET reads to read replicas (DATABASE_REPLICA_URLS), with fallback to the primary.
+
+Reads are spread round-robin over the replicas that answered their last health check. A replica
+whose connection fails is skipped until a check succeeds again, and the primary serves when none is up.
+
+Replicas lag behind the primary, so a client that just wrote would not see its change:
+    - the write endpoints set a read_primary_until cookie, the client's reads go to the primary
+      for READ_YOUR_WRITES_WINDOW seconds,
+    - X-Read-Consistency: primary sends a single read to the primary.
+"""
+import asyncio
+import logging
+import time
+from typing import AsyncGenerator, Dict, List, Optional, Set
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+from app.core.database import ReadConnection, get_read_db, make_engine
+
+READ_PRIMARY_COOKIE = "read_primary_until"
+CONNECT_ERRORS = (OSError, SQLAlchemyError, asyncio.TimeoutError)
+
+logger = logging.getLogger(__name__)
+
+
+def create_replica_engines(urls: str) -> List[AsyncEngine]:
+    """
+    One engine per URL of a comma-separated list.
+    """
+    return [make_engine(url.strip(), primary=False) for url in urls.split(",") if url.strip()]
+
+
+class ReplicaRouter:
+    """
+    Picks the replica of each read and tracks replica health, disabled until configured.
+    """
+
+    def __init__(self) -> None:
+        self.replicas: List[AsyncEngine] = []
+        self.down: Set[AsyncEngine] = set()
+        self.reads: Dict[str, int] = {"replica": 0, "fallback": 0}
+        self._next = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def configure(self, replicas: List[AsyncEngine], check_interval: float) -> None:
+        """
+        Takes over the replica engines (disposed on close) and checks them every check_interval seconds.
+        """
+        self.replicas = replicas
+        self._task = asyncio.create_task(self._check_periodically(check_interval))
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        for replica in self.replicas:
+            await replica.dispose()
+        self.replicas = []
+        self.down.clear()
+        self.reads = {"replica": 0, "fallback": 0}
+        self._task = None
+
+    def candidates(self) -> List[AsyncEngine]:
+        """
+        Healthy replicas, rotated by one on every call.
+        """
+        healthy = [replica for replica in self.replicas if replica not in self.down]
+        if not healthy:
+            return []
+        start = self._next % len(healthy)
+        self._next += 1
+        return healthy[start:] + healthy[:start]
+
+    def mark_down(self, replica: AsyncEngine) -> None:
+        if replica not in self.down:
+            self.down.add(replica)
+            logger.warning("Read replica %s is down, reading from the others or the primary", replica.url)
+
+    def mark_up(self, replica: AsyncEngine) -> None:
+        if replica in self.down:
+            self.down.discard(replica)
+            logger.info("Read replica %s is back up", replica.url)
+
+    async def check(self, timeout: float) -> None:
+        """
+        Pings every replica (SELECT 1 within timeout seconds), marking it up or down.
+        """
+        async def ping(replica: AsyncEngine) -> None:
+            async with replica.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        async def check_one(replica: AsyncEngine) -> None:
+            try:
+                await asyncio.wait_for(ping(replica), timeout)
+            except CONNECT_ERRORS:
+                self.mark_down(replica)
+            else:
+                self.mark_up(replica)
+
+        await asyncio.gather(*(check_one(replica) for replica in self.replicas))
+
+    async def _check_periodically(self, interval: float) -> None:
+        while True:
+            await self.check(timeout=interval)
+            await asyncio.sleep(interval)
+
+
+replica_router = ReplicaRouter()
+
+
+class ReplicaConnection(ReadConnection):
+    """
+    ReadConnection connecting to the first healthy replica that accepts it, to the primary if none does.
+    Only the connection is retried elsewhere, a statement failing on a replica fails the request.
+    """
+
+    def __init__(self, replicas: List[AsyncEngine], primary: AsyncEngine) -> None:
+        super().__init__(replicas[0] if replicas else primary)
+        self.replicas = replicas
+        self.primary = primary
+        self.primary_only = False
+
+    def use_primary(self) -> None:
+        """
+        Reads from the primary instead, for reads that must not lag (response cache fills). Call before the first execute.
+        """
+        self.primary_only = True
+        self.bind = self.primary
+
+    async def connect(self) -> AsyncConnection:
+        if self.primary_only:
+            return await self.primary.connect()
+
+        for replica in self.replicas:
+            try:
+                conn = await replica.connect()
+            except CONNECT_ERRORS:
+                replica_router.mark_down(replica)
+                continue
+            self.bind = replica
+            replica_router.reads["replica"] += 1
+            return conn
+
+        self.bind = self.primary
+        replica_router.reads["fallback"] += 1
+        return await self.primary.connect()
+
+
+def reads_primary(request: Request) -> bool:
+    """
+    Whether the request asked for the primary, explicitly or by a recent write (see pin_reads_to_primary).
+    """
+    if request.headers.get("x-read-consistency", "").lower() == "primary":
+        return True
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def fill_from_primary(db: ReadConnection) -> None:
+    """
+    Sends the reads of db to the primary when it would read from a replica: they fill the response
+    cache, which would keep a lagging replica's answer for the whole TTL.
+    """
+    if isinstance(db, ReplicaConnection):
+        db.use_primary()
+
+
+async def get_replica_db(
+    request: Request, primary: ReadConnection = Depends(get_read_db)
+) -> AsyncGenerator[ReadConnection, None]:
+    """
+    Read connection of the GET endpoints that tolerate replication lag, the primary connection of
+    get_read_db (lazy, unused otherwise) when replicas are off or the client needs its own writes.
+    """
+    if not replica_router.enabled or reads_primary(request):
+        yield primary
+        return
+
+    conn = ReplicaConnection(replica_router.candidates(), primary.bind)
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
+async def pin_reads_to_primary(response: Response) -> None:
+    """
+    Dependency of the write endpoints: the client's next reads go to the primary, which has its write.
+    """
+    if replica_router.enabled and settings.READ_YOUR_WRITES_WINDOW > 0:
+        until = time.time() + settings.READ_YOUR_WRITES_WINDOW
+        response.set_cookie(
+            READ_PRIMARY_COOKIE, f"{until:.3f}", max_age=int(settings.READ_YOUR_WRITES_WINDOW) + 1,
+            httponly=True, samesite="lax"
+        )
@@ -0,0 +1,131 @@
+"""
+swift-ingest: command line entry point of the ingestion pipeline.
+
+Kept apart from the API, so uvicorn workers never import pandas / openpyxl:
+they are only loaded here, once a command actually runs.
+"""
+import argparse
+import asyncio
+from typing import List, Optional
+
+from app.core import database
+from app.core.config import settings
+
+# CLI option -> Settings field it overrides
+SETTING_OVERRIDES = {
+    "source": "INPUT_SOURCE",
+    "files": "INPUT_FILES",
+    "workers": "INGEST_WORKERS",
+    "on_conflict": "INGEST_CONFLICTS",
+    "xlsx_engine": "XLSX_ENGINE",
+    "method": "SEED_METHOD",
+    "batch_size": "SEED_BATCH_SIZE",
+    "chunk_size": "SEED_CHUNK_SIZE",
+    "quarantine": "SEED_QUARANTINE_PATH",
+    "mode": "SEED_MODE",
+    "dry_run": "SEED_DRY_RUN",
+}
+
+
+async def seed(args: argparse.Namespace) -> None:
+    # Deferred import, pulls in pandas & openpyxl
+    from app.ingestion.seed_data import seed_data
+
+    report = await seed_data(database.engine)
+    print(f"Seed report: {report}")
+    if settings.SNAPSHOT_FILE:
+        await export(args)
+
+
+async def reload(args: argparse.Namespace) -> None:
+    # Deferred imports, like seed
+    from app.ingestion.reload import ReloadProgress, reload_data, reload_lock
+
+    def report(progress: ReloadProgress) -> None:
+        print(f"Reload {progress}")
+
+    async with reload_lock(database.engine) as acquired:
+        if not acquired:
+            raise SystemExit("A reload is already running (API worker or another swift-ingest reload).")
+        rows = await reload_data(database.engine, ReloadProgress(listener=report))
+    print(f"Reload done: {rows} rows live")
+    if settings.SNAPSHOT_FILE:
+        await export(args)
+
+
+async def export(args: argparse.Namespace) -> None:
+    from app.ingestion.snapshot_export import export_snapshot
+
+    path = getattr(args, "output", None) or settings.SNAPSHOT_FILE
+    if not path:
+        raise SystemExit("No snapshot file: set SNAPSHOT_FILE or pass --output")
+    count = await export_snapshot(database.engine, path)
+    print(f"Exported {count} SWIFT codes to {path}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    """
+    Runs a command in one event loop: pooled connections are bound to the loop that opened them,
+    so they are closed before it ends instead of being reused by another asyncio.run.
+    """
+    try:
+        await args.handler(args)
+    finally:
+        await database.engine.dispose()
+
+
+def add_source_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--source", choices=["xlsx", "csv", "google"], help="overrides INPUT_SOURCE")
+    parser.add_argument("--files", metavar="PATTERNS",
+                        help="overrides INPUT_FILES (comma-separated files or globs, parsed in parallel)")
+    parser.add_argument("--workers", type=int, help="overrides INGEST_WORKERS")
+    parser.add_argument("--on-conflict", choices=["error", "last"], help="overrides INGEST_CONFLICTS")
+    parser.add_argument("--xlsx-engine", choices=["openpyxl", "calamine"], help="overrides XLSX_ENGINE")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="swift-ingest", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Load the configured source into swift_codes")
+    add_source_arguments(seed_parser)
+    seed_parser.add_argument("--method", choices=["copy", "insert"], help="overrides SEED_METHOD")
+    seed_parser.add_argument("--batch-size", type=int, help="overrides SEED_BATCH_SIZE")
+    seed_parser.add_argument("--chunk-size", type=int, help="overrides SEED_CHUNK_SIZE (0 loads the source at once)")
+    seed_parser.add_argument("--quarantine", metavar="PATH", help="overrides SEED_QUARANTINE_PATH")
+    seed_parser.add_argument("--mode", choices=["upsert", "diff"],
+                             help="overrides SEED_MODE ('diff' also deletes codes missing from the source)")
+    seed_parser.add_argument("--dry-run", action="store_true", default=None,
+                             help="print the changes the seed would make without writing them")
+    seed_parser.set_defaults(handler=seed)
+
+    reload_parser = commands.add_parser(
+        "reload", help="Replace swift_codes with the configured source through a shadow table swap"
+    )
+    add_source_arguments(reload_parser)
+    reload_parser.add_argument("--batch-size", type=int, help="overrides SEED_BATCH_SIZE (rows per COPY)")
+    reload_parser.add_argument("--quarantine", metavar="PATH", help="overrides SEED_QUARANTINE_PATH")
+    reload_parser.set_defaults(handler=reload)
+
+    export_parser = commands.add_parser(
+        "export-snapshot", help="Write swift_codes to the memory-mapped snapshot file served by the API workers"
+    )
+    export_parser.add_argument("--output", metavar="PATH", help="file to write, defaults to SNAPSHOT_FILE")
+    export_parser.set_defaults(handler=export)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    for option, setting in SETTING_OVERRIDES.items():
+        value = getattr(args, option, None)
+        if value is not None:
+            setattr(settings, setting, value)
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
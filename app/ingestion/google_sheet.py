@@ -0,0 +1,272 @@
+"""
+Conditional, streaming download of the Google Sheet source, and its optional periodic refresh.
+
+The sheet is exported as CSV into GOOGLE_SHEET_CACHE_PATH, next to a small JSON state file
+holding its ETag / Last-Modified validators and content digests. Later fetches send the
+validators back (If-None-Match / If-Modified-Since), so an unchanged sheet answers 304 without
+a body. Contents identical to the last loaded ones count as unchanged too, the seed skips them.
+
+Only httpx is imported here, pandas is loaded once a refresh actually parses the sheet.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.metrics import time_stage
+from app.ingestion.reload import reload_job
+from app.ingestion.snapshot_export import refresh_snapshot
+from app.services.snapshot import snapshot
+
+# Answers worth another attempt, anything else (404, 403 of a private sheet...) fails at once
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Postgres advisory lock held by the worker refreshing the sheet, the others skip their poll
+REFRESH_LOCK_KEY = 0x5357494654
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SheetFetch:
+    """
+    Outcome of fetch_sheet: status is 200 (downloaded) or 304 (the local copy is current),
+    changed tells whether the local copy differs from the last loaded one.
+    """
+    path: str
+    status: int
+    changed: bool
+
+
+def google_sheet_csv_url(sheet_url: str) -> str:
+    """
+    Extracts the spreadsheet ID and GID (sheet tab ID) from a Google Sheets URL
+    and builds a direct CSV export link.
+
+    URLs of other hosts are returned as they are, any CSV endpoint can stand in for the sheet.
+    """
+    if urlsplit(sheet_url).hostname != "docs.google.com":
+        return sheet_url
+
+    # Extract spreadsheet ID
+    match = re.search(r'/d/([a-zA-Z0-9-_]+)', sheet_url)
+    if not match:
+        raise ValueError("Invalid Google Sheets URL: Couldn't extract spreadsheet ID.")
+    spreadsheet_id = match.group(1)
+
+    # Extract gid if available or defaults to 0
+    gid_match = re.search(r'(?:[?&]gid=|#gid=)(\d+)', sheet_url)
+    gid = gid_match.group(1) if gid_match else '0'
+
+    # Build CSV export URL
+    return (
+        f'https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export'
+        f'?format=csv&id={spreadsheet_id}&gid={gid}'
+    )
+
+
+def state_path(path: str) -> str:
+    return f"{path}.json"
+
+
+def read_state(path: str) -> Dict[str, Optional[str]]:
+    try:
+        with open(state_path(path)) as source:
+            return json.load(source)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_state(path: str, state: Dict[str, Optional[str]]) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".", suffix=".tmp")
+    with os.fdopen(fd, "w") as sink:
+        json.dump(state, sink)
+    os.replace(tmp_path, state_path(path))
+
+
+def mark_loaded(path: str) -> None:
+    """
+    Records the downloaded contents as loaded, fetching them again then reports them unchanged.
+    """
+    state = read_state(path)
+    if state.get("sha256"):
+        state["loaded_sha256"] = state["sha256"]
+        write_state(path, state)
+
+
+async def download(client: httpx.AsyncClient, url: str, path: str, state: Dict[str, Optional[str]]) -> SheetFetch:
+    """
+    One conditional GET, streamed into a temporary file renamed over path once complete,
+    so an interrupted download never replaces the previous copy.
+    """
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+
+    async with client.stream("GET", url, headers=headers) as response:
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            return SheetFetch(path, response.status_code, state.get("sha256") != state.get("loaded_sha256"))
+        response.raise_for_status()
+
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as sink:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    digest.update(chunk)
+                    sink.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        state.update(
+            url=url,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            sha256=digest.hexdigest(),
+        )
+    write_state(path, state)
+    return SheetFetch(path, response.status_code, state["sha256"] != state.get("loaded_sha256"))
+
+
+async def fetch_sheet(sheet_url: str, path: str, client: Optional[httpx.AsyncClient] = None) -> SheetFetch:
+    """
+    Brings the CSV export of sheet_url at path up to date.
+
+    Connection errors, timeouts (GOOGLE_SHEET_CONNECT_TIMEOUT / GOOGLE_SHEET_READ_TIMEOUT, the latter
+    between two received chunks) and RETRY_STATUSES answers are retried up to GOOGLE_SHEET_FETCH_ATTEMPTS
+    times with exponential backoff, the last failure raises RuntimeError.
+    """
+    url = google_sheet_csv_url(sheet_url)
+    state = read_state(path)
+    if state.get("url") != url or not os.path.exists(path):
+        # Validators of another sheet, or of a deleted copy, would skip a download we need
+        state = {}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    own_client = client is None
+    if own_client:
+        timeout = httpx.Timeout(settings.GOOGLE_SHEET_READ_TIMEOUT, connect=settings.GOOGLE_SHEET_CONNECT_TIMEOUT)
+        # The export link redirects to googleusercontent.com
+        client = httpx.AsyncClient(timeout=timeout, follow_redirects=True)
+
+    try:
+        for attempt in range(1, settings.GOOGLE_SHEET_FETCH_ATTEMPTS + 1):
+            try:
+                return await download(client, url, path, state)
+            except httpx.HTTPError as e:
+                retryable = isinstance(e, httpx.TransportError) or (
+                    isinstance(e, httpx.HTTPStatusError) and e.response.status_code in RETRY_STATUSES
+                )
+                if not retryable or attempt >= settings.GOOGLE_SHEET_FETCH_ATTEMPTS:
+                    raise RuntimeError(f"Error downloading Google Sheet at {url}: {e!r}") from e
+                await asyncio.sleep(settings.GOOGLE_SHEET_RETRY_BACKOFF * 2 ** (attempt - 1))
+    finally:
+        if own_client:
+            await client.aclose()
+
+
+def uses_google_sheet() -> bool:
+    """
+    Whether the configured source is the Google Sheet (INPUT_FILES replaces INPUT_SOURCE).
+    """
+    return not settings.INPUT_FILES and settings.INPUT_SOURCE.lower() == "google"
+
+
+async def fetch_google_sheet() -> SheetFetch:
+    """
+    fetch_sheet of GOOGLE_SHEET_URL into GOOGLE_SHEET_CACHE_PATH, which parse_data then reads.
+    """
+    if not settings.GOOGLE_SHEET_URL:
+        raise ValueError("Google Sheets URL not specified in environment variable.")
+    with time_stage("fetch"):
+        return await fetch_sheet(settings.GOOGLE_SHEET_URL, settings.GOOGLE_SHEET_CACHE_PATH)
+
+
+class SheetRefresher:
+    """
+    Polls the Google Sheet every GOOGLE_SHEET_REFRESH_INTERVAL seconds from the API process
+    and applies its changes with a diff seed (SEED_MODE 'diff', codes missing from the sheet are deleted).
+
+    Every worker polls, but a poll only runs under a Postgres advisory lock: one worker at a time
+    downloads the sheet (GOOGLE_SHEET_CACHE_PATH and its state file) and seeds, the others skip.
+    Their snapshots follow the new dataset version (SNAPSHOT_REFRESH_INTERVAL) or snapshot file.
+    """
+
+    def __init__(self) -> None:
+        self.last_report = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def configure(self, db_engine: AsyncEngine, interval: float) -> None:
+        if not uses_google_sheet():
+            raise ValueError("GOOGLE_SHEET_REFRESH_INTERVAL requires INPUT_SOURCE=google without INPUT_FILES")
+
+        self._task = asyncio.create_task(self._poll(db_engine, interval))
+        # The loop only keeps weak references to tasks
+        self._tasks.add(self._task)
+        self._task.add_done_callback(self._tasks.discard)
+
+    async def refresh(self, db_engine: AsyncEngine):
+        """
+        One poll: downloads the sheet if it changed and seeds the differences. Returns the LoadReport,
+        all zeros when the sheet was unchanged, None when the poll skipped because a full reload was
+        running or another worker holds the refresh lock.
+        """
+        if reload_job.running:
+            # The reload loads the sheet itself, a diff now would target the table being replaced
+            return None
+
+        # Session-level lock, held by this connection until unlocked (or closed) after the seed
+        async with db_engine.connect() as lock_conn:
+            lock_args = {"key": REFRESH_LOCK_KEY}
+            if not await lock_conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), lock_args):
+                return None
+            try:
+                # Deferred import, pulls in pandas & openpyxl: only in the worker holding the lock
+                from app.ingestion.seed_data import seed_data
+
+                report = await seed_data(db_engine, mode="diff")
+                if (report.inserted or report.updated or report.deleted) and snapshot.loaded:
+                    # The served copy must follow the table
+                    await refresh_snapshot(db_engine)
+            finally:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), lock_args)
+        return report
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _poll(self, db_engine: AsyncEngine, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.last_report = await self.refresh(db_engine)
+                self.last_error = None
+            except Exception as e:
+                # Keep polling, the next attempt may succeed (network, sheet being edited...)
+                self.last_error = repr(e)
+                logger.exception("Google Sheet refresh failed")
+
+
+sheet_refresher = SheetRefresher()
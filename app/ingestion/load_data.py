@@ -0,0 +1,273 @@
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import String, any_, column, delete, literal, literal_column, or_, select, table, text
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.models.swift_code import SwiftCode
+
+# Columns written by the loaders, bank_prefix and id are filled in by Postgres
+LOAD_COLUMNS = ["swift_code", "bank_name", "address", "country_iso2", "country_name", "is_headquarter", "town_name"]
+UPDATE_COLUMNS = [col for col in LOAD_COLUMNS if col != "swift_code"]
+
+# Postgres accepts at most 32767 bind parameters in a single statement
+MAX_QUERY_PARAMS = 32767
+
+STAGING_TABLE = "swift_codes_staging"
+
+Record = Tuple[str, str, str | None, str, str, bool, str | None]
+
+
+@dataclass
+class LoadReport:
+    """
+    Row counts of a bulk load. A row is unchanged when it already existed with identical values.
+    Deleted rows (existing codes missing from the source) only happen in diff mode.
+    """
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    def __add__(self, other: "LoadReport") -> "LoadReport":
+        return LoadReport(
+            inserted=self.inserted + other.inserted,
+            updated=self.updated + other.updated,
+            unchanged=self.unchanged + other.unchanged,
+            deleted=self.deleted + other.deleted,
+        )
+
+    def __str__(self) -> str:
+        return f"{self.inserted} inserted, {self.updated} updated, {self.unchanged} unchanged, {self.deleted} deleted"
+
+
+@dataclass
+class DiffPlan:
+    """
+    Changes that bring swift_codes in line with the source, found by comparing row hashes.
+    """
+    inserts: List[Record] = field(default_factory=list)
+    updates: List[Record] = field(default_factory=list)
+    deletes: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    def report(self) -> LoadReport:
+        return LoadReport(
+            inserted=len(self.inserts), updated=len(self.updates), unchanged=self.unchanged, deleted=len(self.deletes)
+        )
+
+    def summary(self, sample: int = 10) -> str:
+        """
+        Counts with the first codes of every kind of change, for dry runs & logs.
+        """
+        lines = [str(self.report())]
+        for kind, codes in [
+            ("insert", [record[0] for record in self.inserts]),
+            ("update", [record[0] for record in self.updates]),
+            ("delete", self.deletes),
+        ]:
+            if codes:
+                more = f" (+{len(codes) - sample} more)" if len(codes) > sample else ""
+                lines.append(f"  {kind}: {', '.join(codes[:sample])}{more}")
+        return "\n".join(lines)
+
+
+def to_records(df: pd.DataFrame) -> List[Record]:
+    """
+    Converts a validated DataFrame into normalized tuples in LOAD_COLUMNS order.
+
+    Codes are stripped & uppercased, so a code repeated in the source is only loaded once
+    (the last occurrence wins), which ON CONFLICT DO UPDATE requires within one statement.
+    """
+    swift_codes = df["swift_code"].astype(str).str.strip().str.upper()
+    town_names = df["town_name"] if "town_name" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    frame = pd.DataFrame({
+        "swift_code": swift_codes,
+        "bank_name": df["bank_name"],
+        "address": df["address"] if "address" in df.columns else None,
+        "country_iso2": df["country_iso2"].str.upper(),
+        "country_name": df["country_name"].str.upper(),
+        "is_headquarter": swift_codes.str.endswith("XXX"),
+        # Optional, stored uppercase like the country name so search filters can match it exactly
+        "town_name": town_names.astype(str).str.strip().str.upper().where(town_names.notna()),
+    })
+    frame = frame.drop_duplicates(subset="swift_code", keep="last")
+
+    # NaN (empty cells) must reach Postgres as NULL
+    frame = frame.astype(object).where(frame.notna(), None)
+    return list(frame.itertuples(index=False, name=None))
+
+
+def _hash_part(value: Optional[str]) -> str:
+    # Nullable columns: '+value' or '-' for NULL, like coalesce('+' || col, '-') in ROW_HASH_SQL
+    return "-" if value is None else f"+{value}"
+
+
+def row_hash(record: Record) -> str:
+    """
+    Python twin of SwiftCode.row_hash (ROW_HASH_SQL): md5 of the non-key columns, separated by chr(31).
+    """
+    _, bank_name, address, country_iso2, country_name, is_headquarter, town_name = record
+    parts = [
+        str(bank_name),
+        _hash_part(address),
+        str(country_iso2),
+        str(country_name),
+        "t" if is_headquarter else "f",
+        _hash_part(town_name),
+    ]
+    return hashlib.md5("\x1f".join(parts).encode()).hexdigest()
+
+
+def plan_diff(existing: Dict[str, str], records: List[Record], delete_missing: bool = True) -> DiffPlan:
+    """
+    Sorts records into inserts, updates and unchanged rows against existing (code -> row_hash),
+    existing codes absent from records are deletes (unless delete_missing is False).
+    """
+    plan = DiffPlan()
+    for record in records:
+        current = existing.get(record[0])
+        if current is None:
+            plan.inserts.append(record)
+        elif current != row_hash(record):
+            plan.updates.append(record)
+        else:
+            plan.unchanged += 1
+
+    if delete_missing:
+        source_codes = {record[0] for record in records}
+        plan.deletes = sorted(code for code in existing if code not in source_codes)
+    return plan
+
+
+async def fetch_row_hashes(conn: AsyncConnection) -> Dict[str, str]:
+    result = await conn.execute(select(SwiftCode.swift_code, SwiftCode.row_hash))
+    return dict(result.tuples().all())
+
+
+async def delete_batches(conn: AsyncConnection, swift_codes: List[str], batch_size: int) -> int:
+    """
+    Deletes codes with one `swift_code = ANY(...)` statement per batch_size codes.
+    """
+    deleted = 0
+    for start in range(0, len(swift_codes), batch_size):
+        batch = swift_codes[start:start + batch_size]
+        result = await conn.execute(delete(SwiftCode).where(SwiftCode.swift_code == any_(literal(batch, ARRAY(String)))))
+        deleted += result.rowcount
+    return deleted
+
+
+def _upsert_statement(source):
+    """
+    Builds INSERT ... ON CONFLICT (swift_code) DO UPDATE for a VALUES list or a SELECT.
+
+    The update only fires when a value actually differs, so unchanged rows are not rewritten
+    and not returned. RETURNING (xmax = 0) tells an inserted row apart from an updated one.
+    """
+    stmt = insert(SwiftCode)
+    stmt = stmt.from_select(LOAD_COLUMNS, source) if not isinstance(source, list) else stmt.values(source)
+
+    changed = or_(*[
+        getattr(SwiftCode, col).is_distinct_from(getattr(stmt.excluded, col)) for col in UPDATE_COLUMNS
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=[SwiftCode.swift_code],
+        set_={col: getattr(stmt.excluded, col) for col in UPDATE_COLUMNS},
+        where=changed,
+    ).returning(literal_column("xmax = 0").label("inserted"))
+
+
+def _count(returned: Iterable[Tuple[bool]], total: int) -> LoadReport:
+    flags = [row[0] for row in returned]
+    inserted = sum(flags)
+    return LoadReport(inserted=inserted, updated=len(flags) - inserted, unchanged=total - len(flags))
+
+
+async def upsert_batches(conn: AsyncConnection, records: List[Record], batch_size: int) -> LoadReport:
+    """
+    Loads records with multi-row INSERT ... ON CONFLICT DO UPDATE statements of batch_size rows.
+    """
+    if batch_size < 1 or batch_size * len(LOAD_COLUMNS) > MAX_QUERY_PARAMS:
+        raise ValueError(f"Batch size must be between 1 and {MAX_QUERY_PARAMS // len(LOAD_COLUMNS)}")
+
+    report = LoadReport()
+    for start in range(0, len(records), batch_size):
+        batch = [dict(zip(LOAD_COLUMNS, record)) for record in records[start:start + batch_size]]
+        result = await conn.execute(_upsert_statement(batch))
+        report += _count(result, len(batch))
+    return report
+
+
+async def copy_upsert(conn: AsyncConnection, records: List[Record]) -> LoadReport:
+    """
+    Streams records into a temporary staging table with COPY, then merges them into
+    swift_codes with a single INSERT ... SELECT ... ON CONFLICT DO UPDATE.
+
+    Must run inside a transaction, the staging table is dropped on commit.
+    """
+    await conn.execute(text(
+        f"CREATE TEMPORARY TABLE {STAGING_TABLE} ON COMMIT DROP AS "
+        f"SELECT {', '.join(LOAD_COLUMNS)} FROM {SwiftCode.__tablename__} WITH NO DATA"
+    ))
+
+    raw_connection = await conn.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        STAGING_TABLE, records=records, columns=LOAD_COLUMNS
+    )
+
+    staging = table(STAGING_TABLE, *[column(col) for col in LOAD_COLUMNS])
+    result = await conn.execute(_upsert_statement(select(*staging.c)))
+    return _count(result, len(records))
+
+
+async def bulk_load(conn: AsyncConnection, records: List[Record], method: str, batch_size: int) -> LoadReport:
+    """
+    Dispatches to the configured loader ('copy' or 'insert').
+    """
+    method = method.lower()
+    if method == "copy":
+        return await copy_upsert(conn, records)
+
+    elif method == "insert":
+        return await upsert_batches(conn, records, batch_size)
+
+    else:
+        raise ValueError(f"Unsupported seed method: {method}")
+
+
+async def diff_load(
+    conn: AsyncConnection,
+    records: List[Record],
+    method: str,
+    batch_size: int,
+    delete_missing: bool = True,
+    dry_run: bool = False,
+) -> DiffPlan:
+    """
+    Applies only what changed: row hashes of the source are compared with swift_codes.row_hash,
+    then only new & changed rows go through bulk_load and missing codes are deleted in batches.
+
+    Must run inside a transaction. Other writers are locked out (readers are not) between
+    reading the hashes and applying the plan, so no concurrent write is overwritten or lost.
+    With dry_run the plan is computed but nothing is written.
+    """
+    if not dry_run:
+        await conn.execute(text(f"LOCK TABLE {SwiftCode.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+
+    plan = plan_diff(await fetch_row_hashes(conn), records, delete_missing)
+    if dry_run:
+        return plan
+
+    changed = plan.inserts + plan.updates
+    if changed:
+        await bulk_load(conn, changed, method, batch_size)
+    if plan.deletes:
+        await delete_batches(conn, plan.deletes, batch_size)
+    return plan
@@ -0,0 +1,99 @@
+"""
+On-disk cache of parsed source files, as uncompressed Arrow IPC files.
+
+An entry is keyed by the source (path and how it is parsed: format, sheet, engine), the SHA-256
+of the file contents and PARSER_VERSION, so an edited source file or a parser change never
+serves stale data. Each source keeps only its latest entry. Entries are memory-mapped
+on load and exposed as pyarrow-backed string columns, without copying them into Python objects.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+# Bump when parse_* functions change what they return for the same file, it invalidates every entry
+PARSER_VERSION = 1
+
+# Arrow strings -> pandas' pyarrow-backed strings, which wrap the mapped buffers instead of copying them
+ARROW_TYPES = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.large_string(): pd.StringDtype("pyarrow"),
+}
+
+
+def file_digest(file_path: str) -> str:
+    with open(file_path, "rb") as source:
+        return hashlib.file_digest(source, "sha256").hexdigest()
+
+
+def entry_path(cache_dir: str, file_path: str, source_format: str, digest: str) -> Path:
+    """
+    <source>-<content digest>-v<PARSER_VERSION>.arrow, source being a short hash of the path & format.
+    """
+    source = hashlib.sha256(f"{os.path.abspath(file_path)}|{source_format}".encode()).hexdigest()[:16]
+    return Path(cache_dir) / f"{source}-{digest}-v{PARSER_VERSION}.arrow"
+
+
+def load_entry(path: Path) -> Optional[pd.DataFrame]:
+    """
+    Maps a cache entry, None when it doesn't exist or can't be read (it is then rebuilt).
+    """
+    try:
+        table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+    return table.to_pandas(types_mapper=ARROW_TYPES.get)
+
+
+def store_entry(path: Path, df: pd.DataFrame) -> bool:
+    """
+    Writes an entry atomically (a temporary file renamed into place) and removes the older entries
+    of the same source. False when the frame holds values Arrow can't type, nothing is cached then.
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    source = path.name.split("-", 1)[0]
+    for stale in path.parent.glob(f"{source}-*.arrow"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return True
+
+
+def cached_parse(
+    file_path: str, source_format: str, parse: Callable[[str], pd.DataFrame], cache_dir: str
+) -> pd.DataFrame:
+    """
+    Returns parse(file_path), from the cache when the same file was already parsed by this PARSER_VERSION.
+    source_format must tell apart different parses of one file (e.g. 'xlsx:openpyxl:Sheet1').
+
+    Text columns come back as pyarrow-backed strings (missing values as <NA>), which the
+    validation & load steps handle like the object columns parse returns.
+    """
+    try:
+        path = entry_path(cache_dir, file_path, source_format, file_digest(file_path))
+    except OSError:
+        # Unreadable source, let the parser report it like without a cache
+        return parse(file_path)
+
+    df = load_entry(path)
+    if df is None:
+        df = parse(file_path)
+        store_entry(path, df)
+    return df
@@ -1,13 +1,23 @@
+import asyncio
 import pandas as pd
-import re
+from functools import partial
+from itertools import islice
+from typing import Iterator
+
+import openpyxl
+
 from app.core.config import settings
+from app.ingestion.google_sheet import fetch_sheet
+from app.ingestion.parse_cache import cached_parse
 
-def parse_xlsx(file_path: str) -> pd.DataFrame:
+def parse_xlsx(file_path: str, sheet_name: str | int = 0, engine: str = "openpyxl") -> pd.DataFrame:
     """
-    Reads an XLSX file and returns a DataFrame.
+    Reads a sheet of an XLSX file (the first one by default) and returns a DataFrame.
+
+    engine 'calamine' (python-calamine, a read-only Rust reader) parses several times faster than openpyxl.
     """
     try:
-        df = pd.read_excel(file_path, engine="openpyxl")
+        df = pd.read_excel(file_path, sheet_name=sheet_name, engine=engine)
         return df
     except Exception as e:
         raise RuntimeError(f"Error reading XLSX file at {file_path}: {str(e)}") from e
@@ -22,12 +32,50 @@ def parse_csv(file_path: str) -> pd.DataFrame:
     except Exception as e:
         raise RuntimeError(f"Error reading CSV file at {file_path}: {str(e)}") from e
     
+def parse_xlsx_chunks(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Streams an XLSX file as DataFrames of at most chunk_size rows.
+
+    Uses openpyxl read_only mode, so only one chunk of rows is held in memory at a time.
+    Chunks keep a continuous index, row labels match what parse_xlsx would return.
+    """
+    try:
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    except Exception as e:
+        raise RuntimeError(f"Error reading XLSX file at {file_path}: {str(e)}") from e
+
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        # read_only sheets can report trailing rows that are completely empty
+        rows = (row for row in rows if any(value is not None for value in row))
+        offset = 0
+        while batch := list(islice(rows, chunk_size)):
+            yield pd.DataFrame(batch, columns=header, index=pd.RangeIndex(offset, offset + len(batch)))
+            offset += len(batch)
+    finally:
+        workbook.close()
+
+def parse_csv_chunks(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Streams a CSV file as DataFrames of at most chunk_size rows.
+    """
+    try:
+        with pd.read_csv(file_path, chunksize=chunk_size) as reader:
+            yield from reader
+    except Exception as e:
+        raise RuntimeError(f"Error reading CSV file at {file_path}: {str(e)}") from e
+
 def parse_google_sheet(sheet_url: str) -> pd.DataFrame:
     """
     Loads a public Google Sheet as a pandas DataFrame.
 
-    This function extracts the spreadsheet ID and GID (sheet tab ID) from the URL
-    and constructs a direct CSV export link.
+    The sheet is downloaded as CSV into GOOGLE_SHEET_CACHE_PATH (conditionally, see
+    app.ingestion.google_sheet.fetch_sheet), which is then parsed like a regular CSV.
+    Runs its own event loop: inside one, await fetch_sheet and parse the file instead.
 
     Args:
         sheet_url (str): Full URL to the public Google Sheet.
@@ -35,24 +83,16 @@ def parse_google_sheet(sheet_url: str) -> pd.DataFrame:
     Returns:
         pd.DataFrame: A DataFrame containing the sheet's contents.
     """
-    # Extract spreadsheet ID
-    match = re.search(r'/d/([a-zA-Z0-9-_]+)', sheet_url)
-    if not match:
-        raise ValueError("Invalid Google Sheets URL: Couldn't extract spreadsheet ID.")
-    spreadsheet_id = match.group(1)
-
-    # Extract gid if available or defaults to 0
-    gid_match = re.search(r'(?:[?&]gid=|#gid=)(\d+)', sheet_url)
-    gid = gid_match.group(1) if gid_match else '0'
-
-    # Build CSV export URL
-    csv_url = (
-        f'https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export'
-        f'?format=csv&id={spreadsheet_id}&gid={gid}'
-    )
+    sheet = asyncio.run(fetch_sheet(sheet_url, settings.GOOGLE_SHEET_CACHE_PATH))
+    return parse_csv(sheet.path)
 
-    df = pd.read_csv(csv_url)
-    return df
+def parse_file(file_path: str, source_format: str, parse) -> pd.DataFrame:
+    """
+    Parses a local source file through the parsed-source cache, unless PARSE_CACHE_DIR is empty.
+    """
+    if not settings.PARSE_CACHE_DIR:
+        return parse(file_path)
+    return cached_parse(file_path, source_format, parse, settings.PARSE_CACHE_DIR)
 
 def parse_data() -> pd.DataFrame:
     """
@@ -62,15 +102,36 @@ def parse_data() -> pd.DataFrame:
     input_source = settings.INPUT_SOURCE.lower()
     
     if input_source == "xlsx":
-        return parse_xlsx(settings.XLSX_FILE_PATH)
+        return parse_file(
+            settings.XLSX_FILE_PATH,
+            f"xlsx:{settings.XLSX_ENGINE}",
+            partial(parse_xlsx, engine=settings.XLSX_ENGINE)
+        )
     
     elif input_source == "csv":
-        return parse_csv(settings.CSV_FILE_PATH)
+        return parse_file(settings.CSV_FILE_PATH, "csv", parse_csv)
     
     elif input_source == "google":
-        if not settings.GOOGLE_SHEET_URL:
-            raise ValueError("Google Sheets URL not specified in environment variable.")
-        return parse_google_sheet(settings.GOOGLE_SHEET_URL)
+        # Downloaded by fetch_google_sheet(), which seeding awaits first
+        return parse_file(settings.GOOGLE_SHEET_CACHE_PATH, "csv", parse_csv)
     
     else:
-        raise ValueError(f"Unsupported type of input source: {input_source}")
\ No newline at end of file
+        raise ValueError(f"Unsupported type of input source: {input_source}")
+
+def parse_data_chunks(chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Streaming counterpart of parse_data(), yields the INPUT_SOURCE in chunks of chunk_size rows.
+    """
+    input_source = settings.INPUT_SOURCE.lower()
+
+    if input_source == "xlsx":
+        return parse_xlsx_chunks(settings.XLSX_FILE_PATH, chunk_size)
+
+    elif input_source == "csv":
+        return parse_csv_chunks(settings.CSV_FILE_PATH, chunk_size)
+
+    elif input_source == "google":
+        return parse_csv_chunks(settings.GOOGLE_SHEET_CACHE_PATH, chunk_size)
+
+    else:
+        raise ValueError(f"Unsupported type of input source: {input_source}")
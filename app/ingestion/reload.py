@@ -0,0 +1,320 @@
+"""
+Full reload of swift_codes through a shadow table, without disturbing the API.
+
+The source is copied into an index-less shadow table, its indexes and constraints are built
+afterwards (from the live table's definitions in the catalog), then one short transaction
+swaps the tables by rename. Readers keep using the old table until that commit, then see
+the whole new dataset at once.
+
+pandas is only imported once a reload actually parses the source, so the API can expose
+ReloadJob without loading the ingestion stack in every worker.
+"""
+import asyncio
+import re
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from typing import AsyncIterator, Callable, List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+from app.core.metrics import time_stage
+from app.ingestion.snapshot_export import refresh_snapshot
+from app.models.swift_code import SwiftCode
+from app.services.snapshot import snapshot
+from app.services.versioning import bump_version
+
+LIVE_TABLE = SwiftCode.__tablename__
+SHADOW_TABLE = f"{LIVE_TABLE}_shadow"
+RETIRED_TABLE = f"{LIVE_TABLE}_retired"
+
+# Postgres advisory lock held for a whole reload, every process reloads through the same shadow table
+RELOAD_LOCK_KEY = 0x53574946544C4F41
+
+# Live indexes and the constraint each one backs, if any (primary key / unique)
+INDEX_DEFINITIONS = text("""
+SELECT i.relname AS index_name, pg_get_indexdef(i.oid) AS definition, c.conname AS constraint_name, c.contype::text
+FROM pg_index x
+JOIN pg_class i ON i.oid = x.indexrelid
+LEFT JOIN pg_constraint c ON c.conindid = x.indexrelid AND c.conrelid = x.indrelid
+WHERE x.indrelid = CAST(:table AS regclass)
+ORDER BY x.indisprimary DESC, i.relname
+""")
+
+CONSTRAINT_KINDS = {"p": "PRIMARY KEY", "u": "UNIQUE"}
+
+# Postgres lock_not_available, raised when lock_timeout expires
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+@dataclass
+class ReloadProgress:
+    """
+    State of a reload: stage is one of idle, parsing, loading, indexing, swapping, done or failed.
+    """
+    stage: str = "idle"
+    rows_total: int = 0
+    rows_loaded: int = 0
+    indexes_total: int = 0
+    indexes_built: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    listener: Optional[Callable[["ReloadProgress"], None]] = field(default=None, repr=False, compare=False)
+
+    @property
+    def running(self) -> bool:
+        return self.stage not in ("idle", "done", "failed")
+
+    def advance(self, stage: Optional[str] = None, **counts) -> None:
+        if stage is not None:
+            self.stage = stage
+        for name, value in counts.items():
+            setattr(self, name, value)
+        if self.listener is not None:
+            self.listener(self)
+
+    def as_dict(self) -> dict:
+        """
+        JSON body of the admin endpoint, camelCase like the other responses.
+        """
+        state = asdict(self)
+        del state["listener"]
+        return {re.sub(r"_(\w)", lambda match: match.group(1).upper(), name): value for name, value in state.items()}
+
+    def __str__(self) -> str:
+        return (f"{self.stage}: {self.rows_loaded}/{self.rows_total} rows, "
+                f"{self.indexes_built}/{self.indexes_total} indexes")
+
+
+def _shadow_index_definition(definition: str, shadow_name: str) -> str:
+    # "CREATE [UNIQUE] INDEX name ON public.swift_codes USING ..." -> shadow index on the shadow table
+    return re.sub(
+        r"^(CREATE (?:UNIQUE )?INDEX) \S+ ON (?:ONLY )?\S+ ",
+        lambda match: f"{match.group(1)} {shadow_name} ON {SHADOW_TABLE} ",
+        definition,
+        count=1,
+    )
+
+
+async def create_shadow_table(conn: AsyncConnection) -> None:
+    """
+    Empty copy of the live table: columns, defaults (the id sequence), generated columns and
+    CHECK constraints, but no indexes, so the bulk load doesn't maintain any.
+    """
+    await conn.execute(text(f"DROP TABLE IF EXISTS {SHADOW_TABLE}"))
+    await conn.execute(text(
+        f"CREATE TABLE {SHADOW_TABLE} "
+        f"(LIKE {LIVE_TABLE} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS)"
+    ))
+
+
+async def copy_into_shadow(conn: AsyncConnection, records: list, batch_size: int, progress: ReloadProgress) -> None:
+    # Deferred import, pulls in pandas
+    from app.ingestion.load_data import LOAD_COLUMNS
+
+    raw_connection = await conn.get_raw_connection()
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        await raw_connection.driver_connection.copy_records_to_table(SHADOW_TABLE, records=batch, columns=LOAD_COLUMNS)
+        progress.advance(rows_loaded=start + len(batch))
+
+
+async def build_shadow_indexes(conn: AsyncConnection, progress: ReloadProgress) -> List[tuple]:
+    """
+    Recreates every index (and primary key / unique constraint) of the live table on the shadow table,
+    under temporary names since index names are unique per schema.
+
+    Returns (kind, temporary name, live name) renames to apply once the shadow table is live,
+    kind being 'constraint' or 'index'.
+    """
+    definitions = (await conn.execute(INDEX_DEFINITIONS, {"table": LIVE_TABLE})).all()
+    progress.advance(indexes_total=len(definitions))
+
+    renames = []
+    for number, (index_name, definition, constraint_name, kind) in enumerate(definitions):
+        shadow_name = f"{SHADOW_TABLE}_idx{number}"
+        await conn.execute(text(_shadow_index_definition(definition, shadow_name)))
+
+        if constraint_name is not None and kind in CONSTRAINT_KINDS:
+            # Promotes the index, the constraint takes the index over (and its name)
+            await conn.execute(text(
+                f"ALTER TABLE {SHADOW_TABLE} ADD CONSTRAINT {shadow_name} {CONSTRAINT_KINDS[kind]} USING INDEX {shadow_name}"
+            ))
+            renames.append(("constraint", shadow_name, constraint_name))
+        else:
+            renames.append(("index", shadow_name, index_name))
+
+        progress.advance(indexes_built=number + 1)
+
+    await conn.execute(text(f"ANALYZE {SHADOW_TABLE}"))
+    return renames
+
+
+async def swap_tables(conn: AsyncConnection, renames: List[tuple]) -> None:
+    """
+    Puts the shadow table live in one transaction. Only the renames and the drop of the old table
+    need its ACCESS EXCLUSIVE lock, held for milliseconds.
+
+    lock_timeout keeps the swap from queueing behind a long query (which would stall every reader
+    queued behind the swap), the caller retries instead.
+    """
+    sequence = await conn.scalar(text(f"SELECT pg_get_serial_sequence('{LIVE_TABLE}', 'id')"))
+
+    await conn.execute(text(f"SET LOCAL lock_timeout = '{settings.RELOAD_LOCK_TIMEOUT_MS}ms'"))
+    await conn.execute(text(f"ALTER TABLE {LIVE_TABLE} RENAME TO {RETIRED_TABLE}"))
+    await conn.execute(text(f"ALTER TABLE {SHADOW_TABLE} RENAME TO {LIVE_TABLE}"))
+    if sequence is not None:
+        # The id sequence is owned by the old table's column, it would be dropped with it
+        await conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {LIVE_TABLE}.id"))
+    await conn.execute(text(f"DROP TABLE {RETIRED_TABLE}"))
+
+    for kind, shadow_name, live_name in renames:
+        if kind == "constraint":
+            await conn.execute(text(f"ALTER TABLE {LIVE_TABLE} RENAME CONSTRAINT {shadow_name} TO {live_name}"))
+        else:
+            await conn.execute(text(f"ALTER INDEX {shadow_name} RENAME TO {live_name}"))
+
+    # Every cached ETag is stale now
+    await bump_version(conn)
+
+
+async def reload_data(db_engine: AsyncEngine, progress: Optional[ReloadProgress] = None) -> int:
+    """
+    Replaces the contents of swift_codes with the configured INPUT_SOURCE through a shadow table.
+
+    Parsing & validation run in a worker thread, the database steps are asynchronous,
+    so the event loop keeps serving requests throughout. Returns the number of loaded rows.
+
+    API writes made while a reload runs are not carried over, the new table holds the source only.
+    """
+    # Deferred imports: seed_data pulls in pandas & openpyxl, google_sheet imports this module
+    from app.ingestion.google_sheet import fetch_google_sheet, mark_loaded, uses_google_sheet
+    from app.ingestion.seed_data import source_records
+
+    progress = progress or ReloadProgress()
+    progress.advance("parsing", started_at=time.time(), finished_at=None, error=None,
+                     rows_total=0, rows_loaded=0, indexes_total=0, indexes_built=0)
+    try:
+        google_sheet = uses_google_sheet()
+        if google_sheet:
+            # Unchanged or not, a reload always loads the sheet
+            await fetch_google_sheet()
+        records = await asyncio.to_thread(source_records)
+
+        progress.advance("loading", rows_total=len(records))
+        async with db_engine.connect() as conn:
+            with time_stage("load"):
+                async with conn.begin():
+                    await create_shadow_table(conn)
+                    await copy_into_shadow(conn, records, settings.SEED_BATCH_SIZE, progress)
+
+            progress.advance("indexing")
+            with time_stage("index"):
+                async with conn.begin():
+                    renames = await build_shadow_indexes(conn, progress)
+
+            progress.advance("swapping")
+            with time_stage("swap"):
+                for attempt in range(1, settings.RELOAD_SWAP_ATTEMPTS + 1):
+                    try:
+                        async with conn.begin():
+                            await swap_tables(conn, renames)
+                        break
+                    except DBAPIError as e:
+                        if getattr(e.orig, "sqlstate", None) != LOCK_NOT_AVAILABLE or attempt == settings.RELOAD_SWAP_ATTEMPTS:
+                            raise
+                        await asyncio.sleep(attempt * settings.RELOAD_LOCK_TIMEOUT_MS / 1000)
+
+    except BaseException as e:
+        progress.advance("failed", finished_at=time.time(), error=repr(e))
+        # A leftover shadow table is dropped by the next reload
+        raise
+
+    if google_sheet:
+        mark_loaded(settings.GOOGLE_SHEET_CACHE_PATH)
+    progress.advance("done", finished_at=time.time())
+    return len(records)
+
+
+@asynccontextmanager
+async def reload_lock(db_engine: AsyncEngine) -> AsyncIterator[bool]:
+    """
+    Takes the reload advisory lock on a connection of its own for the block, yields whether it was
+    acquired: False while another worker or `swift-ingest reload` is reloading.
+    """
+    # Session-level lock, held by this connection until unlocked (or closed)
+    async with db_engine.connect() as lock_conn:
+        lock_args = {"key": RELOAD_LOCK_KEY}
+        if not await lock_conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), lock_args):
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), lock_args)
+
+
+class ReloadJob:
+    """
+    At most one background reload at a time, across processes (reload_lock), with this process's
+    progress for the admin endpoint.
+    """
+
+    def __init__(self) -> None:
+        self.progress = ReloadProgress()
+        self._task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, db_engine: AsyncEngine) -> bool:
+        """
+        Starts a reload in the background, False if one is already running here or in another process.
+        """
+        if self.running:
+            return False
+
+        # Held by the task until the reload ends
+        lock = AsyncExitStack()
+        if not await lock.enter_async_context(reload_lock(db_engine)):
+            await lock.aclose()
+            return False
+
+        self.progress = ReloadProgress(stage="parsing", started_at=time.time())
+        self._task = asyncio.create_task(self._run(db_engine, lock))
+        # The loop only keeps weak references to tasks
+        self._tasks.add(self._task)
+        self._task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def wait(self) -> None:
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def close(self) -> None:
+        if self.running:
+            self._task.cancel()
+        await self.wait()
+        self._task = None
+        self.progress = ReloadProgress()
+
+    async def _run(self, db_engine: AsyncEngine, lock: AsyncExitStack) -> None:
+        async with lock:
+            try:
+                await reload_data(db_engine, self.progress)
+            except Exception:
+                # Recorded in progress.error, nobody awaits this task
+                return
+
+            if snapshot.loaded:
+                # The served copy must follow the new table
+                await refresh_snapshot(db_engine)
+
+
+reload_job = ReloadJob()
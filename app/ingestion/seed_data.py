@@ -1,50 +1,183 @@
 import asyncio
+import os
+from typing import List, Optional
+
 import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.ingestion.google_sheet import fetch_google_sheet, mark_loaded, uses_google_sheet
+from app.ingestion.parse_data import parse_data, parse_data_chunks
+from app.ingestion.sources import COLUMN_MAPPING, parse_sources, reject_invalid
+from app.ingestion.validate_data import validate_frame
+from app.ingestion.load_data import LoadReport, Record, bulk_load, diff_load, to_records
+from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import time_stage
+from app.services.versioning import bump_version
+
+def prepare_records(raw_data: pd.DataFrame, append_quarantine: bool = False) -> List[Record]:
+    """
+    Renames, validates and normalizes a parsed DataFrame (or one chunk of it) into load records.
+
+    Invalid rows abort the seed, unless SEED_QUARANTINE_PATH is set, then they are written
+    there as CSV (with their errors) and only the valid rows are returned.
+    With append_quarantine=True they are appended to the file instead of replacing it.
+    """
+    validation = validate_frame(raw_data.rename(columns=COLUMN_MAPPING))
+    reject_invalid(validation.errors, validation.quarantined, append_quarantine)
+    return to_records(validation.data)
+
+def source_records() -> List[Record]:
+    """
+    Parsed & validated records of INPUT_FILES when set (in parallel, see app.ingestion.sources),
+    otherwise of INPUT_SOURCE.
+    """
+    if settings.INPUT_FILES:
+        # Workers parse & validate each unit in one go
+        with time_stage("parse_validate"):
+            return parse_sources(settings.INPUT_FILES, settings.INGEST_WORKERS or os.cpu_count() or 1)
 
-from app.ingestion.parse_data import parse_data
-from app.ingestion.validate_data import validate_data
-from app.core.database import SessionLocal
-from app.models.swift_code import SwiftCode
+    with time_stage("parse"):
+        raw_data = parse_data()
+    with time_stage("validate"):
+        return prepare_records(raw_data)
 
-async def seed_data() -> None:
+async def seed_data(db_engine: AsyncEngine = engine, mode: Optional[str] = None) -> LoadReport:
     """
-    Seeds the Postgres database with data from a pandas DataFrame.
+    Seeds the Postgres database with data from the configured INPUT_SOURCE.
+
+    Rows are upserted in bulk (SEED_METHOD: 'copy' or 'insert', SEED_BATCH_SIZE rows per statement),
+    so re-running the seed is safe and only rewrites rows whose values changed.
+    With SEED_CHUNK_SIZE set, the source is streamed instead of loaded at once (see seed_data_streaming),
+    except for INPUT_FILES, which are parsed in parallel instead.
+    SEED_MODE='diff' or SEED_DRY_RUN compare row hashes first instead (see seed_data_diff).
+
+    A Google Sheet is downloaded first (see app.ingestion.google_sheet), the seed is skipped
+    when it didn't change since the last successful one.
 
     Args:
-        data (pd.DataFrame): The DataFrame containing SwiftCode data.
-    """
-
-    # Parse & Validate
-    raw_data = parse_data()
-    
-    raw_data.rename(columns={
-    "SWIFT CODE": "swift_code",
-    "NAME": "bank_name",
-    "ADDRESS": "address",
-    "COUNTRY ISO2 CODE": "country_iso2",
-    "COUNTRY NAME": "country_name"
-    }, inplace=True)
-
-    validated_data = validate_data(raw_data)
-
-    async with SessionLocal() as session:
-        for _, row in validated_data.iterrows():
-            swift_code = SwiftCode(
-                swift_code=row.get("swift_code").upper(),
-                bank_name=row.get("bank_name"),
-                address=row.get("address"),
-                country_iso2=row.get("country_iso2").upper(),
-                country_name=row.get("country_name").upper(),
-                is_headquarter=row.get("swift_code", "").strip().endswith("XXX")
-            )
-            session.add(swift_code)
-        await session.commit()
+        db_engine (AsyncEngine): Engine of the database to seed, defaults to the app engine.
+        mode (str): Overrides SEED_MODE.
+
+    Returns:
+        LoadReport: Number of inserted, updated and unchanged rows.
+    """
+    mode = (mode or settings.SEED_MODE).lower()
+    if mode not in ("upsert", "diff"):
+        raise ValueError(f"Unsupported seed mode: {mode}")
+
+    google_sheet = uses_google_sheet()
+    if google_sheet:
+        sheet = await fetch_google_sheet()
+        if not sheet.changed and not settings.SEED_DRY_RUN:
+            print(f"Google Sheet unchanged since the last seed (HTTP {sheet.status}), skipping")
+            return LoadReport()
+
+    if mode == "diff" or settings.SEED_DRY_RUN:
+        report = await seed_data_diff(db_engine, delete_missing=mode == "diff", dry_run=settings.SEED_DRY_RUN)
+    elif settings.SEED_CHUNK_SIZE > 0 and not settings.INPUT_FILES:
+        report = await seed_data_streaming(db_engine, settings.SEED_CHUNK_SIZE)
+    else:
+        report = await seed_data_upsert(db_engine)
+
+    if google_sheet and not settings.SEED_DRY_RUN:
+        mark_loaded(settings.GOOGLE_SHEET_CACHE_PATH)
+    return report
+
+async def seed_data_upsert(db_engine: AsyncEngine) -> LoadReport:
+    """
+    Upserts the whole source in one transaction, a failed load leaves the table untouched.
+    """
+    # Parse & Validate, off the event loop
+    records = await asyncio.to_thread(source_records)
+
+    with time_stage("load"):
+        async with db_engine.begin() as conn:
+            report = await bulk_load(conn, records, settings.SEED_METHOD, settings.SEED_BATCH_SIZE)
+            # Invalidates the API's ETags, only when the data actually changed
+            if report.inserted or report.updated:
+                await bump_version(conn)
+    return report
+
+async def seed_data_diff(db_engine: AsyncEngine, delete_missing: bool, dry_run: bool) -> LoadReport:
+    """
+    Seeds only the differences between the source and the table, found by comparing row hashes,
+    so a daily refresh touching a few hundred codes only writes those rows.
+
+    With delete_missing, codes absent from the source are deleted: the source must be the whole
+    directory, and rows quarantined as invalid count as absent. The source is read at once,
+    SEED_CHUNK_SIZE does not apply. With dry_run the changes are printed and nothing is written.
+    """
+    records = await asyncio.to_thread(source_records)
+
+    with time_stage("load"):
+        async with db_engine.begin() as conn:
+            plan = await diff_load(conn, records, settings.SEED_METHOD, settings.SEED_BATCH_SIZE, delete_missing, dry_run)
+            report = plan.report()
+            if dry_run:
+                print(f"Dry run, nothing was written. Changes: {plan.summary()}")
+            elif report.inserted or report.updated or report.deleted:
+                await bump_version(conn)
+    return report
+
+async def seed_data_streaming(db_engine: AsyncEngine, chunk_size: int) -> LoadReport:
+    """
+    Seeds the database chunk by chunk, so memory stays flat regardless of the source size.
+
+    A producer parses & validates chunks in worker threads and hands them to the loader
+    through a bounded queue (SEED_QUEUE_SIZE chunks), parsing stalls while the loader is behind.
+    Every chunk is committed on its own, a failed run leaves the earlier chunks loaded,
+    which is fine since re-running the seed is idempotent.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=settings.SEED_QUEUE_SIZE)
+    report = LoadReport()
+    chunks = parse_data_chunks(chunk_size)
+
+    # Every chunk appends its rejected rows, start from a clean quarantine file
+    if settings.SEED_QUARANTINE_PATH and os.path.exists(settings.SEED_QUARANTINE_PATH):
+        os.remove(settings.SEED_QUARANTINE_PATH)
+
+    async def produce() -> None:
+        while True:
+            # Stages are timed per chunk here
+            with time_stage("parse"):
+                raw_chunk = await asyncio.to_thread(next, chunks, None)
+            if raw_chunk is None:
+                break
+            with time_stage("validate"):
+                records = await asyncio.to_thread(prepare_records, raw_chunk, True)
+            await queue.put(records)
+        # Sentinel, the source is exhausted
+        await queue.put(None)
+
+    async def load() -> None:
+        nonlocal report
+        while (records := await queue.get()) is not None:
+            with time_stage("load"):
+                async with db_engine.begin() as conn:
+                    chunk_report = await bulk_load(conn, records, settings.SEED_METHOD, settings.SEED_BATCH_SIZE)
+                    # Chunks commit separately, every changed one must invalidate the API's ETags
+                    if chunk_report.inserted or chunk_report.updated:
+                        await bump_version(conn)
+            report += chunk_report
+
+    tasks = [asyncio.create_task(produce()), asyncio.create_task(load())]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # A failed stage must not leave the other one blocked on the queue
+        for task in tasks:
+            task.cancel()
+        raise
+
+    return report
 
 def run_seed_data() -> None:
     """
     Runs the asynchronous seeding operation, used in entrypoint for Docker.
     """
-    asyncio.run(seed_data())
+    report = asyncio.run(seed_data())
+    print(f"Seed report: {report}")
 
 if __name__ == "__main__":
-    run_seed_data()
\ No newline at end of file
+    run_seed_data()
@@ -0,0 +1,52 @@
+"""
+Export of swift_codes to the memory-mapped snapshot file of the API workers (see app.services.snapshot_file).
+
+Workers pick a new export up on their own, at most SNAPSHOT_FILE_CHECK_INTERVAL seconds later.
+"""
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import time_stage
+from app.models.swift_code import SwiftCode
+from app.services.snapshot import SwiftCodeRecord, snapshot
+from app.services.snapshot_file import write_snapshot_file
+from app.services.versioning import get_version
+
+SNAPSHOT_COLUMNS = [
+    SwiftCode.swift_code, SwiftCode.bank_name, SwiftCode.address,
+    SwiftCode.country_iso2, SwiftCode.country_name, SwiftCode.is_headquarter,
+]
+
+
+async def export_snapshot(db_engine: AsyncEngine, path: str) -> int:
+    """
+    Writes the current contents of swift_codes to a snapshot file at path, replacing it atomically.
+    Returns the number of exported codes.
+    """
+    with time_stage("export"):
+        async with db_engine.connect() as conn:
+            # One snapshot of the database, the file's version matches its rows
+            conn = await conn.execution_options(isolation_level="REPEATABLE READ")
+            async with conn.begin():
+                version = await get_version(conn)
+                result = await conn.execute(select(*SNAPSHOT_COLUMNS))
+                records = [SwiftCodeRecord(**row._mapping) for row in result]
+
+        # Sorting & packing the file would hold the event loop for a while
+        return await asyncio.to_thread(write_snapshot_file, path, records, version)
+
+
+async def refresh_snapshot(db_engine: AsyncEngine) -> int:
+    """
+    Brings the served snapshot up to date after a bulk change of the table: exports & maps a new
+    SNAPSHOT_FILE if set, reloads the in-process copy otherwise. Returns the number of codes.
+    """
+    if settings.SNAPSHOT_FILE:
+        await export_snapshot(db_engine, settings.SNAPSHOT_FILE)
+        return snapshot.map_file(settings.SNAPSHOT_FILE, settings.SNAPSHOT_FILE_CHECK_INTERVAL)
+
+    async with AsyncSession(db_engine) as session:
+        return await snapshot.load(session)
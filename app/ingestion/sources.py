@@ -0,0 +1,204 @@
+"""
+Multi-file ingestion: several XLSX workbooks (every sheet) and CSV files, listed or globbed in INPUT_FILES.
+
+Every file or sheet is parsed and validated in its own worker process, the results are merged
+in the listed order with cross-source duplicate detection before the bulk load.
+"""
+import glob
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from itertools import repeat
+from typing import Dict, List, Optional, Tuple
+
+import openpyxl
+import pandas as pd
+
+from app.core.config import settings
+from app.ingestion.load_data import Record, to_records
+from app.ingestion.parse_cache import cached_parse
+from app.ingestion.parse_data import parse_csv, parse_xlsx
+from app.ingestion.validate_data import DataValidationError, validate_frame
+
+# Source headers -> SwiftCode columns
+COLUMN_MAPPING = {
+    "SWIFT CODE": "swift_code",
+    "NAME": "bank_name",
+    "ADDRESS": "address",
+    "TOWN NAME": "town_name",
+    "COUNTRY ISO2 CODE": "country_iso2",
+    "COUNTRY NAME": "country_name"
+}
+
+SOURCE_FORMATS = {".xlsx": "xlsx", ".csv": "csv"}
+
+# Conflicting codes listed in a SourceConflictError message
+MAX_REPORTED_CONFLICTS = 20
+
+
+class SourceConflictError(ValueError):
+    """
+    Raised when sources disagree on a code, conflicts holds (code, first source, later source) entries.
+    """
+
+    def __init__(self, conflicts: List[Tuple[str, str, str]]):
+        self.conflicts = conflicts
+        lines = [f"{code}: {first} vs {later}" for code, first, later in conflicts[:MAX_REPORTED_CONFLICTS]]
+        if len(conflicts) > MAX_REPORTED_CONFLICTS:
+            lines.append(f"... and {len(conflicts) - MAX_REPORTED_CONFLICTS} more")
+        super().__init__(f"{len(conflicts)} SWIFT codes differ between sources:\n" + "\n".join(lines))
+
+
+@dataclass(frozen=True)
+class SourceUnit:
+    """
+    One file, or one sheet of a workbook: the unit of work of a parsing process.
+    """
+    path: str
+    format: str
+    sheet: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return f"{self.path}[{self.sheet}]" if self.sheet is not None else self.path
+
+
+@dataclass
+class UnitResult:
+    unit: SourceUnit
+    records: List[Record]
+    errors: pd.DataFrame
+    quarantined: pd.DataFrame
+
+
+def reject_invalid(errors: pd.DataFrame, quarantined: pd.DataFrame, append: bool = False) -> None:
+    """
+    Aborts the seed on invalid rows, unless SEED_QUARANTINE_PATH is set: they are then written
+    there as CSV (with their errors), appended to the file when append is True.
+    """
+    if errors.empty:
+        return
+
+    if not settings.SEED_QUARANTINE_PATH:
+        raise DataValidationError(errors)
+
+    append = append and os.path.exists(settings.SEED_QUARANTINE_PATH)
+    quarantined.to_csv(
+        settings.SEED_QUARANTINE_PATH,
+        index_label="row",
+        mode="a" if append else "w",
+        header=not append
+    )
+    print(f"Quarantined {len(quarantined)} invalid rows to {settings.SEED_QUARANTINE_PATH}")
+
+
+def expand_sources(patterns: str) -> List[SourceUnit]:
+    """
+    Turns a comma-separated list of files and globs into units: one per CSV, one per workbook sheet.
+    Globs expand in sorted order, sources keep the listed order.
+    """
+    units = []
+    for pattern in (part.strip() for part in patterns.split(",")):
+        if not pattern:
+            continue
+
+        paths = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not paths:
+            raise ValueError(f"No source file matches {pattern}")
+
+        for path in paths:
+            source_format = SOURCE_FORMATS.get(os.path.splitext(path)[1].lower())
+            if source_format is None:
+                raise ValueError(f"Unsupported type of input file: {path}")
+
+            if source_format == "csv":
+                units.append(SourceUnit(path, "csv"))
+                continue
+
+            try:
+                # read_only only loads the workbook index here, not the sheets
+                workbook = openpyxl.load_workbook(path, read_only=True)
+            except Exception as e:
+                raise RuntimeError(f"Error reading XLSX file at {path}: {str(e)}") from e
+            try:
+                units.extend(SourceUnit(path, "xlsx", sheet) for sheet in workbook.sheetnames)
+            finally:
+                workbook.close()
+    return units
+
+
+def prepare_unit(unit: SourceUnit, xlsx_engine: str, cache_dir: str) -> UnitResult:
+    """
+    Parses (through the parse cache) and validates one unit, runs in a worker process.
+    Settings the workers need are passed explicitly, they don't see CLI overrides of the parent.
+    """
+    if unit.format == "xlsx":
+        parse, cache_key = partial(parse_xlsx, sheet_name=unit.sheet, engine=xlsx_engine), f"xlsx:{xlsx_engine}:{unit.sheet}"
+    else:
+        parse, cache_key = parse_csv, "csv"
+
+    raw_data = cached_parse(unit.path, cache_key, parse, cache_dir) if cache_dir else parse(unit.path)
+    validation = validate_frame(raw_data.rename(columns=COLUMN_MAPPING))
+
+    # Rows are numbered per unit, the source column tells which one
+    errors = validation.errors.assign(source=unit.label)
+    quarantined = validation.quarantined.assign(source=unit.label)
+    return UnitResult(unit, to_records(validation.data), errors, quarantined)
+
+
+def merge_results(results: List[UnitResult], on_conflict: str) -> Tuple[List[Record], List[Tuple[str, str, str]]]:
+    """
+    Merges unit records in order. A code repeated with identical values is loaded once;
+    with different values it is a conflict: on_conflict 'last' keeps the later source (deltas
+    listed after the full directory), 'error' raises SourceConflictError.
+    """
+    if on_conflict not in ("error", "last"):
+        raise ValueError(f"Unsupported conflict policy: {on_conflict}")
+
+    merged: Dict[str, Record] = {}
+    origin: Dict[str, str] = {}
+    conflicts = []
+    for result in results:
+        for record in result.records:
+            code = record[0]
+            current = merged.get(code)
+            if current is not None and current != record:
+                conflicts.append((code, origin[code], result.unit.label))
+            merged[code] = record
+            origin[code] = result.unit.label
+
+    if conflicts and on_conflict == "error":
+        raise SourceConflictError(conflicts)
+    return list(merged.values()), conflicts
+
+
+def parse_sources(patterns: str, workers: int) -> List[Record]:
+    """
+    Parsed, validated and merged records of every source in patterns, using up to `workers` processes.
+    """
+    units = expand_sources(patterns)
+    if not units:
+        raise ValueError("INPUT_FILES lists no source")
+
+    args = (units, repeat(settings.XLSX_ENGINE), repeat(settings.PARSE_CACHE_DIR))
+    workers = min(workers, len(units))
+    if workers <= 1:
+        results = list(map(prepare_unit, *args))
+    else:
+        # spawn: workers never inherit the parent's event loop, threads or database connections
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(prepare_unit, *args))
+
+    failed = [result for result in results if not result.errors.empty]
+    if failed:
+        reject_invalid(
+            pd.concat([result.errors for result in failed], ignore_index=True),
+            pd.concat([result.quarantined for result in failed]),
+        )
+
+    records, conflicts = merge_results(results, settings.INGEST_CONFLICTS.lower())
+    if conflicts:
+        print(f"{len(conflicts)} SWIFT codes differ between sources, later sources won")
+    return records
@@ -1,37 +1,131 @@
+from dataclasses import dataclass
+
 import pandas as pd
 
-def validate_data(df: pd.DataFrame) -> pd.DataFrame:
+REQUIRED_COLUMNS = ["swift_code", "bank_name", "country_iso2", "country_name"]
+
+# ISO 9362: 4-char party prefix, 2-letter country, 2-char location, optional 3-char branch
+BIC_PATTERN = r"[A-Z0-9]{4}[A-Z]{2}[A-Z0-9]{2}(?:[A-Z0-9]{3})?"
+
+# Human readable descriptions of each rule, used in error messages
+RULE_MESSAGES = {
+    "empty": "is empty",
+    "length": "must be 8 or 11 characters",
+    "format": "is not a valid BIC (4 alphanumeric, 2 letter country, 2 alphanumeric location, optional 3 alphanumeric branch)",
+    "country_mismatch": "characters 5-6 must match 'country_iso2'",
+    "iso2": "must be 2 letters",
+}
+
+ERROR_COLUMNS = ["row", "column", "rule"]
+
+
+class DataValidationError(ValueError):
+    """
+    Raised when rows fail validation, errors holds the structured (row, column, rule) table.
+    """
+
+    def __init__(self, errors: pd.DataFrame):
+        self.errors = errors
+        lines = [
+            # Multi-file ingestion numbers rows per source and adds a source column
+            f"{f'{error.source} row' if 'source' in errors.columns else 'Row'} {error.row}: "
+            f"'{error.column}' {RULE_MESSAGES.get(error.rule, error.rule)}"
+            for error in errors.itertuples(index=False)
+        ]
+        super().__init__("Data validation errors:\n" + "\n".join(lines))
+
+
+@dataclass
+class ValidationResult:
+    """
+    Outcome of validate_frame: the clean rows, one error per failed (row, column, rule),
+    and the rejected rows with a summary of their errors.
+    """
+    data: pd.DataFrame
+    errors: pd.DataFrame
+    quarantined: pd.DataFrame
+
+
+def _clean(series: pd.Series) -> pd.Series:
+    """
+    Strips every value as a string, keeping missing values as NaN.
+    """
+    return series.astype(str).str.strip().where(series.notna())
+
+
+def _is_blank(series: pd.Series) -> pd.Series:
+    return series.isna() | (series == "")
+
+
+def find_errors(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Runs every rule as a vectorized column mask over an already normalized DataFrame.
+
+    Returns a DataFrame with one (row, column, rule) entry per failure, ordered by row.
+    """
+    swift_code = df["swift_code"].fillna("")
+    country_iso2 = df["country_iso2"].fillna("")
+
+    length_ok = swift_code.str.len().isin([8, 11])
+    checks = [
+        ("bank_name", "empty", _is_blank(df["bank_name"])),
+        ("country_name", "empty", _is_blank(df["country_name"])),
+        ("swift_code", "length", ~length_ok),
+        # Structure rules are only meaningful once the length is right
+        ("swift_code", "format", length_ok & ~swift_code.str.fullmatch(BIC_PATTERN)),
+        ("swift_code", "country_mismatch", length_ok & (swift_code.str[4:6] != country_iso2)),
+        ("country_iso2", "iso2", ~country_iso2.str.fullmatch(r"[A-Z]{2}")),
+    ]
+
+    frames = [
+        pd.DataFrame({"row": df.index[mask.to_numpy()], "column": column, "rule": rule})
+        for column, rule, mask in checks
+        if mask.any()
+    ]
+    if not frames:
+        return pd.DataFrame(columns=ERROR_COLUMNS)
+
+    errors = pd.concat(frames, ignore_index=True)
+    return errors.sort_values("row", kind="stable", ignore_index=True)
+
+
+def validate_frame(df: pd.DataFrame) -> ValidationResult:
+    """
+    Normalizes and validates the swift codes data without raising on bad rows.
+
+    Missing required columns can't be checked row by row, so they still raise a ValueError.
+    """
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError("Data validation errors:\n" + "\n".join(f"Missing required column: {col}" for col in missing))
+
+    df = df.copy()
+    df["swift_code"] = _clean(df["swift_code"]).str.upper()
+    df["bank_name"] = _clean(df["bank_name"])
+    df["country_iso2"] = _clean(df["country_iso2"]).str.upper()
+    df["country_name"] = _clean(df["country_name"])
+
+    errors = find_errors(df)
+    bad_rows = df.index.isin(errors["row"])
+
+    quarantined = df[bad_rows].copy()
+    summary = errors.assign(error=errors["column"] + ":" + errors["rule"]).groupby("row")["error"].agg("; ".join)
+    quarantined["errors"] = summary.reindex(quarantined.index)
+
+    return ValidationResult(data=df[~bad_rows], errors=errors, quarantined=quarantined)
+
+
+def validate_data(df: pd.DataFrame, quarantine: bool = False) -> pd.DataFrame:
     """
     Validates and cleans the swift codes data.
 
     Returns the validated DataFrame if validation passes,
-    otherwise, raises a ValueError with details.
-    """
-    errors = []
-
-    required_columns = ["swift_code", "bank_name", "country_iso2", "country_name"]
-    for col in required_columns:
-        if col not in df.columns:
-            errors.append(f"Missing required column: {col}")
-    
-    for idx, row in df.iterrows():
-        if pd.isna(row["bank_name"]) or str(row["bank_name"]).strip() == "":
-            errors.append(f"Row {idx}: 'bank_name' is empty")
-
-        if pd.isna(row["country_name"]) or str(row["country_name"]).strip() == "":
-            errors.append(f"Row {idx}: 'country_name' is empty")
-
-        if pd.isna(row["swift_code"]) or not (8 <= len(str(row["swift_code"])) <= 11):
-            errors.append(f"Row {idx}: 'swift_code' must be 8 to 11 characters")
-
-        if pd.isna(row["country_iso2"]) or len(str(row["country_iso2"]).strip()) != 2:
-            errors.append(f"Row {idx}: 'country_iso2' must be 2 characters")
-    
-    if errors:
-        raise ValueError("Data validation errors:\n" + "\n".join(errors))
-    
-    df["bank_name"] = df["bank_name"].str.strip()
-    df["country_name"] = df["country_name"].str.strip()
-    df["country_iso2"] = df["country_iso2"].str.upper()
-    
-    return df
\ No newline at end of file
+    otherwise, raises a DataValidationError (a ValueError) with details.
+    With quarantine=True invalid rows are dropped instead, use validate_frame to inspect them.
+    """
+    result = validate_frame(df)
+    if not result.errors.empty and not quarantine:
+        raise DataValidationError(result.errors)
+
+    return result.data
+
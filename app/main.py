@@ -1,24 +1,88 @@
+import os
+
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from app.api.v1 import swift_codes
-from app.ingestion.seed_data import seed_data
+from app.api import metrics
+from app.api.v1 import admin, cache, swift_codes
 from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware
+from app.core.replicas import create_replica_engines, replica_router
+from app.core.database import get_db, get_read_db
+from app.ingestion.google_sheet import sheet_refresher
+from app.ingestion.reload import reload_job
+from app.ingestion.snapshot_export import export_snapshot
+from app.services.cache import create_backend, response_cache
+from app.services.coalescer import swift_code_loader
+from app.services.snapshot import snapshot, snapshot_follower
 
 def create_app() -> FastAPI:
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         if settings.DEV_MODE.lower() == "false":
             print("Seeding data...")
-            # This is only for local usage, docker uses seed_data in entrypoint.sh
-            # await seed_data()
+            # The API doesn't seed (nor import pandas), run `swift-ingest seed` first, docker does it in entrypoint.sh
 
         if settings.DEV_MODE.lower() == "true":
             print("Skipping seed_data() for test environment")
 
+        if settings.SNAPSHOT_ENABLED and settings.SNAPSHOT_FILE:
+            if not os.path.exists(settings.SNAPSHOT_FILE):
+                # Normally written by the seed, resolve get_read_db through overrides like below
+                async for conn in app.dependency_overrides.get(get_read_db, get_read_db)():
+                    await export_snapshot(conn.bind, settings.SNAPSHOT_FILE)
+            count = snapshot.map_file(settings.SNAPSHOT_FILE, settings.SNAPSHOT_FILE_CHECK_INTERVAL)
+            print(f"Mapped {count} SWIFT codes from the snapshot file {settings.SNAPSHOT_FILE}")
+
+        elif settings.SNAPSHOT_ENABLED:
+            # Resolve get_db through overrides, so tests load the snapshot from the test database
+            async for session in app.dependency_overrides.get(get_db, get_db)():
+                count = await snapshot.load(session)
+            print(f"Loaded {count} SWIFT codes into the in-memory snapshot")
+
+        if settings.SNAPSHOT_ENABLED and settings.SNAPSHOT_REFRESH_INTERVAL > 0:
+            snapshot_follower.configure(app.dependency_overrides.get(get_db, get_db), settings.SNAPSHOT_REFRESH_INTERVAL)
+
+        if settings.RESPONSE_CACHE_BACKEND:
+            response_cache.configure(create_backend(settings.RESPONSE_CACHE_BACKEND), settings.RESPONSE_CACHE_TTL)
+
+        if settings.COALESCE_LOOKUPS:
+            swift_code_loader.configure(
+                app.dependency_overrides.get(get_read_db, get_read_db),
+                settings.COALESCE_WINDOW_MS / 1000,
+                settings.COALESCE_MAX_BATCH
+            )
+
+        if settings.GOOGLE_SHEET_REFRESH_INTERVAL > 0:
+            # The engine behind the read dependency, like the admin reload
+            async for conn in app.dependency_overrides.get(get_read_db, get_read_db)():
+                sheet_refresher.configure(conn.bind, settings.GOOGLE_SHEET_REFRESH_INTERVAL)
+
+        if settings.DATABASE_REPLICA_URLS:
+            replica_router.configure(
+                create_replica_engines(settings.DATABASE_REPLICA_URLS), settings.REPLICA_HEALTH_CHECK_INTERVAL
+            )
+
         yield
 
+        await snapshot_follower.close()
+        snapshot.clear()
+        await response_cache.close()
+        await swift_code_loader.close()
+        await reload_job.close()
+        await sheet_refresher.close()
+        await replica_router.close()
+
     app = FastAPI(lifespan=lifespan)
     app.include_router(swift_codes.router, prefix="/v1/swift-codes", tags=["swift-codes"])
+    app.include_router(cache.router, prefix="/v1/cache", tags=["cache"])
+    app.include_router(admin.router, prefix="/v1/admin", tags=["admin"])
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics.router)
+    if settings.PROFILING_ENABLED:
+        # Not installed at all otherwise, unprofiled requests don't pay for it
+        app.add_middleware(
+            ProfilingMiddleware, output_dir=settings.PROFILING_DIR, interval=settings.PROFILING_INTERVAL_MS / 1000
+        )
     return app
 
 # For Uvicorn
@@ -1 +1,2 @@
-from .swift_code import SwiftCode
\ No newline at end of file
+from .swift_code import SwiftCode
+from .dataset_version import DatasetVersion
\ No newline at end of file
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, BigInteger
+from app.core.database import Base
+
+class DatasetVersion(Base):
+    __tablename__ = "dataset_versions"
+
+    # One row per versioned dataset, bumped in the same transaction as every write to it
+    scope = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False)
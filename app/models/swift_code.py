@@ -1,6 +1,14 @@
-from sqlalchemy import Column, String, Boolean, Integer, CheckConstraint, text
+from sqlalchemy import Column, String, Boolean, Integer, CheckConstraint, Computed, DDL, Index, event, text
 from app.core.database import Base
 
+# Fingerprint of every loaded column but the key, NULLs are told apart from empty strings.
+# app.ingestion.load_data.row_hash computes the same digest for source rows, keep both in sync.
+ROW_HASH_SQL = (
+    "md5(bank_name || chr(31) || coalesce('+' || address, '-') || chr(31) || country_iso2 || chr(31) || "
+    "country_name || chr(31) || CASE WHEN is_headquarter THEN 't' ELSE 'f' END || chr(31) || "
+    "coalesce('+' || town_name, '-'))"
+)
+
 class SwiftCode(Base):
     __tablename__ = "swift_codes"
 
@@ -8,13 +16,29 @@ class SwiftCode(Base):
     swift_code = Column(String(11), unique=True, nullable=False)
     bank_name = Column(String(255), nullable=False)
     address = Column(String(255), nullable=True)
-    country_iso2 = Column(String(2), nullable=False, index=True)
+    country_iso2 = Column(String(2), nullable=False)
     country_name = Column(String(100), nullable=False)
+    town_name = Column(String(100), nullable=True)
     is_headquarter = Column(Boolean, nullable=False, server_default=text('false'))
+    # First 8 characters (bank + country + location), shared by a HQ and all of its branches
+    bank_prefix = Column(String(8), Computed("substr(swift_code, 1, 8)", persisted=True), nullable=False, index=True)
+    # Maintained by Postgres on every write (API, seed or manual), diff reseeds compare it with the source
+    row_hash = Column(String(32), Computed(ROW_HASH_SQL, persisted=True), nullable=False)
 
     __table_args__ = (
         CheckConstraint("char_length(country_iso2) = 2", name="check_country_iso2_len"),
         CheckConstraint("char_length(swift_code) >= 8 AND char_length(swift_code) <= 11", name="check_swift_code_len"),
         CheckConstraint("char_length(trim(bank_name)) > 0", name="check_bank_name_not_empty"),
         CheckConstraint("char_length(trim(country_name)) > 0", name="check_country_name_not_empty"),
-    )
\ No newline at end of file
+        # Country lookups and keyset pagination ordered by swift_code
+        Index("ix_swift_codes_country_iso2_swift_code", "country_iso2", "swift_code"),
+        # Search: fuzzy bank name matching (pg_trgm) and swift_code prefixes (LIKE 'ABC%' under any collation)
+        Index(
+            "ix_swift_codes_bank_name_trgm", "bank_name",
+            postgresql_using="gin", postgresql_ops={"bank_name": "gin_trgm_ops"}
+        ),
+        Index("ix_swift_codes_swift_code_pattern", "swift_code", postgresql_ops={"swift_code": "text_pattern_ops"}),
+    )
+
+# gin_trgm_ops comes from the pg_trgm extension, create_all (tests) needs it like the migrations do
+event.listen(SwiftCode.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
\ No newline at end of file
@@ -1,6 +1,9 @@
-from typing import List, Optional, Union
+from collections import Counter
+from typing import Any, Dict, List, Optional, Union
 from pydantic import BaseModel, Field, ConfigDict
 
+from app.core.config import settings
+
 class BranchSwiftCodeResponse(BaseModel):
     address: Optional[str] = Field(None)
     bankName: str = Field(..., alias="bank_name")
@@ -68,4 +71,53 @@ class SwiftCodeCreate(BaseModel):
 class CountrySwiftCodesResponse(BaseModel):
     countryISO2: str
     countryName: str
-    swiftCodes: List[BranchSwiftCodeResponse]
\ No newline at end of file
+    swiftCodes: List[BranchSwiftCodeResponse]
+    nextCursor: Optional[str] = None  # Only set for paginated requests with more pages
+
+
+class SwiftCodeLookupRequest(BaseModel):
+    # Checked while validating the body, an oversized batch fails before its codes are built
+    swiftCodes: List[str] = Field(..., max_length=settings.LOOKUP_MAX_BATCH_SIZE)
+
+    model_config = ConfigDict(
+        json_schema_extra = {
+            "example": {
+                "swiftCodes": ["AAISALTRXXX", "ABIEBGS1XXX", "MISSINGCODE"]
+            }
+        }
+    )
+
+
+class SwiftCodeLookupResponse(BaseModel):
+    swiftCodes: List[Union[HeadquarterSwiftCodeResponse, FullBranchSwiftCodeResponse]]
+    notFound: List[str]
+
+
+class SwiftCodeSearchResponse(BaseModel):
+    swiftCodes: List[FullBranchSwiftCodeResponse]  # Best bank name matches first, then by SWIFT code
+
+
+class SwiftCodeBulkCreate(BaseModel):
+    # Entries shaped like SwiftCodeCreate, validated one by one: a malformed entry is reported as invalid
+    # instead of rejecting the whole batch
+    swiftCodes: List[Any]
+
+
+class SwiftCodeBulkDelete(BaseModel):
+    # SWIFT codes, non-string items are reported as invalid
+    swiftCodes: List[Any]
+
+
+class BulkItemResult(BaseModel):
+    swiftCode: str
+    status: str  # created / duplicate / invalid, or deleted / not_found / invalid
+    detail: Optional[str] = None
+
+
+class BulkOperationResponse(BaseModel):
+    summary: Dict[str, int]
+    results: List[BulkItemResult]
+
+    @classmethod
+    def from_results(cls, results: List[BulkItemResult]) -> "BulkOperationResponse":
+        return cls(summary=dict(Counter(result.status for result in results)), results=results)
@@ -0,0 +1,256 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+# A cached GET response: the ETag it was served with and its JSON body
+CachedResponse = Tuple[str, bytes]
+
+
+class CacheBackend(ABC):
+    """
+    Byte store behind ResponseCache. Implementations only need get / set with a TTL / delete.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, keys: List[str]) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Per-process LRU with a TTL per entry. Least recently used entries are evicted past max_entries.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, keys: List[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend(CacheBackend):
+    """
+    Cache shared by every worker and replica, in Redis or anything speaking its protocol.
+    Expiry and eviction are left to the server (SET ... EX, maxmemory-policy).
+    """
+
+    def __init__(self, url: str = "", client=None, prefix: str = "swift-api:") -> None:
+        if client is None:
+            # Only needed with this backend
+            from redis.asyncio import Redis
+            client = Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+    async def delete(self, keys: List[str]) -> None:
+        if keys:
+            await self.client.delete(*[self.prefix + key for key in keys])
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_backend(name: str) -> CacheBackend:
+    """
+    Builds the backend selected by RESPONSE_CACHE_BACKEND ('memory' or 'redis').
+    """
+    name = name.lower()
+    if name == "memory":
+        return MemoryBackend(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+    elif name == "redis":
+        return RedisBackend(settings.RESPONSE_CACHE_REDIS_URL)
+
+    else:
+        raise ValueError(f"Unsupported response cache backend: {name}")
+
+
+def code_key(swift_code: str) -> str:
+    return f"code:{swift_code}"
+
+
+def country_key(country_iso2: str) -> str:
+    return f"country:{country_iso2}"
+
+
+def invalidation_keys(swift_code: str, country_iso2: str) -> List[str]:
+    """
+    Entries a write to swift_code makes stale: the code, its HQ (which lists it as a branch) and its country.
+    """
+    return [code_key(swift_code), code_key(swift_code[:8] + "XXX"), country_key(country_iso2)]
+
+
+def _pack(response: CachedResponse) -> bytes:
+    etag, body = response
+    # ETags are quoted strings without spaces, the first space separates it from the body
+    return etag.encode() + b" " + body
+
+
+def _unpack(value: bytes) -> CachedResponse:
+    etag, body = value.split(b" ", 1)
+    return etag.decode(), body
+
+
+class ResponseCache:
+    """
+    Read-through cache of serialized GET responses, disabled until a backend is configured.
+
+    Concurrent misses on the same key are single-flighted: the first request loads the response,
+    the others wait for its result instead of hitting the database too.
+    A load overlapping an invalidation of its key may have read the data from before the write:
+    it still answers the requests already waiting for it, but is neither stored nor joined by later
+    requests. Loads running in other processes (Redis backend) aren't tracked, their stale entries
+    expire after the TTL.
+    Backend failures never fail a request, they count as errors and fall back to the loader.
+    Counters are per process.
+    """
+
+    def __init__(self) -> None:
+        self.backend: Optional[CacheBackend] = None
+        self.ttl = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # In-flight loads whose key was invalidated while they ran
+        self._stale: Set[asyncio.Future] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def configure(self, backend: CacheBackend, ttl: int) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+        self.backend = None
+        self.hits = self.misses = self.errors = 0
+        self._inflight.clear()
+        self._stale.clear()
+
+    async def get_or_load(
+        self, key: str, loader: Callable[[], Awaitable[Optional[CachedResponse]]]
+    ) -> Optional[CachedResponse]:
+        """
+        Returns the cached response for key, or loads & stores it. None from the loader (not found) isn't cached.
+        """
+        try:
+            value = await self.backend.get(key)
+        except Exception:
+            self.errors += 1
+            value = None
+
+        if value is not None:
+            self.hits += 1
+            return _unpack(value)
+
+        self.misses += 1
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # shield: a cancelled waiter must not cancel the load the other requests wait for
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await loader()
+            if response is not None and future not in self._stale:
+                try:
+                    await self.backend.set(key, _pack(response), self.ttl)
+                except Exception:
+                    self.errors += 1
+            future.set_result(response)
+            return response
+
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+        except Exception as e:
+            future.set_exception(e)
+            # Marks the exception as retrieved when nobody was waiting
+            future.exception()
+            raise
+
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            self._stale.discard(future)
+
+    async def invalidate(self, keys: Iterable[str]) -> None:
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled or not keys:
+            return
+
+        # Loads started before the write must not store their result, nor serve requests arriving after it
+        for key in keys:
+            inflight = self._inflight.pop(key, None)
+            if inflight is not None:
+                self._stale.add(inflight)
+
+        try:
+            await self.backend.delete(keys)
+        except Exception:
+            # The write is already committed, a stale entry still expires after the TTL
+            self.errors += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hitRatio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+response_cache = ResponseCache()
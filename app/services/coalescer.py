@@ -0,0 +1,103 @@
+import asyncio
+from typing import AsyncIterator, Callable, Dict, Optional, Set, Tuple
+
+from app.core.database import ReadConnection
+from app.services.swift_code_reads import find_codes
+from app.services.versioning import get_version, make_etag
+
+# A resolved GET /{swift_code}: the ETag of the data it was read from and its body
+LoadedSwiftCode = Tuple[str, dict]
+
+
+class SwiftCodeLoader:
+    """
+    DataLoader-style coalescer of single-code lookups, disabled until configured.
+
+    Lookups arriving within `window` seconds (or until `max_batch` distinct codes are queued) are
+    resolved together: one connection, one `swift_code = ANY(...)` query, with the dataset
+    version read on the same connection just before. Repeated codes within a batch share one result.
+
+    A code is never attached to a batch that is already querying, so a lookup issued after
+    a committed write always sees it.
+    """
+
+    def __init__(self) -> None:
+        self.db_factory: Optional[Callable[[], AsyncIterator[ReadConnection]]] = None
+        self.window = 0.0
+        self.max_batch = 0
+        self.batches = 0
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.db_factory is not None
+
+    def configure(self, db_factory: Callable[[], AsyncIterator[ReadConnection]], window: float, max_batch: int) -> None:
+        """
+        db_factory is a get_read_db-like async generator, the loader opens one connection per batch with it.
+        """
+        self.db_factory = db_factory
+        self.window = window
+        self.max_batch = max_batch
+
+    async def close(self) -> None:
+        self._dispatch()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.db_factory = None
+        self.batches = 0
+
+    async def load(self, swift_code: str) -> Optional[LoadedSwiftCode]:
+        """
+        Resolves an uppercased code, None if it doesn't exist.
+        """
+        future = self._pending.get(swift_code)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[swift_code] = future
+
+            if len(self._pending) >= self.max_batch:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.window, self._dispatch)
+
+        # shield: a cancelled request must not fail the other requests waiting for the same code
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        task = asyncio.create_task(self._run(batch))
+        # The loop only keeps weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[str, asyncio.Future]) -> None:
+        try:
+            async for conn in self.db_factory():
+                # Version first, like the per-request path, so the ETag is never newer than the data
+                etag = make_etag(await get_version(conn))
+                found = await find_codes(conn, list(batch))
+            self.batches += 1
+
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Marks the exception as retrieved in case every waiter was cancelled
+                    future.exception()
+            return
+
+        for code, future in batch.items():
+            if not future.done():
+                future.set_result((etag, found[code]) if code in found else None)
+
+
+swift_code_loader = SwiftCodeLoader()
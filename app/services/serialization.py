@@ -0,0 +1,65 @@
+from typing import Iterable, Optional, Sequence
+
+from app.models.swift_code import SwiftCode
+
+# Columns selected by the read endpoints. Table columns (not the ORM attributes) keep the
+# statements pure Core: they return plain rows, skipping the ORM identity map and instance construction.
+_columns = SwiftCode.__table__.c
+READ_COLUMNS = (
+    _columns.swift_code,
+    _columns.bank_name,
+    _columns.address,
+    _columns.country_iso2,
+    _columns.country_name,
+    _columns.is_headquarter,
+    _columns.bank_prefix,
+)
+
+# The functions below map records straight to the camelCase shapes of the response schemas
+# (same keys, same order). They accept anything with the SwiftCode attributes: rows, snapshot
+# records or ORM instances. Values come from the database, which already enforces the schema
+# types, so they skip per-row Pydantic validation.
+
+
+def branch_dict(record) -> dict:
+    """Shape of BranchSwiftCodeResponse."""
+    return {
+        "address": record.address,
+        "bankName": record.bank_name,
+        "countryISO2": record.country_iso2,
+        "isHeadquarter": record.is_headquarter,
+        "swiftCode": record.swift_code,
+    }
+
+
+def full_branch_dict(record) -> dict:
+    """Shape of FullBranchSwiftCodeResponse."""
+    return {
+        "address": record.address,
+        "bankName": record.bank_name,
+        "countryISO2": record.country_iso2,
+        "countryName": record.country_name,
+        "isHeadquarter": record.is_headquarter,
+        "swiftCode": record.swift_code,
+    }
+
+
+def swift_code_dict(record, branch_records: Iterable = ()) -> dict:
+    """
+    Shape of GET /{swift_code}: HeadquarterSwiftCodeResponse with its branches for codes
+    ending with "XXX", FullBranchSwiftCodeResponse otherwise.
+    """
+    data = full_branch_dict(record)
+    if record.swift_code.endswith("XXX"):
+        data["branches"] = [branch_dict(branch) for branch in branch_records]
+    return data
+
+
+def country_dict(country_iso2: str, records: Sequence, next_cursor: Optional[str] = None) -> dict:
+    """Shape of CountrySwiftCodesResponse."""
+    return {
+        "countryISO2": country_iso2,
+        "countryName": records[0].country_name,  # Assuming DB consistency (potential edge case, refer to README)
+        "swiftCodes": [branch_dict(record) for record in records],
+        "nextCursor": next_cursor,
+    }
@@ -0,0 +1,351 @@
+import asyncio
+import heapq
+import logging
+import os
+import time
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from itertools import islice
+from operator import attrgetter
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.models.swift_code import SwiftCode
+from app.services.versioning import get_version
+
+if TYPE_CHECKING:
+    from app.services.snapshot_file import MappedSnapshot
+
+# Postgres advisory lock held by the worker exporting a newer snapshot file
+EXPORT_LOCK_KEY = 0x534E415053484F54
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SwiftCodeRecord:
+    """
+    Plain, immutable copy of a SwiftCode row.
+
+    Attribute names match the ORM model, so the response schemas
+    (from_attributes=True) validate it exactly like a SwiftCode instance.
+    """
+    swift_code: str
+    bank_name: str
+    address: Optional[str]
+    country_iso2: str
+    country_name: str
+    is_headquarter: bool
+
+    @classmethod
+    def from_model(cls, record: SwiftCode) -> "SwiftCodeRecord":
+        return cls(
+            swift_code=record.swift_code,
+            bank_name=record.bank_name,
+            address=record.address,
+            country_iso2=record.country_iso2,
+            country_name=record.country_name,
+            is_headquarter=record.is_headquarter,
+        )
+
+
+class SwiftCodeSnapshot:
+    """
+    In-process, read-through copy of the swift_codes table.
+
+    Keeps three structures in sync:
+        - a dict keyed by SWIFT code for single lookups,
+        - a sorted list of codes, so HQ -> branch expansion is a bisect on the 8-char bank prefix,
+        - a per-country bucket of sorted codes for country listings.
+
+    With map_file, the table is served from a memory-mapped snapshot file shared by every worker
+    instead (see app.services.snapshot_file): the structures above then only hold the records
+    written by this process, overlaid on the file, and a newer file replaces the mapped one.
+    """
+
+    def __init__(self) -> None:
+        self.loaded = False
+        # Dataset version the contents correspond to, writers set it after updating the snapshot
+        self._version = 0
+        self._by_code: Dict[str, SwiftCodeRecord] = {}
+        self._sorted_codes: List[str] = []
+        self._by_country: Dict[str, List[str]] = {}
+        # File mode: mapped file, codes of the file hidden by local writes, seconds between checks for a newer file
+        self._file: Optional["MappedSnapshot"] = None
+        self._file_path = ""
+        self._shadowed: Set[str] = set()
+        self._check_interval = 0.0
+        self._checked_at = 0.0
+
+    @property
+    def version(self) -> int:
+        self._follow_file()
+        return self._version
+
+    @version.setter
+    def version(self, version: int) -> None:
+        self._version = version
+
+    @property
+    def file_version(self) -> Optional[int]:
+        """
+        Dataset version of the mapped snapshot file, None outside file mode.
+        """
+        self._follow_file()
+        return self._file.version if self._file is not None else None
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    def advance(self, version: int) -> None:
+        """
+        Records the dataset version of a local write, called after updating the snapshot.
+        Only a version directly following the snapshot's is taken: a gap means another process
+        wrote in between, the version then stays behind so the next check reloads the snapshot.
+        """
+        if version == self.version + 1:
+            self._version = version
+
+    async def load(self, session: AsyncSession) -> int:
+        """
+        Replaces the snapshot contents with the current state of the table.
+        Returns the number of loaded records.
+        """
+        version = await get_version(session)
+        result = await session.execute(select(SwiftCode))
+        records = [SwiftCodeRecord.from_model(row) for row in result.scalars()]
+
+        by_code = {record.swift_code: record for record in records}
+        by_country: Dict[str, List[str]] = {}
+        for code in sorted(by_code):
+            by_country.setdefault(by_code[code].country_iso2, []).append(code)
+
+        # Swap everything at once, readers never see a half-built index
+        self._by_code, self._sorted_codes, self._by_country = by_code, sorted(by_code), by_country
+        self._close_file()
+        self._version = version
+        self.loaded = True
+        return len(records)
+
+    def map_file(self, path: str, check_interval: float = 1.0) -> int:
+        """
+        Serves the snapshot file at path, checking at most every check_interval seconds whether
+        a newer file was renamed over it. Returns the number of records in the file.
+        """
+        # Deferred import, snapshot_file builds on SwiftCodeRecord
+        from app.services.snapshot_file import MappedSnapshot
+
+        mapped = MappedSnapshot(path)
+        if self._file is None or mapped.version >= self._version:
+            # The file includes every local write, drop the overlay
+            self._by_code, self._sorted_codes, self._by_country, self._shadowed = {}, [], {}, set()
+            self._version = mapped.version
+
+        previous, self._file = self._file, mapped
+        if previous is not None:
+            # Reads decode what they return right away, nothing references the old mapping
+            previous.close()
+        self._file_path, self._check_interval, self._checked_at = path, check_interval, time.monotonic()
+        self.loaded = True
+        return len(mapped)
+
+    def _follow_file(self) -> None:
+        if self._file is None or time.monotonic() - self._checked_at < self._check_interval:
+            return
+
+        self._checked_at = time.monotonic()
+        try:
+            stat = os.stat(self._file_path)
+        except FileNotFoundError:
+            # Keep serving the mapped version
+            return
+        if (stat.st_dev, stat.st_ino, stat.st_mtime_ns) != self._file.identity:
+            self.map_file(self._file_path, self._check_interval)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file, self._file_path, self._shadowed = None, "", set()
+
+    def clear(self) -> None:
+        self.loaded = False
+        self._version = 0
+        self._by_code, self._sorted_codes, self._by_country = {}, [], {}
+        self._close_file()
+
+    def get(self, swift_code: str) -> Optional[SwiftCodeRecord]:
+        self._follow_file()
+        swift_code = swift_code.upper()
+        record = self._by_code.get(swift_code)
+        if record is not None or self._file is None or swift_code in self._shadowed:
+            return record
+        return self._file.get(swift_code)
+
+    def branches(self, swift_code: str) -> List[SwiftCodeRecord]:
+        """
+        Returns every record sharing the first 8 characters of swift_code, except the code itself.
+        """
+        self._follow_file()
+        swift_code = swift_code.upper()
+        prefix = swift_code[:8]
+        branches = []
+        idx = bisect_left(self._sorted_codes, prefix)
+        while idx < len(self._sorted_codes) and self._sorted_codes[idx].startswith(prefix):
+            code = self._sorted_codes[idx]
+            if code != swift_code:
+                branches.append(self._by_code[code])
+            idx += 1
+
+        if self._file is not None:
+            branches.extend(
+                record for record in self._file.branches(swift_code) if record.swift_code not in self._shadowed
+            )
+            branches.sort(key=attrgetter("swift_code"))
+        return branches
+
+    def by_country(
+        self, country_iso2: str, after: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[SwiftCodeRecord]:
+        """
+        Returns the country's records ordered by code, optionally only codes greater than
+        `after` and at most `limit` of them (same keyset semantics as the paginated query).
+        """
+        self._follow_file()
+        country_iso2 = country_iso2.upper()
+        after = after.upper() if after else None
+        codes = self._by_country.get(country_iso2, [])
+        start = bisect_right(codes, after) if after else 0
+        if self._file is None:
+            end = start + limit if limit is not None else len(codes)
+            return [self._by_code[code] for code in codes[start:end]]
+
+        local = (self._by_code[code] for code in codes[start:])
+        mapped = (
+            record for record in self._file.iter_country(country_iso2, after)
+            if record.swift_code not in self._shadowed
+        )
+        return list(islice(heapq.merge(local, mapped, key=attrgetter("swift_code")), limit))
+
+    def add(self, record: SwiftCode) -> None:
+        """
+        Inserts (or replaces) a record, called after a successful write to the database.
+        """
+        snapshot_record = SwiftCodeRecord.from_model(record)
+        code = snapshot_record.swift_code
+        if code in self._by_code:
+            self.discard(code)
+
+        self._by_code[code] = snapshot_record
+        insort(self._sorted_codes, code)
+        insort(self._by_country.setdefault(snapshot_record.country_iso2, []), code)
+        if self._file is not None:
+            self._shadowed.add(code)
+
+    def discard(self, swift_code: str) -> None:
+        """
+        Removes a record if present, called after a successful delete in the database.
+        """
+        swift_code = swift_code.upper()
+        if self._file is not None:
+            self._shadowed.add(swift_code)
+
+        record = self._by_code.pop(swift_code, None)
+        if record is None:
+            return
+
+        self._sorted_codes.pop(bisect_left(self._sorted_codes, record.swift_code))
+        country_codes = self._by_country[record.country_iso2]
+        country_codes.pop(bisect_left(country_codes, record.swift_code))
+        if not country_codes:
+            del self._by_country[record.country_iso2]
+
+
+# Shared by the whole process, filled in the app lifespan when SNAPSHOT_ENABLED is set
+snapshot = SwiftCodeSnapshot()
+
+
+class SnapshotFollower:
+    """
+    Keeps a snapshot in step with writes made outside this process (other workers, `swift-ingest`
+    seeds & reloads): every interval seconds it compares dataset_versions with the snapshot.
+
+    In memory, the snapshot is reloaded when the versions differ. In file mode, the writes of the API
+    workers only reach their own overlay: once the version moves past the mapped file's, one worker
+    re-exports the file under a Postgres advisory lock, and every worker maps it after the rename.
+    """
+
+    def __init__(self, snapshot: SwiftCodeSnapshot) -> None:
+        self.snapshot = snapshot
+        self.reloads = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def configure(self, db_factory: Callable[[], AsyncIterator[AsyncSession]], interval: float) -> None:
+        """
+        db_factory is a get_db-like async generator, each check opens one session with it.
+        """
+        self._task = asyncio.create_task(self._poll(db_factory, interval))
+
+    async def check(self, db_factory: Callable[[], AsyncIterator[AsyncSession]]) -> bool:
+        """
+        One check, returns whether the snapshot was reloaded (or its file exported).
+        """
+        count = None
+        # Runs the generator to its end, so the session closes before returning
+        async for session in db_factory():
+            # A single-row read, the full load only runs when another process wrote
+            version = await get_version(session)
+            file_version = self.snapshot.file_version
+            if file_version is not None:
+                if version > file_version:
+                    count = await self._export(session.bind)
+            elif version != self.snapshot.version:
+                count = await self.snapshot.load(session)
+            if count is not None:
+                # Counted with the swap, closing the session yields to readers already served the new copy
+                self.reloads += 1
+        if count is None:
+            return False
+        logger.info("Reloaded %d SWIFT codes into the snapshot, the dataset changed", count)
+        return True
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self.reloads = 0
+
+    async def _export(self, db_engine: AsyncEngine) -> Optional[int]:
+        """
+        Exports the snapshot file unless another worker holds the export lock. Returns the number of
+        exported codes, None when skipped.
+        """
+        # Deferred import, snapshot_export builds on this module
+        from app.ingestion.snapshot_export import export_snapshot
+
+        # Session-level lock, held by this connection until unlocked (or closed) after the export
+        async with db_engine.connect() as lock_conn:
+            lock_args = {"key": EXPORT_LOCK_KEY}
+            if not await lock_conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), lock_args):
+                return None
+            try:
+                count = await export_snapshot(db_engine, self.snapshot.file_path)
+            finally:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), lock_args)
+        # Mapped by every worker, this one included, on their next read after the rename
+        return count
+
+    async def _poll(self, db_factory: Callable[[], AsyncIterator[AsyncSession]], interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.check(db_factory)
+            except Exception:
+                # Keep serving the current copy, the next check may succeed
+                logger.exception("Snapshot version check failed")
+
+
+snapshot_follower = SnapshotFollower(snapshot)
@@ -0,0 +1,234 @@
+"""
+Compact binary snapshot of swift_codes, memory-mapped by every API worker of a host.
+
+Layout (little-endian), sections following each other without padding:
+    - HEADER: magic, format version, dataset version, record / country counts, string pool size
+    - keys: the SWIFT codes, sorted, 11 ASCII bytes each (8-character codes padded with spaces), binary-searched in place
+    - records: one RECORD per key (same order), offsets & lengths of its strings in the pool
+    - members: per country, the indexes of its records in code order (uint32 each)
+    - countries: one COUNTRY per country ISO2, sorted, with its range in members
+    - pool: deduplicated UTF-8 strings (bank names, addresses, country names)
+
+Workers share one page-cache copy of the file, lookups only decode the records they return.
+A new version is written to a temporary file renamed over the old one, mapped files stay valid.
+"""
+import mmap
+import os
+import struct
+import tempfile
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.services.snapshot import SwiftCodeRecord
+
+MAGIC = b"SWIFTSNP"
+FORMAT_VERSION = 1
+KEY_SIZE = 11
+
+HEADER = struct.Struct("<8sIQIII")
+# bank name, address, country name (pool offset, length) pairs, country ISO2, is_headquarter
+RECORD = struct.Struct("<IIIIII2s?x")
+# Country ISO2, [start, end) range in members
+COUNTRY = struct.Struct("<2sxxII")
+MEMBER = struct.Struct("<I")
+
+# Pool offset of a NULL address
+NULL_OFFSET = 0xFFFFFFFF
+
+
+def pad_key(swift_code: str) -> bytes:
+    """
+    Fixed-width key of a code. Spaces sort before digits & letters, so padded keys keep the order of the codes.
+    """
+    return swift_code.encode().ljust(KEY_SIZE)
+
+
+def write_snapshot_file(path: str, records: Iterable[SwiftCodeRecord], version: int) -> int:
+    """
+    Writes records as a snapshot file of the given dataset version, atomically replacing path.
+    Returns the number of written records.
+    """
+    records = sorted(records, key=lambda record: record.swift_code)
+    pool = bytearray()
+    interned: Dict[str, Tuple[int, int]] = {}
+
+    def intern(value: Optional[str]) -> Tuple[int, int]:
+        if value is None:
+            return NULL_OFFSET, 0
+        if value not in interned:
+            encoded = value.encode()
+            interned[value] = (len(pool), len(encoded))
+            pool.extend(encoded)
+        return interned[value]
+
+    keys = bytearray()
+    packed = bytearray()
+    by_country: Dict[str, List[int]] = {}
+    for index, record in enumerate(records):
+        key = pad_key(record.swift_code)
+        if len(key) != KEY_SIZE:
+            raise ValueError(f"SWIFT code {record.swift_code!r} is longer than {KEY_SIZE} characters")
+        keys.extend(key)
+        packed.extend(RECORD.pack(
+            *intern(record.bank_name), *intern(record.address), *intern(record.country_name),
+            record.country_iso2.encode("ascii"), record.is_headquarter
+        ))
+        by_country.setdefault(record.country_iso2, []).append(index)
+
+    members = bytearray()
+    countries = bytearray()
+    for country_iso2 in sorted(by_country):
+        start = len(members) // MEMBER.size
+        members.extend(b"".join(MEMBER.pack(index) for index in by_country[country_iso2]))
+        countries.extend(COUNTRY.pack(country_iso2.encode("ascii"), start, start + len(by_country[country_iso2])))
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            sink.write(HEADER.pack(MAGIC, FORMAT_VERSION, version, len(records), len(by_country), len(pool)))
+            for section in (keys, packed, members, countries, pool):
+                sink.write(section)
+            sink.flush()
+            os.fsync(sink.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(records)
+
+
+class _CountryKeys:
+    """
+    Sequence of the keys of one country's members, for bisect.
+    """
+
+    def __init__(self, snapshot: "MappedSnapshot", members: range) -> None:
+        self._snapshot = snapshot
+        self._members = members
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __getitem__(self, position: int) -> bytes:
+        return self._snapshot.key(self._snapshot.member(self._members[position]))
+
+
+class MappedSnapshot:
+    """
+    Read-only view of a snapshot file, with the lookups of SwiftCodeSnapshot. Codes must be upper case.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as source:
+            stat = os.fstat(source.fileno())
+            self._map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        # Identity of the mapped file, a rename over path changes it
+        self.identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+
+        magic, format_version, self.version, self.count, country_count, pool_size = HEADER.unpack_from(self._map)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} SWIFT code snapshot")
+
+        self._keys_offset = HEADER.size
+        self._records_offset = self._keys_offset + self.count * KEY_SIZE
+        self._members_offset = self._records_offset + self.count * RECORD.size
+        countries_offset = self._members_offset + self.count * MEMBER.size
+        self._pool_offset = countries_offset + country_count * COUNTRY.size
+
+        # A few hundred entries at most, kept as a dict
+        self._countries: Dict[str, range] = {}
+        for position in range(country_count):
+            country_iso2, start, end = COUNTRY.unpack_from(self._map, countries_offset + position * COUNTRY.size)
+            self._countries[country_iso2.decode()] = range(start, end)
+        # Decoded country names by pool offset, every record of a country shares one
+        self._country_names: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        self._map.close()
+
+    def key(self, index: int) -> bytes:
+        offset = self._keys_offset + index * KEY_SIZE
+        return self._map[offset:offset + KEY_SIZE]
+
+    def member(self, position: int) -> int:
+        return MEMBER.unpack_from(self._map, self._members_offset + position * MEMBER.size)[0]
+
+    def find(self, key: bytes) -> int:
+        """
+        Index of the first key >= key (bisect_left), inlined: it runs for every lookup.
+        """
+        data, offset = self._map, self._keys_offset
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            start = offset + middle * KEY_SIZE
+            if data[start:start + KEY_SIZE] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def record(self, index: int) -> SwiftCodeRecord:
+        data, pool = self._map, self._pool_offset
+        (bank_offset, bank_length, address_offset, address_length,
+         country_offset, country_length, country_iso2, is_headquarter) = RECORD.unpack_from(
+            data, self._records_offset + index * RECORD.size
+        )
+        country_name = self._country_names.get(country_offset)
+        if country_name is None:
+            country_name = self._country_names[country_offset] = str(
+                data[pool + country_offset:pool + country_offset + country_length], "utf-8"
+            )
+        key_offset = self._keys_offset + index * KEY_SIZE
+
+        # Bypasses the frozen dataclass __init__ (one object.__setattr__ per field), a third of the decoding time
+        record = object.__new__(SwiftCodeRecord)
+        record.__dict__.update(
+            swift_code=str(data[key_offset:key_offset + KEY_SIZE], "ascii").rstrip(),
+            bank_name=str(data[pool + bank_offset:pool + bank_offset + bank_length], "utf-8"),
+            address=None if address_offset == NULL_OFFSET else str(
+                data[pool + address_offset:pool + address_offset + address_length], "utf-8"
+            ),
+            country_iso2=str(country_iso2, "ascii"),
+            country_name=country_name,
+            is_headquarter=is_headquarter,
+        )
+        return record
+
+    def get(self, swift_code: str) -> Optional[SwiftCodeRecord]:
+        key = pad_key(swift_code)
+        index = self.find(key)
+        if index < self.count and self.key(index) == key:
+            return self.record(index)
+        return None
+
+    def branches(self, swift_code: str) -> List[SwiftCodeRecord]:
+        """
+        Every record sharing the first 8 characters of swift_code, except the code itself.
+        """
+        key = pad_key(swift_code)
+        prefix = key[:8]
+        branches = []
+        index = self.find(prefix)
+        while index < self.count and (code := self.key(index)).startswith(prefix):
+            if code != key:
+                branches.append(self.record(index))
+            index += 1
+        return branches
+
+    def iter_country(self, country_iso2: str, after: Optional[str] = None) -> Iterator[SwiftCodeRecord]:
+        """
+        The country's records in code order, only codes greater than `after` if given.
+        """
+        members = self._countries.get(country_iso2)
+        if members is None:
+            return
+        start = bisect_right(_CountryKeys(self, members), pad_key(after)) if after else 0
+        for position in members[start:]:
+            yield self.record(self.member(position))
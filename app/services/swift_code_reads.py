@@ -0,0 +1,144 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import Row, Select, String, any_, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.core.database import ReadConnection
+from app.models.swift_code import SwiftCode
+from app.services.serialization import READ_COLUMNS, swift_code_dict
+
+# Read queries are built on the Table, not the mapped class, so they compile & execute as plain Core
+swift_codes = SwiftCode.__table__
+
+
+async def find_code(db: ReadConnection, swift_code: str) -> Optional[dict]:
+    """
+    GET /{swift_code} body of an uppercased code, None if it doesn't exist.
+    """
+    if swift_code.endswith("XXX"):
+        # HQ and its branches share bank_prefix, so one indexed query resolves both
+        query = (
+            select(*READ_COLUMNS)
+            .where(swift_codes.c.bank_prefix == swift_code[:8])
+            .order_by(swift_codes.c.swift_code)
+        )
+        result = await db.execute(query)
+        prefix_records = result.all()
+        record = next((r for r in prefix_records if r.swift_code == swift_code), None)
+        branch_records = [r for r in prefix_records if r.swift_code != swift_code]
+
+    else:
+        query = select(*READ_COLUMNS).where(swift_codes.c.swift_code == swift_code)
+        result = await db.execute(query)
+        record = result.one_or_none()
+        branch_records = []
+
+    if not record:
+        return None
+
+    return swift_code_dict(record, branch_records)
+
+
+async def find_codes(db: ReadConnection, codes: List[str]) -> Dict[str, dict]:
+    """
+    Resolves many uppercased codes in one round trip: the requested codes, plus every code
+    sharing a bank_prefix with a requested HQ.
+
+    Returns swift_code -> GET /{swift_code} body for the codes that exist.
+    """
+    if not codes:
+        return {}
+
+    hq_prefixes = [code[:8] for code in codes if code.endswith("XXX")]
+    query = (
+        select(*READ_COLUMNS)
+        .where(or_(
+            swift_codes.c.swift_code == any_(literal(codes, ARRAY(String))),
+            swift_codes.c.bank_prefix == any_(literal(hq_prefixes, ARRAY(String)))
+        ))
+        .order_by(swift_codes.c.swift_code)
+    )
+    result = await db.execute(query)
+    rows = result.all()
+
+    records = {row.swift_code: row for row in rows}
+    by_prefix = defaultdict(list)
+    for row in rows:
+        by_prefix[row.bank_prefix].append(row)
+
+    found = {}
+    for code in codes:
+        record = records.get(code)
+        if record is None:
+            continue
+        branches = [row for row in by_prefix[code[:8]] if row.swift_code != code] if code.endswith("XXX") else ()
+        found[code] = swift_code_dict(record, branches)
+    return found
+
+
+def country_codes_query(country_iso2: str) -> Select:
+    """
+    A country's codes ordered by SWIFT code, served by the (country_iso2, swift_code) index.
+    """
+    return (
+        select(*READ_COLUMNS)
+        .where(swift_codes.c.country_iso2 == country_iso2)
+        .order_by(swift_codes.c.swift_code)
+    )
+
+
+async def find_country_codes(
+    db: ReadConnection, country_iso2: str, after: Optional[str] = None, limit: Optional[int] = None
+) -> Sequence[Row]:
+    """
+    A country's codes, optionally only those after a cursor code and at most limit of them.
+    """
+    query = country_codes_query(country_iso2)
+    # Keyset pagination, no OFFSET scans
+    if after:
+        query = query.where(swift_codes.c.swift_code > after.upper())
+    if limit is not None:
+        query = query.limit(limit)
+    result = await db.execute(query)
+    return result.all()
+
+
+def search_query(
+    bank_name: Optional[str] = None,
+    code_prefix: Optional[str] = None,
+    country_iso2: Optional[str] = None,
+    town_name: Optional[str] = None,
+    limit: int = 20,
+) -> Select:
+    """
+    Typeahead search, every given criterion must match.
+
+    bank_name is matched fuzzily with pg_trgm word similarity (`bank_name %> :name`, case-insensitive,
+    tolerates typos and partial words) through the trigram GIN index, best matches first.
+    code_prefix is an uppercased alphanumeric prefix, matched with LIKE 'prefix%' on the text_pattern_ops index.
+    """
+    query = select(*READ_COLUMNS)
+    if code_prefix:
+        query = query.where(swift_codes.c.swift_code.like(f"{code_prefix}%"))
+    if country_iso2:
+        query = query.where(swift_codes.c.country_iso2 == country_iso2)
+    if town_name:
+        query = query.where(swift_codes.c.town_name == town_name)
+
+    if bank_name:
+        query = query.where(swift_codes.c.bank_name.op("%>")(bank_name)).order_by(
+            func.word_similarity(bank_name, swift_codes.c.bank_name).desc(), swift_codes.c.swift_code
+        )
+    else:
+        query = query.order_by(swift_codes.c.swift_code)
+
+    return query.limit(limit)
+
+
+async def search_codes(db: ReadConnection, **criteria) -> Sequence[Row]:
+    """
+    Runs search_query with the given criteria.
+    """
+    result = await db.execute(search_query(**criteria))
+    return result.all()
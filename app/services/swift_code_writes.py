@@ -0,0 +1,107 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import String, any_, delete, literal
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.swift_code import SwiftCode
+from app.schemas.swift_code import SwiftCodeCreate
+
+# 6 columns per row keeps one statement below Postgres' 32767 bind parameter limit
+INSERT_CHUNK_SIZE = 5000
+
+
+def entry_error(entry: SwiftCodeCreate) -> Optional[str]:
+    """
+    Checks a new entry against the SWIFT code rules.
+    Returns the message of the first violated rule, or None if the entry is valid.
+    """
+    swift = entry.swiftCode
+    if swift != swift.upper():
+        return "A SWIFT code must be uppercase."
+
+    if entry.isHeadquarter and not swift.endswith("XXX"):
+        return "For a headquarter entry, the swiftCode must end with 'XXX'."
+
+    if not re.fullmatch(r'[A-Z0-9]+', swift):
+        return "SWIFT code must contain only uppercase letters and digits (A-Z, 0-9)."
+
+    # Mirrors the table constraints, so one bad entry can't fail a whole multi-row insert
+    if not 8 <= len(swift) <= 11:
+        return "SWIFT code must be 8 to 11 characters."
+
+    if len(entry.countryISO2) != 2:
+        return "countryISO2 must be 2 characters."
+
+    if not entry.bankName.strip() or not entry.countryName.strip():
+        return "bankName and countryName must not be empty."
+
+    if len(entry.bankName) > 255 or len(entry.address or "") > 255 or len(entry.countryName) > 100:
+        return "bankName and address are limited to 255 characters, countryName to 100."
+
+    return None
+
+
+def parse_entry(item: Any) -> Tuple[Optional[SwiftCodeCreate], Optional[str]]:
+    """
+    Validates one raw bulk entry into a SwiftCodeCreate, then against the SWIFT code rules.
+    Returns the entry (None if its shape is wrong) and the error message, None if it is valid.
+    """
+    try:
+        entry = SwiftCodeCreate.model_validate(item)
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(map(str, error['loc'])) or 'entry'}: {error['msg']}" for error in e.errors()
+        )
+    return entry, entry_error(entry)
+
+
+def to_row(entry: SwiftCodeCreate) -> dict:
+    return {
+        "swift_code": entry.swiftCode,
+        "bank_name": entry.bankName,
+        "address": entry.address,
+        "country_iso2": entry.countryISO2.upper(),
+        "country_name": entry.countryName.upper(),
+        "is_headquarter": entry.isHeadquarter,
+    }
+
+
+async def insert_entries(db: AsyncSession, entries: Sequence[SwiftCodeCreate]) -> Dict[str, int]:
+    """
+    Inserts validated entries with multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING statements.
+
+    Returns swift_code -> id of the created rows, codes that already existed are left out.
+    Doesn't commit, the caller owns the transaction.
+    """
+    created = {}
+    rows = [to_row(entry) for entry in entries]
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        stmt = (
+            insert(SwiftCode)
+            .values(rows[start:start + INSERT_CHUNK_SIZE])
+            .on_conflict_do_nothing(index_elements=[SwiftCode.swift_code])
+            .returning(SwiftCode.swift_code, SwiftCode.id)
+        )
+        result = await db.execute(stmt)
+        created.update(result.tuples().all())
+    return created
+
+
+async def delete_codes(db: AsyncSession, codes: List[str]) -> Dict[str, str]:
+    """
+    Deletes the given codes with one DELETE ... WHERE swift_code = ANY(:codes) RETURNING.
+    Returns swift_code -> country_iso2 of the codes that existed and were deleted. Doesn't commit.
+    """
+    if not codes:
+        return {}
+
+    stmt = (
+        delete(SwiftCode)
+        .where(SwiftCode.swift_code == any_(literal(codes, ARRAY(String))))
+        .returning(SwiftCode.swift_code, SwiftCode.country_iso2)
+    )
+    result = await db.execute(stmt)
+    return dict(result.tuples().all())
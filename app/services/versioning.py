@@ -0,0 +1,53 @@
+from typing import Optional, Union
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.models.dataset_version import DatasetVersion
+
+# Scope of the swift_codes table in dataset_versions
+SWIFT_CODES_SCOPE = "swift_codes"
+
+
+async def get_version(db: Union[AsyncSession, AsyncConnection], scope: str = SWIFT_CODES_SCOPE) -> int:
+    """
+    Returns the current version of a dataset, 0 if it was never written to.
+    """
+    result = await db.execute(select(DatasetVersion.version).where(DatasetVersion.scope == scope))
+    return result.scalar_one_or_none() or 0
+
+
+async def bump_version(db: Union[AsyncSession, AsyncConnection], scope: str = SWIFT_CODES_SCOPE) -> int:
+    """
+    Increments the version of a dataset and returns the new value.
+    Call it inside the writing transaction, so the new version commits together with the data.
+    """
+    stmt = insert(DatasetVersion).values(scope=scope, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DatasetVersion.scope],
+        set_={"version": DatasetVersion.version + 1}
+    ).returning(DatasetVersion.version)
+    result = await db.execute(stmt)
+    return result.scalar_one()
+
+
+def make_etag(version: int) -> str:
+    """
+    Strong ETag of a representation built from the given dataset version.
+    """
+    return f'"v{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluates an If-None-Match header (RFC 9110 weak comparison) against the current ETag.
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
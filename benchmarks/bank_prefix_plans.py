@@ -0,0 +1,119 @@
+"""
+Compares the query plans of the old HQ lookup (exact match + LIKE 'prefix%' branch scan)
+with the bank_prefix lookup (one indexed equality query).
+
+The synthetic directory is built in a TEMPORARY copy of swift_codes, so the benchmark
+can be pointed at any database without touching real data:
+
+    poetry run python -m benchmarks.bank_prefix_plans --rows 500000 --branches 20
+"""
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+
+CREATE_TABLE = "CREATE TEMPORARY TABLE bench_swift_codes (LIKE swift_codes INCLUDING ALL)"
+
+# Every bank gets one HQ (XXX) and `branches` branch codes with the same 8-char prefix
+SEED_ROWS = """
+INSERT INTO bench_swift_codes (swift_code, bank_name, address, country_iso2, country_name, is_headquarter)
+SELECT
+    prefix || CASE WHEN branch = 0 THEN 'XXX' ELSE lpad(branch::text, 3, '0') END,
+    'BENCH BANK ' || bank,
+    'BENCH STREET ' || branch,
+    'PL',
+    'POLAND',
+    branch = 0
+FROM (
+    SELECT bank, upper(substr(md5(bank::text), 1, 4)) || 'PL' || upper(substr(md5(bank::text), 5, 2)) AS prefix
+    FROM generate_series(1, :banks) AS bank
+) banks
+CROSS JOIN generate_series(0, :branches) AS branch
+ON CONFLICT DO NOTHING
+"""
+
+BEFORE_QUERIES = [
+    "SELECT * FROM bench_swift_codes WHERE swift_code = :code",
+    "SELECT * FROM bench_swift_codes WHERE swift_code LIKE :prefix || '%' AND swift_code != :code",
+]
+AFTER_QUERIES = [
+    "SELECT * FROM bench_swift_codes WHERE bank_prefix = :prefix ORDER BY swift_code",
+]
+
+
+def summarize_plan(plan: dict) -> dict:
+    """
+    Reduces EXPLAIN (FORMAT JSON) output to the node types and timings worth comparing.
+    """
+    nodes = []
+    stack = [plan["Plan"]]
+    while stack:
+        node = stack.pop()
+        nodes.append(node["Node Type"] + (f" on {node['Index Name']}" if "Index Name" in node else ""))
+        stack.extend(node.get("Plans", []))
+
+    return {
+        "nodes": nodes,
+        "planning_ms": plan["Planning Time"],
+        "execution_ms": plan["Execution Time"],
+        "buffers_hit": plan["Plan"].get("Shared Hit Blocks", 0) + plan["Plan"].get("Local Hit Blocks", 0),
+    }
+
+
+async def explain(conn, queries: list[str], params: dict) -> list[dict]:
+    plans = []
+    for query in queries:
+        result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"), params)
+        plans.append({"query": query, **summarize_plan(result.scalar()[0])})
+    return plans
+
+
+async def run(rows: int, branches: int) -> dict:
+    engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        async with engine.connect() as conn:
+            # With a "C" collation the LIKE can use the unique index, with any other it can't
+            collation = (await conn.execute(text(
+                "SELECT datcollate FROM pg_database WHERE datname = current_database()"
+            ))).scalar_one()
+            await conn.execute(text(CREATE_TABLE))
+            await conn.execute(text(SEED_ROWS), {"banks": max(rows // (branches + 1), 1), "branches": branches})
+            await conn.execute(text("ANALYZE bench_swift_codes"))
+
+            code = (await conn.execute(text(
+                "SELECT swift_code FROM bench_swift_codes WHERE is_headquarter ORDER BY swift_code OFFSET 42 LIMIT 1"
+            ))).scalar_one()
+            params = {"code": code, "prefix": code[:8]}
+
+            before = await explain(conn, BEFORE_QUERIES, params)
+            after = await explain(conn, AFTER_QUERIES, params)
+            await conn.rollback()
+    finally:
+        await engine.dispose()
+
+    return {
+        "rows": rows,
+        "collation": collation,
+        "hq_code": code,
+        "before": before,
+        "after": after,
+        "before_total_ms": sum(plan["execution_ms"] for plan in before),
+        "after_total_ms": sum(plan["execution_ms"] for plan in after),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="approximate number of synthetic rows")
+    parser.add_argument("--branches", type=int, default=10, help="branches per HQ")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.rows, args.branches)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+HTTP load test of the API under a mixed workload: single code lookups, HQ lookups with many
+branches, country listings and writes (a create followed by the delete of the same code).
+
+Runs the app in-process through httpx's ASGITransport (like the tests, no network) or as a real
+uvicorn server (--target uvicorn, optionally with several --workers), configured from the
+environment / .env like a deployment. Reports requests per second and p50 / p95 / p99 latency per
+endpoint as JSON, and exits with status 1 when an endpoint regressed by more than --threshold
+against a --baseline report (latency up, throughput down, or new errors):
+
+    poetry run python -m benchmarks.http_load --rows 50000 --requests 5000 --output baseline.json
+    poetry run python -m benchmarks.http_load --target uvicorn --workers 2 --baseline baseline.json
+
+The dataset is generated in the swift_codes table of --database-url, which is REPLACED: the
+default is TEST_DATABASE_URL, never point it at real data. --skip-seed reuses the current rows.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+import httpx
+from asgi_lifespan import LifespanManager
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.database import Base, ReadConnection, get_db, get_read_db, make_engine
+from app.main import create_app
+
+# Relative weight of each operation, a 'write' is timed as one create and one delete
+WORKLOAD = {"lookup": 60, "hq_lookup": 15, "country": 15, "write": 10}
+COUNTRIES = ["DE", "PL", "FR", "US", "GB", "IT", "ES", "NL"]
+# Latency metrics compared with the baseline, higher is worse
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+# `big_banks` banks get `hq_branches` branches, every other bank `branches`, codes follow the BIC layout
+SEED_ROWS = """
+INSERT INTO swift_codes (swift_code, bank_name, address, country_iso2, country_name, is_headquarter, town_name)
+SELECT
+    prefix || CASE WHEN branch = 0 THEN 'XXX' ELSE lpad(branch::text, 3, '0') END,
+    'BENCH BANK ' || bank,
+    'BENCH STREET ' || branch,
+    country,
+    'COUNTRY ' || country,
+    branch = 0,
+    'TOWN ' || bank % 50
+FROM (
+    SELECT
+        bank,
+        country,
+        upper(substr(md5(bank::text), 1, 4)) || country || upper(substr(md5(bank::text), 5, 2)) AS prefix
+    FROM generate_series(1, :banks) AS bank
+    CROSS JOIN LATERAL (SELECT (CAST(:countries AS text[]))[1 + bank % 8] AS country) countries
+) banks
+CROSS JOIN LATERAL generate_series(
+    0, CASE WHEN bank <= CAST(:big_banks AS int) THEN CAST(:hq_branches AS int) ELSE CAST(:branches AS int) END
+) AS branch
+ON CONFLICT DO NOTHING
+"""
+
+HQ_CODES = """
+SELECT swift_code FROM swift_codes
+WHERE is_headquarter AND bank_prefix IN (
+    SELECT bank_prefix FROM swift_codes GROUP BY bank_prefix HAVING count(*) > :min_branches
+)
+"""
+
+
+@dataclass
+class Dataset:
+    codes: List[str]
+    # Headquarters with at least --hq-branches / 2 branches
+    hq_codes: List[str]
+    countries: List[str]
+
+
+async def seed_dataset(db_engine: AsyncEngine, rows: int, hq_branches: int, branches: int = 4, big_banks: int = 20) -> int:
+    """
+    Replaces the contents of swift_codes with about `rows` synthetic codes. Returns the number of codes.
+    """
+    big_banks = min(big_banks, max(rows // (hq_branches + 1) // 2, 1))
+    banks = big_banks + max(rows - big_banks * (hq_branches + 1), 0) // (branches + 1)
+
+    async with db_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text("TRUNCATE TABLE swift_codes RESTART IDENTITY"))
+        await conn.execute(text(SEED_ROWS), {
+            "banks": banks, "big_banks": big_banks, "hq_branches": hq_branches, "branches": branches,
+            "countries": COUNTRIES,
+        })
+        await conn.execute(text("ANALYZE swift_codes"))
+        return (await conn.execute(text("SELECT count(*) FROM swift_codes"))).scalar()
+
+
+async def load_dataset(db_engine: AsyncEngine, hq_branches: int) -> Dataset:
+    async with db_engine.connect() as conn:
+        codes = (await conn.execute(text("SELECT swift_code FROM swift_codes"))).scalars().all()
+        hq_codes = (await conn.execute(text(HQ_CODES), {"min_branches": hq_branches // 2})).scalars().all()
+        countries = (await conn.execute(text("SELECT DISTINCT country_iso2 FROM swift_codes"))).scalars().all()
+    if not codes:
+        raise SystemExit("swift_codes is empty, run without --skip-seed")
+    return Dataset(codes=list(codes), hq_codes=list(hq_codes) or list(codes), countries=sorted(countries))
+
+
+def summarize(latencies: List[float], errors: int, wall: float) -> dict:
+    # quantiles needs two samples
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [latencies[0]] * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1),
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+    }
+
+
+async def run_workload(
+    client: httpx.AsyncClient, dataset: Dataset, requests: int, concurrency: int,
+    country_limit: int = 100, seed: int = 42
+) -> dict:
+    """
+    Sends `requests` operations drawn from WORKLOAD through `concurrency` concurrent workers.
+    Returns the summary of every endpoint and of all requests together.
+    """
+    rng = random.Random(seed)
+    plan = rng.choices(list(WORKLOAD), weights=list(WORKLOAD.values()), k=requests)
+    country_query = f"?limit={country_limit}" if country_limit else ""
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    writes = 0
+
+    async def timed(endpoint: str, method: str, url: str, **kwargs) -> None:
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        latencies.setdefault(endpoint, []).append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors[endpoint] = errors.get(endpoint, 0) + 1
+
+    async def run(operation: str) -> None:
+        nonlocal writes
+        if operation == "lookup":
+            await timed(operation, "GET", f"/v1/swift-codes/{rng.choice(dataset.codes)}")
+        elif operation == "hq_lookup":
+            await timed(operation, "GET", f"/v1/swift-codes/{rng.choice(dataset.hq_codes)}")
+        elif operation == "country":
+            await timed(operation, "GET", f"/v1/swift-codes/country/{rng.choice(dataset.countries)}{country_query}")
+        else:
+            # The 'WRTE' party doesn't occur in the seeded codes, every write deletes its own code again
+            swift_code = f"WRTEPL{writes % 100000:05d}"
+            writes += 1
+            await timed("create", "POST", "/v1/swift-codes", json={
+                "address": "BENCH STREET", "bankName": "BENCH WRITE BANK", "countryISO2": "PL",
+                "countryName": "POLAND", "isHeadquarter": False, "swiftCode": swift_code,
+            })
+            await timed("delete", "DELETE", f"/v1/swift-codes/{swift_code}")
+
+    queue = list(reversed(plan))
+
+    async def worker() -> None:
+        while queue:
+            await run(queue.pop())
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    wall = time.perf_counter() - start
+
+    return {
+        "total": summarize([latency for values in latencies.values() for latency in values], sum(errors.values()), wall),
+        "endpoints": {
+            endpoint: summarize(values, errors.get(endpoint, 0), wall) for endpoint, values in sorted(latencies.items())
+        },
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Regressions of report against baseline, by more than threshold (0.2 = 20%). Empty if none.
+    """
+    regressions = []
+    for endpoint, before in baseline["endpoints"].items():
+        after = report["endpoints"].get(endpoint)
+        if after is None:
+            regressions.append(f"{endpoint}: missing from the run")
+            continue
+        for metric in LATENCY_METRICS:
+            if after[metric] > before[metric] * (1 + threshold):
+                regressions.append(f"{endpoint}: {metric} {before[metric]} -> {after[metric]}")
+        if after["rps"] < before["rps"] * (1 - threshold):
+            regressions.append(f"{endpoint}: rps {before['rps']} -> {after['rps']}")
+        if after["errors"] > before["errors"]:
+            regressions.append(f"{endpoint}: errors {before['errors']} -> {after['errors']}")
+    return regressions
+
+
+async def run_in_process(database_url: str, drive) -> dict:
+    """
+    Drives an app built by create_app() through ASGITransport, its database dependencies bound to database_url.
+    """
+    db_engine = make_engine(database_url, primary=False)
+
+    async def bench_get_db():
+        async with AsyncSession(db_engine, expire_on_commit=False) as session:
+            yield session
+
+    async def bench_get_read_db():
+        conn = ReadConnection(db_engine)
+        try:
+            yield conn
+        finally:
+            await conn.close()
+
+    app = create_app()
+    app.dependency_overrides[get_db] = bench_get_db
+    app.dependency_overrides[get_read_db] = bench_get_read_db
+    try:
+        async with LifespanManager(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                return await drive(client)
+    finally:
+        await db_engine.dispose()
+
+
+async def run_uvicorn(database_url: str, workers: int, drive) -> dict:
+    """
+    Drives a uvicorn server started on a free local port, bound to database_url.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env={**os.environ, "DATABASE_URL": database_url},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    # One connection per concurrent worker, like as many clients
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                if server.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with status {server.returncode}")
+                try:
+                    if (await client.get("/v1/cache/stats")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise SystemExit("uvicorn didn't start within 30 seconds")
+                await asyncio.sleep(0.2)
+
+            return await drive(client)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    db_engine = make_engine(args.database_url, primary=False)
+    try:
+        rows = None if args.skip_seed else await seed_dataset(db_engine, args.rows, args.hq_branches)
+        dataset = await load_dataset(db_engine, args.hq_branches)
+    finally:
+        await db_engine.dispose()
+
+    async def drive(client: httpx.AsyncClient) -> dict:
+        # Warm up the pool, the statement caches and the snapshot / response cache if enabled
+        await run_workload(client, dataset, args.concurrency * 10, args.concurrency, args.country_limit, seed=0)
+        return await run_workload(client, dataset, args.requests, args.concurrency, args.country_limit)
+
+    if args.target == "uvicorn":
+        results = await run_uvicorn(args.database_url, args.workers, drive)
+    else:
+        results = await run_in_process(args.database_url, drive)
+
+    return {
+        "target": args.target,
+        "workers": args.workers if args.target == "uvicorn" else 1,
+        "rows": rows if rows is not None else len(dataset.codes),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        **results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi", help="in-process app or uvicorn server")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--database-url", default=settings.TEST_DATABASE_URL, help="database to seed and serve (replaced!)")
+    parser.add_argument("--rows", type=int, default=20_000, help="number of synthetic codes")
+    parser.add_argument("--hq-branches", type=int, default=200, help="branches of the HQs of hq_lookup")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the codes already in the database")
+    parser.add_argument("--requests", type=int, default=5000, help="measured operations")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent clients")
+    parser.add_argument("--country-limit", type=int, default=100, help="page size of country listings (0 = all codes)")
+    parser.add_argument("--output", help="also write the report to this file, usable as a baseline")
+    parser.add_argument("--baseline", help="report of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="tolerated regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as sink:
+            json.dump(report, sink, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as source:
+            baseline = json.load(source)
+        if (baseline.get("target"), baseline.get("workers")) != (report["target"], report["workers"]):
+            print(f"Warning: the baseline ran against {baseline.get('target')} with {baseline.get('workers')} worker(s)",
+                  file=sys.stderr)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:.0%} of {args.baseline}:", *regressions, sep="\n  ", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Wall time of multi-file ingestion (parse + validate + merge, no database) by worker count and XLSX engine.
+
+Generates regional workbooks of synthetic rows in a temporary directory, then runs
+parse_sources over them with 1, 2, 4 ... processes up to the core count, parse cache off:
+
+    poetry run python -m benchmarks.ingest --files 8 --rows 20000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from app.core.config import settings
+from app.ingestion.sources import parse_sources
+
+COUNTRIES = ["DE", "PL", "FR", "US", "GB", "IT", "ES", "NL"]
+
+
+def write_workbooks(directory: str, files: int, rows: int) -> None:
+    for number in range(files):
+        country = COUNTRIES[number % len(COUNTRIES)]
+        pd.DataFrame({
+            "COUNTRY ISO2 CODE": country,
+            # Unique per file: file number & row number in the party prefix and branch
+            "SWIFT CODE": [f"{number:02d}{row // 1000:02d}{country}{row % 1000 // 10:02d}{row % 10:03d}" for row in range(rows)],
+            "NAME": [f"BANK {number} {row}" for row in range(rows)],
+            "ADDRESS": [f"STREET {row}" for row in range(rows)],
+            "TOWN NAME": "TOWN",
+            "COUNTRY NAME": f"COUNTRY {country}",
+        }).to_excel(os.path.join(directory, f"region{number:02d}.xlsx"), index=False, engine="openpyxl")
+
+
+def worker_counts() -> list[int]:
+    counts, workers = [], 1
+    while workers < (os.cpu_count() or 1):
+        counts.append(workers)
+        workers *= 2
+    return counts + [os.cpu_count() or 1]
+
+
+def run(files: int, rows: int) -> dict:
+    settings.PARSE_CACHE_DIR = ""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        write_workbooks(directory, files, rows)
+        for engine in ["openpyxl", "calamine"]:
+            settings.XLSX_ENGINE = engine
+            for workers in worker_counts():
+                start = time.perf_counter()
+                records = parse_sources(os.path.join(directory, "*.xlsx"), workers)
+                results[f"{engine}_{workers}_workers_s"] = round(time.perf_counter() - start, 3)
+    return {"files": files, "rows_per_file": rows, "records": len(records), "cores": os.cpu_count(), **results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=8, help="number of workbooks")
+    parser.add_argument("--rows", type=int, default=20_000, help="rows per workbook")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.files, args.rows), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Load test of the GET /{swift_code} database path: the ORM path the handlers used before
+(AsyncSession, SwiftCode entities, identity map) against the Core read path
+(ReadConnection, table columns, plain rows), under concurrency on a real connection pool.
+
+Reports latency percentiles and process CPU time per lookup. Reads codes from the
+swift_codes table of DATABASE_URL, seed it first:
+
+    poetry run python -m benchmarks.read_path --requests 5000 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.database import ReadConnection
+from app.models.swift_code import SwiftCode
+from app.services.serialization import swift_code_dict
+from app.services.swift_code_reads import find_code
+
+
+async def orm_lookup(session_factory: async_sessionmaker[AsyncSession], swift_code: str) -> dict | None:
+    async with session_factory() as session:
+        if swift_code.endswith("XXX"):
+            result = await session.execute(
+                select(SwiftCode).where(SwiftCode.bank_prefix == swift_code[:8]).order_by(SwiftCode.swift_code)
+            )
+            records = result.scalars().all()
+            record = next((r for r in records if r.swift_code == swift_code), None)
+            branches = [r for r in records if r.swift_code != swift_code]
+        else:
+            result = await session.execute(select(SwiftCode).where(SwiftCode.swift_code == swift_code))
+            record, branches = result.scalar_one_or_none(), []
+        return swift_code_dict(record, branches) if record else None
+
+
+async def core_lookup(engine, swift_code: str) -> dict | None:
+    conn = ReadConnection(engine)
+    try:
+        return await find_code(conn, swift_code)
+    finally:
+        await conn.close()
+
+
+async def load(lookup, codes: list[str], concurrency: int) -> dict:
+    """
+    Runs every lookup through `concurrency` workers, like as many concurrent requests.
+    """
+    queue = list(reversed(codes))
+    latencies = []
+
+    async def worker() -> None:
+        while queue:
+            code = queue.pop()
+            start = time.perf_counter()
+            await lookup(code)
+            latencies.append(time.perf_counter() - start)
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "rps": round(len(codes) / wall),
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+        "cpu_us_per_request": round(cpu / len(codes) * 1e6, 1),
+    }
+
+
+async def run(requests: int, concurrency: int) -> dict:
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        pool_size=concurrency,
+        max_overflow=0,
+        connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
+    )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        async with engine.connect() as conn:
+            all_codes = (await conn.execute(select(SwiftCode.swift_code))).scalars().all()
+        if not all_codes:
+            raise SystemExit("swift_codes is empty, seed the database first")
+
+        codes = random.Random(42).choices(all_codes, k=requests)
+        paths = {
+            "orm": lambda code: orm_lookup(session_factory, code),
+            "core": lambda code: core_lookup(engine, code),
+        }
+
+        # Warm up the pool, the compiled statement caches and asyncpg's prepared statements
+        for lookup in paths.values():
+            await load(lookup, codes[:concurrency * 10], concurrency)
+
+        results = {name: await load(lookup, codes, concurrency) for name, lookup in paths.items()}
+    finally:
+        await engine.dispose()
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        **results,
+        "cpu_saving": f"{1 - results['core']['cpu_us_per_request'] / results['orm']['cpu_us_per_request']:.0%}",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="lookups per path")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent lookups, also the pool size")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.requests, args.concurrency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Latency of GET /search queries (fuzzy bank name, code prefix autocomplete, filters) on a
+directory of realistic size, with the query plans showing which index serves each kind.
+
+The directory is a TEMPORARY copy of swift_codes (same indexes) that shadows the real
+table on the benchmark connection, so real data is never touched:
+
+    poetry run python -m benchmarks.search --rows 200000 --repeat 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.services.swift_code_reads import search_codes, search_query
+
+CREATE_TABLE = "CREATE TEMPORARY TABLE swift_codes (LIKE public.swift_codes INCLUDING ALL)"
+
+WORDS = [
+    "DEUTSCHE", "UNITED", "FIRST", "NATIONAL", "COMMERCIAL", "SAVINGS", "INVESTMENT", "COOPERATIVE",
+    "ROYAL", "CENTRAL", "POPULAR", "AGRICULTURAL", "MERCHANT", "TRUST", "CAPITAL", "GLOBAL",
+    "ATLANTIC", "PACIFIC", "NORDIC", "BALTIC", "ALPINE", "EASTERN", "WESTERN", "SOUTHERN",
+    "PEOPLES", "MUTUAL", "FEDERAL", "REGIONAL", "METROPOLITAN", "PRIVATE", "INDUSTRIAL", "POSTAL",
+]
+
+# Bank names combine two words of WORDS (picked by hash, independently of country and town)
+# with a pronounceable-ish unique word, codes follow the BIC layout
+SEED_ROWS = """
+INSERT INTO swift_codes (swift_code, bank_name, address, country_iso2, country_name, is_headquarter, town_name)
+SELECT
+    prefix || CASE WHEN branch = 0 THEN 'XXX' ELSE lpad(branch::text, 3, '0') END,
+    words[1 + get_byte(hash, 0) % 32] || ' ' || words[1 + get_byte(hash, 1) % 32] || ' '
+        || translate(upper(substr(md5(bank::text || 'name'), 1, 7)), '0123456789', 'KLMNPRSTVZ') || ' BANK',
+    'BENCH STREET ' || branch,
+    country,
+    'COUNTRY ' || country,
+    branch = 0,
+    'TOWN ' || get_byte(hash, 2) % 50
+FROM (
+    SELECT
+        bank,
+        decode(md5(bank::text), 'hex') AS hash,
+        (ARRAY['DE', 'PL', 'FR', 'US', 'GB', 'IT', 'ES', 'NL'])[1 + bank % 8] AS country,
+        upper(substr(md5(bank::text), 1, 4)) AS party,
+        CAST(:words AS text[]) AS words
+    FROM generate_series(1, :banks) AS bank
+) banks
+CROSS JOIN generate_series(0, :branches) AS branch
+CROSS JOIN LATERAL (SELECT party || country || upper(substr(md5(bank::text), 5, 2)) AS prefix) codes
+ON CONFLICT DO NOTHING
+"""
+
+QUERIES = {
+    "name": {"bank_name": "deutsche national"},
+    "name_typo": {"bank_name": "deutshe national"},
+    "name_partial": {"bank_name": "metropol"},
+    "name_in_country": {"bank_name": "royal trust", "country_iso2": "DE"},
+    "name_in_town": {"bank_name": "global", "town_name": "TOWN 7"},
+    "code_prefix": {"code_prefix": "A1"},
+    "code_prefix_long": {"code_prefix": "A1B2DE"},
+    "name_and_prefix": {"bank_name": "merchant", "code_prefix": "C"},
+}
+
+
+async def plan_nodes(conn, criteria: dict, limit: int) -> list[str]:
+    """
+    Node types (and indexes) of the plan of the query search_codes sends.
+    """
+    query = search_query(limit=limit, **criteria).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {query}")
+    nodes, stack = [], [result.scalar()[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        nodes.append(node["Node Type"] + (f" on {node['Index Name']}" if "Index Name" in node else ""))
+        stack.extend(node.get("Plans", []))
+    return nodes
+
+
+async def run(rows: int, branches: int, repeat: int, limit: int) -> dict:
+    engine = create_async_engine(settings.DATABASE_URL)
+    results = {}
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text(CREATE_TABLE))
+            # Unqualified "swift_codes" in the app's queries now resolves to the temporary copy
+            await conn.execute(text("SET search_path = pg_temp, public"))
+            await conn.execute(
+                text(SEED_ROWS), {"words": WORDS, "banks": max(rows // (branches + 1), 1), "branches": branches}
+            )
+            await conn.execute(text("ANALYZE swift_codes"))
+            total = (await conn.execute(text("SELECT count(*) FROM swift_codes"))).scalar_one()
+
+            for name, criteria in QUERIES.items():
+                latencies = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    found = await search_codes(conn, limit=limit, **criteria)
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+                quantiles = statistics.quantiles(latencies, n=100)
+                results[name] = {
+                    "criteria": criteria,
+                    "results": len(found),
+                    "p50_ms": round(quantiles[49], 3),
+                    "p99_ms": round(quantiles[98], 3),
+                }
+
+            for name in ["name", "code_prefix"]:
+                results[name]["plan"] = await plan_nodes(conn, QUERIES[name], limit)
+            await conn.rollback()
+    finally:
+        await engine.dispose()
+
+    return {"rows": total, "limit": limit, "queries": results,
+            "max_p99_ms": max(result["p99_ms"] for result in results.values())}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="approximate number of synthetic rows")
+    parser.add_argument("--branches", type=int, default=5, help="branches per HQ")
+    parser.add_argument("--repeat", type=int, default=100, help="runs per query")
+    parser.add_argument("--limit", type=int, default=20, help="result limit, like ?limit=")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.rows, args.branches, args.repeat, args.limit)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
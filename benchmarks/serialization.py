@@ -0,0 +1,113 @@
+"""
+Microbenchmark of response serialization: the Pydantic path the endpoints used before
+(model_validate per row, model_dump, JSONResponse, response_model revalidation for countries)
+against the fast path (rows mapped straight to camelCase dicts, encoded with orjson).
+
+Runs on synthetic in-memory records, no database needed:
+
+    poetry run python -m benchmarks.serialization --branches 200 --country-size 5000
+"""
+import argparse
+import json
+import timeit
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.schemas.swift_code import (
+    BranchSwiftCodeResponse,
+    CountrySwiftCodesResponse,
+    HeadquarterSwiftCodeResponse,
+)
+from app.services.serialization import country_dict, swift_code_dict
+from app.services.snapshot import SwiftCodeRecord
+
+country_adapter = TypeAdapter(CountrySwiftCodesResponse)
+
+
+def make_records(count: int, prefix: str = "BENCPLPW") -> list[SwiftCodeRecord]:
+    return [
+        SwiftCodeRecord(
+            swift_code=f"{prefix}{idx:03d}" if idx else f"{prefix}XXX",
+            bank_name=f"BENCH BANK {idx}",
+            address=f"BENCH STREET {idx}, WARSZAWA, 00-{idx:03d}",
+            country_iso2="PL",
+            country_name="POLAND",
+            is_headquarter=idx == 0,
+        )
+        for idx in range(count)
+    ]
+
+
+def pydantic_hq(hq: SwiftCodeRecord, branches: list[SwiftCodeRecord]) -> bytes:
+    branch_models = [BranchSwiftCodeResponse.model_validate(branch) for branch in branches]
+    response = HeadquarterSwiftCodeResponse(
+        address=hq.address,
+        bank_name=hq.bank_name,
+        country_iso2=hq.country_iso2,
+        country_name=hq.country_name,
+        is_headquarter=hq.is_headquarter,
+        swift_code=hq.swift_code,
+        branches=branch_models,
+    )
+    return JSONResponse(content=response.model_dump(by_alias=False)).body
+
+
+def pydantic_country(records: list[SwiftCodeRecord]) -> bytes:
+    response = CountrySwiftCodesResponse(
+        countryISO2="PL",
+        countryName=records[0].country_name,
+        swiftCodes=[BranchSwiftCodeResponse.model_validate(record) for record in records],
+    )
+    # What FastAPI does with a response_model: dump, validate again, serialize
+    validated = country_adapter.validate_python(response.model_dump(by_alias=True))
+    return JSONResponse(content=country_adapter.dump_python(validated, mode="json")).body
+
+
+def fast_hq(hq: SwiftCodeRecord, branches: list[SwiftCodeRecord]) -> bytes:
+    return ORJSONResponse(content=swift_code_dict(hq, branches)).body
+
+
+def fast_country(records: list[SwiftCodeRecord]) -> bytes:
+    return ORJSONResponse(content=country_dict("PL", records)).body
+
+
+def measure(func, *args, repeat: int) -> float:
+    """Best per-call time in microseconds."""
+    timer = timeit.Timer(lambda: func(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def run(branches: int, country_size: int, repeat: int) -> dict:
+    hq_records = make_records(branches + 1)
+    country_records = make_records(country_size, prefix="CNTRPLPW")
+    results = {}
+
+    for name, current, fast, args in [
+        ("hq", pydantic_hq, fast_hq, (hq_records[0], hq_records[1:])),
+        ("country", pydantic_country, fast_country, (country_records,)),
+    ]:
+        current_us = measure(current, *args, repeat=repeat)
+        fast_us = measure(fast, *args, repeat=repeat)
+        results[name] = {
+            "current_us": round(current_us, 1),
+            "fast_us": round(fast_us, 1),
+            "speedup": round(current_us / fast_us, 1),
+            "same_payload": json.loads(current(*args)) == json.loads(fast(*args)),
+        }
+    return {"branches": branches, "country_size": country_size, **results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--branches", type=int, default=50, help="branches of the HQ response")
+    parser.add_argument("--country-size", type=int, default=2000, help="codes in the country response")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.branches, args.country_size, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
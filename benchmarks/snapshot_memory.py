@@ -0,0 +1,95 @@
+"""
+Per-worker heap and lookup latency of the in-process snapshot vs. the memory-mapped snapshot file.
+
+Builds synthetic records (no database), then measures the Python heap each representation
+allocates (tracemalloc, the mapped file itself lives in the shared page cache) and the time of
+get / HQ branches / country page lookups:
+
+    poetry run python -m benchmarks.snapshot_memory --rows 200000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from app.models.swift_code import SwiftCode
+from app.services.snapshot import SwiftCodeRecord, SwiftCodeSnapshot
+from app.services.snapshot_file import write_snapshot_file
+
+COUNTRIES = ["DE", "PL", "FR", "US", "GB", "IT", "ES", "NL"]
+
+
+def make_records(rows: int) -> list[SwiftCodeRecord]:
+    records = []
+    for row in range(rows):
+        country = COUNTRIES[row % len(COUNTRIES)]
+        bank = f"{row // 10:04d}"[-4:].replace("0", "A")
+        records.append(SwiftCodeRecord(
+            swift_code=f"{bank}{country}{row // 10000 % 100:02d}{'XXX' if row % 10 == 0 else f'{row % 10:03d}'}",
+            bank_name=f"BANK {row // 10}",
+            address=f"STREET {row}, TOWN {row % 500}",
+            country_iso2=country,
+            country_name=f"COUNTRY {country}",
+            is_headquarter=row % 10 == 0,
+        ))
+    return list({record.swift_code: record for record in records}.values())
+
+
+def lookup_us(snapshot: SwiftCodeSnapshot, codes: list[str]) -> dict:
+    timings = {}
+    for name, lookup in [
+        ("get", snapshot.get),
+        ("branches", snapshot.branches),
+        ("country_page", lambda code: snapshot.by_country(code[4:6], after=code, limit=50)),
+    ]:
+        start = time.perf_counter()
+        for code in codes:
+            lookup(code)
+        timings[f"{name}_us"] = round((time.perf_counter() - start) / len(codes) * 1e6, 2)
+    return timings
+
+
+def run(rows: int) -> dict:
+    records = make_records(rows)
+    codes = random.Random(0).sample([record.swift_code for record in records], min(2000, len(records)))
+
+    tracemalloc.start()
+    in_memory = SwiftCodeSnapshot()
+    for record in records:
+        in_memory.add(SwiftCode(**record.__dict__))
+    in_memory_mb = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "swift_codes.snap")
+        write_snapshot_file(path, records, version=1)
+
+        tracemalloc.start()
+        mapped = SwiftCodeSnapshot()
+        mapped.map_file(path, check_interval=3600)
+        mapped_mb = tracemalloc.get_traced_memory()[0] / 2**20
+        tracemalloc.stop()
+
+        return {
+            "records": len(records),
+            "file_mb": round(os.path.getsize(path) / 2**20, 2),
+            "in_memory_heap_mb": round(in_memory_mb, 2),
+            "mapped_heap_mb": round(mapped_mb, 3),
+            "in_memory": lookup_us(in_memory, codes),
+            "mapped": lookup_us(mapped, codes),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="number of synthetic records")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.rows), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,10 @@ echo "Waiting for Postgres to be ready..."
 echo "Running Alembic migrations..."
 poetry run alembic upgrade head
 
+# Seeding is an idempotent upsert, so a failure here is a real error and stops the container
 echo "Seeding the database..."
-poetry run python app/ingestion/seed_data.py \
-  && echo "Seed completed" \
-  || echo "Seed was already done in previous iteration, continuing."
+poetry run swift-ingest seed
+echo "Seed completed"
 
 echo "Starting the API server..."
 exec poetry run uvicorn app.main:app --host 0.0.0.0 --port 8080
\ No newline at end of file
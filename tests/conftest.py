@@ -1,3 +1,9 @@
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
 import pytest_asyncio
 from httpx import AsyncClient
 from httpx._transports.asgi import ASGITransport
@@ -5,8 +11,9 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy import text
 from sqlalchemy.pool import NullPool
 from app.main import create_app
-from app.core.database import Base, get_db
+from app.core.database import Base, ReadConnection, get_db, get_read_db
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 from asgi_lifespan import LifespanManager
 
 
@@ -14,6 +21,8 @@ from asgi_lifespan import LifespanManager
 # Use NullPool to prevent "Future attached to a different loop" (refer to README)
 TEST_DATABASE_URL = settings.TEST_DATABASE_URL
 engine_test = create_async_engine(TEST_DATABASE_URL, echo=True, poolclass=NullPool)
+# Statement metrics like the app engine
+instrument_engine(engine_test.sync_engine)
 TestSessionLocal = async_sessionmaker(bind=engine_test, expire_on_commit=False)
 
 # Override the dependency database to ensure we hit test_db
@@ -21,8 +30,16 @@ async def override_get_db():
     async with TestSessionLocal() as session:
         yield session
 
+async def override_get_read_db():
+    conn = ReadConnection(engine_test)
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
 app = create_app()
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_read_db
 
 # Apply DB schema before any test
 @pytest_asyncio.fixture(scope="session", autouse=True)
@@ -33,6 +50,12 @@ async def setup_test_db():
     yield
 
 
+@pytest_asyncio.fixture
+async def db_engine():
+    """Engine bound to the test database, for code that takes an engine explicitly."""
+    yield engine_test
+
+
 # HTTPX ASGI Client
 @pytest_asyncio.fixture
 async def client():
@@ -47,4 +70,54 @@ async def clean_swift_table():
     """Run each test inside a fresh table state."""
     yield
     async with engine_test.begin() as conn:
-        await conn.execute(text("TRUNCATE TABLE swift_codes RESTART IDENTITY"))
\ No newline at end of file
+        await conn.execute(text("TRUNCATE TABLE swift_codes RESTART IDENTITY"))
+
+
+class SheetHandler(BaseHTTPRequestHandler):
+    """
+    Google's CSV export: a strong ETag of the body, 304 when If-None-Match matches it.
+    """
+
+    def do_GET(self) -> None:
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if server.failures:
+            server.failures -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        etag = f'"{hashlib.md5(server.body).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(server.body)))
+        self.end_headers()
+        time.sleep(server.delay)
+        self.wfile.write(server.body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def sheet_server():
+    """
+    Local stand-in of the Google Sheets export, serving server.body at server.url.
+    Set server.failures to answer that many 503s first, server.delay to stall before the body.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SheetHandler)
+    server.body = b"SWIFT CODE,NAME\nABCDPLPWXXX,BANK\n"
+    server.requests, server.failures, server.delay = [], 0, 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/sheet.csv"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
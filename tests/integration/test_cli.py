@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.core import database
+from app.core.config import settings
+from app.core.database import make_engine
+from app.ingestion.cli import main
+from app.ingestion.reload import RELOAD_LOCK_KEY
+from app.services.snapshot_file import MappedSnapshot
+from tests.integration.test_seed_data import CSV_ROWS
+
+
+def test_seed_command_exports_snapshot_file(tmp_path, monkeypatch):
+    # Pooled like the app engine, its connections must not outlive the command's event loop
+    monkeypatch.setattr(database, "engine", make_engine(settings.TEST_DATABASE_URL, primary=False))
+    # Restored after the test, main() overrides it from --source
+    monkeypatch.setattr(settings, "INPUT_SOURCE", "csv")
+    monkeypatch.setattr(settings, "CSV_FILE_PATH", "data/swift_codes.csv")
+    path = tmp_path / "swift_codes.snap"
+    monkeypatch.setattr(settings, "SNAPSHOT_FILE", str(path))
+
+    main(["seed", "--source", "csv"])
+
+    mapped = MappedSnapshot(str(path))
+    try:
+        assert len(mapped) == CSV_ROWS
+        assert mapped.get("AAISALTRXXX") is not None
+    finally:
+        mapped.close()
+
+
+def test_reload_command_refuses_to_run_next_to_another_reload(monkeypatch):
+    monkeypatch.setattr(database, "engine", make_engine(settings.TEST_DATABASE_URL, primary=False))
+    monkeypatch.setattr(settings, "INPUT_SOURCE", "csv")
+
+    async def reload_while_locked() -> None:
+        other_process = make_engine(settings.TEST_DATABASE_URL, primary=False)
+        try:
+            async with other_process.connect() as conn:
+                await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": RELOAD_LOCK_KEY})
+                # main() runs its own event loop
+                await asyncio.to_thread(main, ["reload", "--source", "csv"])
+        finally:
+            await other_process.dispose()
+
+    with pytest.raises(SystemExit, match="A reload is already running"):
+        asyncio.run(reload_while_locked())
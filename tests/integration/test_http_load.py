@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks.http_load import compare, load_dataset, run_workload, seed_dataset
+
+
+@pytest.mark.asyncio
+async def test_http_load_runs_mixed_workload_in_process(db_engine, client):
+    assert await seed_dataset(db_engine, rows=300, hq_branches=40) > 250
+    dataset = await load_dataset(db_engine, hq_branches=40)
+    assert dataset.hq_codes and all(code.endswith("XXX") for code in dataset.hq_codes)
+
+    report = await run_workload(client, dataset, requests=200, concurrency=4, country_limit=20)
+
+    assert set(report["endpoints"]) == {"lookup", "hq_lookup", "country", "create", "delete"}
+    assert report["total"]["errors"] == 0
+    assert report["total"]["requests"] == 200 + report["endpoints"]["delete"]["requests"]
+    for summary in report["endpoints"].values():
+        assert summary["rps"] > 0 and 0 < summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"]
+
+    # Writes delete their own codes again
+    assert len((await load_dataset(db_engine, hq_branches=40)).codes) == len(dataset.codes)
+    assert compare(report, report, threshold=0.2) == []
+
+
+def test_http_load_gate_flags_regressions():
+    summary = {"requests": 100, "errors": 0, "rps": 100.0, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0}
+    baseline = {"endpoints": {"lookup": summary, "country": summary}}
+    report = {"endpoints": {
+        "lookup": {**summary, "p99_ms": 35.0, "rps": 85.0},
+        "country": {**summary, "p95_ms": 25.0, "rps": 70.0, "errors": 2},
+    }}
+
+    assert compare(report, baseline, threshold=0.2) == [
+        "country: p95_ms 20.0 -> 25.0",
+        "country: rps 100.0 -> 70.0",
+        "country: errors 0 -> 2",
+    ]
+    assert compare({"endpoints": {}}, baseline, threshold=0.2) == [
+        "lookup: missing from the run", "country: missing from the run"
+    ]
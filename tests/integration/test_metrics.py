@@ -0,0 +1,71 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.metrics import InstrumentedPool, instrument_pool
+from app.ingestion.seed_data import seed_data
+from tests.integration.test_swift_codes import HQ_PAYLOAD
+
+CODE_ROUTE = {"method": "GET", "route": "/v1/swift-codes/{swift_code}"}
+COUNTRY_ROUTE = "/v1/swift-codes/country/{country_iso2}"
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_record_routes_and_statements(client):
+    requests = sample("http_request_duration_seconds_count", **CODE_ROUTE)
+    not_found = sample("http_requests_total", status="404", **CODE_ROUTE)
+    selects = sample("db_statement_duration_seconds_count", operation="SELECT")
+
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    assert (await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")).status_code == 200
+    assert (await client.get("/v1/swift-codes/MISSINGCODE")).status_code == 404
+    # Rejected by request validation, before the handler runs
+    invalid = sample("http_requests_total", status="422", method="GET", route=COUNTRY_ROUTE)
+    assert (await client.get("/v1/swift-codes/country/US", params={"limit": 0})).status_code == 422
+
+    assert sample("http_request_duration_seconds_count", **CODE_ROUTE) == requests + 2
+    assert sample("http_requests_total", status="404", **CODE_ROUTE) == not_found + 1
+    assert sample("http_requests_in_progress", **CODE_ROUTE) == 0
+    assert sample("http_requests_total", status="422", method="GET", route=COUNTRY_ROUTE) == invalid + 1
+    assert sample("http_requests_total", status="500", method="GET", route=COUNTRY_ROUTE) == 0
+    assert sample("db_statement_duration_seconds_count", operation="SELECT") > selects
+    assert sample("db_statement_rows_count", operation="INSERT") > 0
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/v1/swift-codes/{swift_code}"}' in response.text
+
+
+@pytest.mark.asyncio
+async def test_metrics_time_seeding_stages_and_pool_checkouts(db_engine, monkeypatch):
+    monkeypatch.setattr(settings, "INPUT_SOURCE", "csv")
+    monkeypatch.setattr(settings, "CSV_FILE_PATH", "data/swift_codes.csv")
+    stages = {stage: sample("ingest_stage_duration_seconds_count", stage=stage) for stage in ["parse", "validate", "load"]}
+
+    await seed_data(db_engine)
+
+    for stage, count in stages.items():
+        assert sample("ingest_stage_duration_seconds_count", stage=stage) == count + 1
+
+    checkouts = sample("db_pool_checkout_seconds_count")
+    pooled = create_async_engine(settings.TEST_DATABASE_URL, poolclass=InstrumentedPool, pool_size=1)
+    instrument_pool(pooled.sync_engine)
+    try:
+        for _ in range(2):
+            async with pooled.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                # Set values, which the multiprocess collector aggregates too
+                assert sample("db_pool_checked_out") == 1
+            assert sample("db_pool_checked_out") == 0
+            # The gauges follow the pool dispose() creates
+            await pooled.dispose()
+    finally:
+        await pooled.dispose()
+    assert sample("db_pool_checkout_seconds_count") == checkouts + 2
+    assert sample("db_pool_size") == 1
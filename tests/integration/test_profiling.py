@@ -0,0 +1,67 @@
+import json
+
+import pytest
+import pytest_asyncio
+from asgi_lifespan import LifespanManager
+from httpx import AsyncClient
+from httpx._transports.asgi import ASGITransport
+
+from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware
+from app.main import create_app
+from tests.conftest import app as default_app
+
+TOKEN = "profiling-token"
+
+
+@pytest_asyncio.fixture
+async def profiled_client(tmp_path, monkeypatch):
+    """Client of an app built with profiling enabled, profiles stored in tmp_path."""
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", TOKEN)
+    app = create_app()
+    app.dependency_overrides.update(default_app.dependency_overrides)
+    async with LifespanManager(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            yield c
+
+
+def test_profiling_middleware_is_only_installed_when_enabled():
+    assert not any(middleware.cls is ProfilingMiddleware for middleware in default_app.user_middleware)
+
+
+@pytest.mark.asyncio
+async def test_profile_stored_for_flagged_request(profiled_client, tmp_path):
+    response = await profiled_client.get("/v1/cache/stats", headers={"X-Profile": "store", "X-Admin-Token": TOKEN})
+
+    assert response.status_code == 200
+    assert "hits" in response.json()
+    name = response.headers["X-Profile-File"]
+    assert "-GET-v1_cache_stats-" in name and name.endswith(".speedscope.json")
+    profile = json.loads((tmp_path / name).read_text())
+    assert profile["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+
+
+@pytest.mark.asyncio
+async def test_profile_returned_instead_of_response(profiled_client, tmp_path):
+    response = await profiled_client.get("/v1/swift-codes/MISSINGCODE?profile=return", headers={"X-Admin-Token": TOKEN})
+
+    assert response.status_code == 200
+    assert response.headers["X-Profiled-Status"] == "404"
+    assert "profiles" in response.json()
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_profiling_requires_admin_token(profiled_client, tmp_path):
+    for headers in [{"X-Profile": "store"}, {"X-Profile": "store", "X-Admin-Token": "wrong"}]:
+        response = await profiled_client.get("/v1/cache/stats", headers=headers)
+        assert response.status_code == 403
+    assert (await profiled_client.get("/v1/cache/stats", headers={"X-Profile": "flame", "X-Admin-Token": TOKEN})).status_code == 400
+
+    # Unflagged requests are served as usual
+    response = await profiled_client.get("/v1/cache/stats")
+    assert response.status_code == 200
+    assert "X-Profile-File" not in response.headers
+    assert not list(tmp_path.iterdir())
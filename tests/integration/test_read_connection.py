@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.database import ReadConnection
+
+
+@pytest.mark.asyncio
+async def test_read_connection_checks_out_lazily(db_engine):
+    """
+    Test that no connection is taken from the pool until the first statement runs.
+    """
+    conn = ReadConnection(db_engine)
+    assert conn._conn is None
+    await conn.close()
+
+    conn = ReadConnection(db_engine)
+    try:
+        assert (await conn.execute(text("SELECT 1"))).scalar_one() == 1
+        assert (await conn.execute(text("SELECT 2"))).scalar_one() == 2
+        assert conn._conn is not None
+    finally:
+        await conn.close()
+    assert conn._conn is None
@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.ingestion.reload import RELOAD_LOCK_KEY, reload_job
+from tests.integration.test_swift_codes import HQ_PAYLOAD
+
+CSV_ROWS = 1061
+ADMIN_HEADERS = {"X-Admin-Token": "secret"}
+
+SCHEMA = text("""
+SELECT indexname FROM pg_indexes WHERE tablename = 'swift_codes'
+UNION ALL
+SELECT conname FROM pg_constraint WHERE conrelid = 'swift_codes'::regclass
+""")
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(settings, "INPUT_SOURCE", "csv")
+    monkeypatch.setattr(settings, "CSV_FILE_PATH", "data/swift_codes.csv")
+    monkeypatch.setattr(settings, "SEED_BATCH_SIZE", 300)
+
+
+@pytest.mark.asyncio
+async def test_reload_swaps_in_the_source(admin, client, db_engine):
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    etag = (await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")).headers["ETag"]
+    async with db_engine.connect() as conn:
+        schema = sorted((await conn.execute(SCHEMA)).scalars())
+
+    response = await client.post("/v1/admin/reload", headers=ADMIN_HEADERS)
+    assert response.status_code == 202
+    await reload_job.wait()
+
+    progress = (await client.get("/v1/admin/reload", headers=ADMIN_HEADERS)).json()
+    assert progress["stage"] == "done", progress["error"]
+    assert progress["rowsLoaded"] == progress["rowsTotal"] == CSV_ROWS
+    assert progress["indexesBuilt"] == progress["indexesTotal"] > 0
+
+    # The new table holds the source only, under the same indexes & constraints
+    assert (await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")).status_code == 404
+    found = await client.get("/v1/swift-codes/AAISALTRXXX")
+    assert found.status_code == 200
+    assert found.headers["ETag"] != etag
+
+    async with db_engine.connect() as conn:
+        assert sorted((await conn.execute(SCHEMA)).scalars()) == schema
+        assert await conn.scalar(text("SELECT count(*) FROM swift_codes")) == CSV_ROWS
+        assert await conn.scalar(text("SELECT to_regclass('swift_codes_shadow')")) is None
+
+    # Writes keep working on the swapped table, the id sequence came along
+    assert (await client.post("/v1/swift-codes", json=HQ_PAYLOAD)).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_reload_conflicts_with_a_reload_of_another_process(admin, client, db_engine):
+    async with db_engine.connect() as other_process:
+        await other_process.execute(text("SELECT pg_advisory_lock(:key)"), {"key": RELOAD_LOCK_KEY})
+        response = await client.post("/v1/admin/reload", headers=ADMIN_HEADERS)
+        assert response.status_code == 409
+        assert not reload_job.running
+        await other_process.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": RELOAD_LOCK_KEY})
+
+    # Held for the whole reload, released once it ends
+    assert (await client.post("/v1/admin/reload", headers=ADMIN_HEADERS)).status_code == 202
+    assert (await client.post("/v1/admin/reload", headers=ADMIN_HEADERS)).status_code == 409
+    await reload_job.wait()
+    async with db_engine.connect() as conn:
+        assert await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": RELOAD_LOCK_KEY})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("token, headers", [("", ADMIN_HEADERS), ("secret", {}), ("secret", {"X-Admin-Token": "wrong"})])
+async def test_reload_requires_admin_token(client, monkeypatch, token, headers):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", token)
+
+    assert (await client.post("/v1/admin/reload", headers=headers)).status_code == 403
+    assert (await client.get("/v1/admin/reload", headers=headers)).status_code == 403
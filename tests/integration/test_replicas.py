@@ -0,0 +1,111 @@
+import logging
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.replicas import READ_PRIMARY_COOKIE, replica_router
+from app.services.cache import response_cache
+from tests.integration.test_swift_codes import HQ_PAYLOAD
+
+# Nothing listens on port 1, connecting fails at once
+DEAD_REPLICA_URL = "postgresql+asyncpg://remitly@127.0.0.1:1/swiftcodes_test"
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    """The test database stands in for a healthy replica, next to a replica that is down."""
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", f"{DEAD_REPLICA_URL},{settings.TEST_DATABASE_URL}")
+    monkeypatch.setattr(settings, "REPLICA_HEALTH_CHECK_INTERVAL", 60)
+
+
+def replica_logs(caplog):
+    return [record for record in caplog.records if record.name == "app.core.replicas"]
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_BACKEND", "memory")
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_healthy_replicas(replicas, client, caplog):
+    caplog.set_level(logging.INFO, logger="app.core.replicas")
+    dead, healthy = replica_router.replicas
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    client.cookies.clear()
+
+    response = await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")
+    assert response.status_code == 200
+    assert (await client.get("/v1/swift-codes/country/US")).status_code == 200
+    assert (await client.get("/v1/swift-codes/country/US", headers={"Accept": "application/x-ndjson"})).status_code == 200
+
+    assert dead in replica_router.down and healthy not in replica_router.down
+    assert replica_router.reads == {"replica": 3, "fallback": 0}
+    assert [(record.levelname, record.getMessage()) for record in replica_logs(caplog)] == [
+        ("WARNING", f"Read replica {dead.url} is down, reading from the others or the primary")
+    ]
+
+    # The health check brings a replica back once it answers
+    replica_router.mark_down(healthy)
+    await replica_router.check(timeout=5)
+    assert replica_router.down == {dead}
+    assert [record.levelname for record in replica_logs(caplog)] == ["WARNING", "WARNING", "INFO"]
+
+
+@pytest.mark.asyncio
+async def test_reads_fall_back_to_primary_without_healthy_replica(replicas, client):
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    client.cookies.clear()
+    replica_router.down.update(replica_router.replicas)
+
+    response = await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")
+    assert response.status_code == 200
+    assert replica_router.reads == {"replica": 0, "fallback": 1}
+
+
+@pytest.mark.asyncio
+async def test_clients_read_their_writes_from_primary(replicas, client):
+    response = await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    assert float(response.cookies[READ_PRIMARY_COOKIE]) > time.time()
+
+    # Within the window, and on request, reads skip the replicas
+    assert (await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")).status_code == 200
+    client.cookies.clear()
+    response = await client.get("/v1/swift-codes/country/US", headers={"X-Read-Consistency": "primary"})
+    assert response.status_code == 200
+    assert replica_router.reads == {"replica": 0, "fallback": 0}
+
+    # An expired window reads from replicas again
+    client.cookies.set(READ_PRIMARY_COOKIE, str(time.time() - 1))
+    assert (await client.get("/v1/swift-codes/country/US")).status_code == 200
+    assert replica_router.reads["replica"] == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_dont_pin_reads_without_replicas(client):
+    response = await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    assert response.status_code == 200
+    assert READ_PRIMARY_COOKIE not in response.cookies
+    assert not replica_router.enabled
+
+
+@pytest.mark.asyncio
+async def test_response_cache_is_filled_from_primary_and_bypassed_by_writers(replicas, memory_cache, client):
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    client.cookies.clear()
+
+    # Cached responses come from the primary, a lagging replica would stay cached for the TTL
+    for _ in range(2):
+        assert (await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")).status_code == 200
+    assert (response_cache.hits, response_cache.misses) == (1, 1)
+    assert replica_router.reads == {"replica": 0, "fallback": 0}
+    # Pages aren't cached, they still read from replicas
+    assert (await client.get("/v1/swift-codes/country/US", params={"limit": 1})).status_code == 200
+    assert replica_router.reads["replica"] == 1
+
+    # A client reading its own writes skips the cache, which may still hold another worker's stale entry
+    await client.post("/v1/swift-codes", json={**HQ_PAYLOAD, "swiftCode": "TEATUS33ABC", "isHeadquarter": False})
+    response = await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")
+    assert [branch["swiftCode"] for branch in response.json()["branches"]] == ["TEATUS33ABC"]
+    assert (response_cache.hits, response_cache.misses) == (1, 1)
@@ -0,0 +1,73 @@
+import pytest
+import pytest_asyncio
+
+from app.core.config import settings
+from app.ingestion.seed_data import seed_data
+
+
+@pytest_asyncio.fixture
+async def seeded(db_engine, monkeypatch):
+    """The bundled CSV, which carries town names, seeded into the test database."""
+    monkeypatch.setattr(settings, "INPUT_SOURCE", "csv")
+    monkeypatch.setattr(settings, "CSV_FILE_PATH", "data/swift_codes.csv")
+    await seed_data(db_engine)
+
+
+def codes(response) -> list:
+    return [entry["swiftCode"] for entry in response.json()["swiftCodes"]]
+
+
+@pytest.mark.asyncio
+async def test_search_by_bank_name(seeded, client):
+    response = await client.get("/v1/swift-codes/search", params={"q": "deutsche bank"})
+
+    assert response.status_code == 200
+    assert codes(response)[:3] == ["DEUTPL21XXX", "DEUTPLPXXXX", "DEUTUYM1XXX"]
+    assert response.json()["swiftCodes"][0]["bankName"] == "DEUTSCHE BANK POLSKA S.A"
+
+
+@pytest.mark.asyncio
+async def test_search_tolerates_typos(seeded, client):
+    response = await client.get("/v1/swift-codes/search", params={"q": "united bank of albnia"})
+
+    assert response.status_code == 200
+    assert codes(response)[0] == "AAISALTRXXX"
+
+
+@pytest.mark.asyncio
+async def test_search_by_code_prefix(seeded, client):
+    response = await client.get("/v1/swift-codes/search", params={"code": "bchiclr10"})
+
+    assert response.status_code == 200
+    found = codes(response)
+    assert len(found) == 11
+    assert found == sorted(found)
+    assert all(code.startswith("BCHICLR10") for code in found)
+
+
+@pytest.mark.asyncio
+async def test_search_filters_and_limit(seeded, client):
+    in_town = await client.get(
+        "/v1/swift-codes/search", params={"q": "banco de chile", "country": "cl", "town": "santiago"}
+    )
+    assert in_town.status_code == 200
+    assert set(codes(in_town)) >= {"BCHICLRMXXX", "BCHICLRMCUS"}
+
+    other_country = await client.get("/v1/swift-codes/search", params={"q": "banco de chile", "country": "PL"})
+    assert codes(other_country) == []
+
+    limited = await client.get("/v1/swift-codes/search", params={"code": "BCHI", "limit": 3})
+    assert codes(limited) == ["BCHICLR10R2", "BCHICLR10R3", "BCHICLR10R4"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [
+    {},
+    {"country": "PL"},
+    {"code": "BCHI%"},
+    {"code": "BCHICLR10R2X"},
+    {"q": "bank", "limit": 10_000},
+])
+async def test_search_rejects_invalid_queries(client, params):
+    response = await client.get("/v1/swift-codes/search", params=params)
+    assert response.status_code == 400
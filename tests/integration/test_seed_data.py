@@ -0,0 +1,119 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.ingestion.seed_data import seed_data
+from app.services.versioning import get_version
+
+CSV_ROWS = 1061
+
+
+@pytest.fixture
+def csv_source(monkeypatch):
+    monkeypatch.setattr(settings, "INPUT_SOURCE", "csv")
+    monkeypatch.setattr(settings, "CSV_FILE_PATH", "data/swift_codes.csv")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method", ["copy", "insert"])
+async def test_seed_is_idempotent(csv_source, db_engine, monkeypatch, method):
+    monkeypatch.setattr(settings, "SEED_METHOD", method)
+    monkeypatch.setattr(settings, "SEED_BATCH_SIZE", 250)
+
+    first = await seed_data(db_engine)
+    assert (first.inserted, first.updated, first.unchanged) == (CSV_ROWS, 0, 0)
+
+    # Simulate a row changed in the database since the last seed
+    async with db_engine.begin() as conn:
+        await conn.execute(text("UPDATE swift_codes SET bank_name = 'STALE' WHERE swift_code = 'AAISALTRXXX'"))
+
+    second = await seed_data(db_engine)
+    assert (second.inserted, second.updated, second.unchanged) == (0, 1, CSV_ROWS - 1)
+
+    async with db_engine.connect() as conn:
+        count = await conn.scalar(text("SELECT count(*) FROM swift_codes"))
+        bank_prefix = await conn.scalar(text("SELECT bank_prefix FROM swift_codes WHERE swift_code = 'AAISALTRXXX'"))
+    assert count == CSV_ROWS
+    assert bank_prefix == "AAISALTR"
+
+
+@pytest.mark.asyncio
+async def test_streaming_seed_matches_full_seed(csv_source, db_engine, monkeypatch):
+    monkeypatch.setattr(settings, "SEED_CHUNK_SIZE", 100)
+    monkeypatch.setattr(settings, "SEED_QUEUE_SIZE", 1)
+
+    first = await seed_data(db_engine)
+    assert (first.inserted, first.updated, first.unchanged) == (CSV_ROWS, 0, 0)
+
+    async with db_engine.connect() as conn:
+        version = await get_version(conn)
+
+    second = await seed_data(db_engine)
+    assert (second.inserted, second.updated, second.unchanged) == (0, 0, CSV_ROWS)
+
+    # A no-op reseed keeps the dataset version, so clients' ETags stay valid
+    async with db_engine.connect() as conn:
+        assert await get_version(conn) == version
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method", ["copy", "insert"])
+async def test_diff_seed_applies_only_changes(csv_source, db_engine, monkeypatch, method):
+    monkeypatch.setattr(settings, "SEED_METHOD", method)
+    await seed_data(db_engine)
+
+    # Drift since the last seed: an edited row, a removed row and a code the source doesn't have
+    async with db_engine.begin() as conn:
+        await conn.execute(text("UPDATE swift_codes SET address = NULL WHERE swift_code = 'AAISALTRXXX'"))
+        await conn.execute(text("DELETE FROM swift_codes WHERE swift_code = 'BCHICLR10R2'"))
+        await conn.execute(text(
+            "INSERT INTO swift_codes (swift_code, bank_name, country_iso2, country_name, is_headquarter) "
+            "VALUES ('GONEPLPWXXX', 'GONE BANK', 'PL', 'POLAND', true)"
+        ))
+        version = await get_version(conn)
+
+    monkeypatch.setattr(settings, "SEED_MODE", "diff")
+    monkeypatch.setattr(settings, "SEED_DRY_RUN", True)
+    planned = await seed_data(db_engine)
+    assert (planned.inserted, planned.updated, planned.deleted, planned.unchanged) == (1, 1, 1, CSV_ROWS - 2)
+    async with db_engine.connect() as conn:
+        assert await conn.scalar(text("SELECT count(*) FROM swift_codes WHERE swift_code = 'GONEPLPWXXX'")) == 1
+        assert await get_version(conn) == version
+
+    monkeypatch.setattr(settings, "SEED_DRY_RUN", False)
+    applied = await seed_data(db_engine)
+    assert applied == planned
+
+    async with db_engine.connect() as conn:
+        codes = set((await conn.execute(text("SELECT swift_code FROM swift_codes"))).scalars())
+        address = await conn.scalar(text("SELECT address FROM swift_codes WHERE swift_code = 'AAISALTRXXX'"))
+        assert await get_version(conn) > version
+    assert len(codes) == CSV_ROWS and "GONEPLPWXXX" not in codes and "BCHICLR10R2" in codes
+    assert address is not None
+
+    # In sync now: every row hash written by Postgres matches the one computed from the source
+    again = await seed_data(db_engine)
+    assert (again.inserted, again.updated, again.deleted, again.unchanged) == (0, 0, 0, CSV_ROWS)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [0, 1])
+async def test_seed_quarantines_invalid_rows(db_engine, monkeypatch, tmp_path, chunk_size):
+    source = tmp_path / "source.csv"
+    source.write_text(
+        "COUNTRY ISO2 CODE,SWIFT CODE,NAME,ADDRESS,COUNTRY NAME\n"
+        "PL,ABCDPLPWXXX,GOOD BANK,STREET 1,POLAND\n"
+        "PL,ABCDDEPWXXX,WRONG COUNTRY BANK,STREET 2,POLAND\n"
+    )
+    quarantine = tmp_path / "quarantine.csv"
+    monkeypatch.setattr(settings, "INPUT_SOURCE", "csv")
+    monkeypatch.setattr(settings, "CSV_FILE_PATH", str(source))
+    monkeypatch.setattr(settings, "SEED_QUARANTINE_PATH", str(quarantine))
+    monkeypatch.setattr(settings, "SEED_CHUNK_SIZE", chunk_size)
+
+    report = await seed_data(db_engine)
+
+    assert report.inserted == 1
+    assert "ABCDDEPWXXX" in quarantine.read_text()
+    assert quarantine.read_text().startswith("row,")
+    assert "swift_code:country_mismatch" in quarantine.read_text()
@@ -0,0 +1,95 @@
+import asyncio
+import sys
+
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.ingestion.google_sheet import REFRESH_LOCK_KEY, sheet_refresher
+from app.ingestion.seed_data import seed_data
+
+CSV_ROWS = 1061
+
+
+@pytest.fixture
+def google_source(sheet_server, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "INPUT_SOURCE", "google")
+    monkeypatch.setattr(settings, "GOOGLE_SHEET_URL", sheet_server.url)
+    monkeypatch.setattr(settings, "GOOGLE_SHEET_CACHE_PATH", str(tmp_path / "google_sheet.csv"))
+    monkeypatch.setattr(settings, "PARSE_CACHE_DIR", str(tmp_path / "parsed"))
+    with open("data/swift_codes.csv", "rb") as source:
+        sheet_server.body = source.read()
+    return sheet_server
+
+
+def edit_sheet(server) -> None:
+    """
+    Drops the last row of the sheet and renames the bank of AAISALTRXXX.
+    """
+    body = server.body.rstrip(b"\n").rsplit(b"\n", 1)[0] + b"\n"
+    server.body = body.replace(b"AAISALTRXXX,BIC11,UNITED BANK OF ALBANIA SH.A", b"AAISALTRXXX,BIC11,RENAMED BANK")
+
+
+async def bank_name(db_engine, swift_code: str):
+    async with db_engine.connect() as conn:
+        return await conn.scalar(
+            text("SELECT bank_name FROM swift_codes WHERE swift_code = :code"), {"code": swift_code}
+        )
+
+
+@pytest.mark.asyncio
+async def test_unchanged_sheet_is_not_seeded_again(google_source, db_engine):
+    first = await seed_data(db_engine)
+    assert first.inserted == CSV_ROWS
+
+    second = await seed_data(db_engine)
+    assert (second.inserted, second.updated, second.unchanged) == (0, 0, 0)
+    assert "If-None-Match" in google_source.requests[-1]
+
+    edit_sheet(google_source)
+    report = await sheet_refresher.refresh(db_engine)
+    assert (report.inserted, report.updated, report.deleted) == (0, 1, 1)
+
+    async with db_engine.connect() as conn:
+        assert await conn.scalar(text("SELECT count(*) FROM swift_codes")) == CSV_ROWS - 1
+    assert await bank_name(db_engine, "AAISALTRXXX") == "RENAMED BANK"
+
+
+@pytest.fixture
+def polling(google_source, monkeypatch):
+    monkeypatch.setattr(settings, "GOOGLE_SHEET_REFRESH_INTERVAL", 0.05)
+    return google_source
+
+
+@pytest.mark.asyncio
+async def test_lifespan_polls_the_sheet(polling, client, db_engine):
+    edit_sheet(polling)
+
+    # The report is recorded once the seed and the snapshot refresh are both done
+    for _ in range(200):
+        if sheet_refresher.last_report is not None or sheet_refresher.last_error is not None:
+            break
+        await asyncio.sleep(0.05)
+    assert sheet_refresher.last_error is None
+    assert sheet_refresher.last_report.inserted == CSV_ROWS - 1
+    assert await bank_name(db_engine, "AAISALTRXXX") == "RENAMED BANK"
+
+    found = await client.get("/v1/swift-codes/AAISALTRXXX")
+    assert found.json()["bankName"] == "RENAMED BANK"
+
+
+@pytest.mark.asyncio
+async def test_refresh_skips_while_another_worker_holds_the_lock(google_source, db_engine, monkeypatch):
+    async with db_engine.connect() as other_worker:
+        await other_worker.execute(text("SELECT pg_advisory_lock(:key)"), {"key": REFRESH_LOCK_KEY})
+        with monkeypatch.context() as patch:
+            # A skipped poll doesn't import the ingestion stack (None makes the import fail)
+            patch.setitem(sys.modules, "app.ingestion.seed_data", None)
+            assert await sheet_refresher.refresh(db_engine) is None
+        await other_worker.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": REFRESH_LOCK_KEY})
+
+    # Neither the sheet nor its cache were touched
+    assert google_source.requests == []
+
+    report = await sheet_refresher.refresh(db_engine)
+    assert report.inserted == CSV_ROWS
@@ -1,4 +1,18 @@
+import asyncio
+import json
+
 import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql.asyncpg import AsyncAdapt_asyncpg_ss_cursor
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1 import swift_codes as swift_codes_api
+from app.core.config import settings
+from app.core.database import ReadConnection
+from app.ingestion.snapshot_export import export_snapshot
+from app.services.coalescer import swift_code_loader
+from app.services.snapshot import EXPORT_LOCK_KEY, SnapshotFollower, SwiftCodeSnapshot, snapshot, snapshot_follower
+from app.services.versioning import bump_version, get_version
 
 # Helper HQ & Branch Payloads
 HQ_PAYLOAD = {
@@ -91,4 +105,401 @@ async def test_delete_swift_code(client):
     assert del_response.status_code == 200
 
     get_response = await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")
-    assert get_response.status_code == 404
\ No newline at end of file
+    assert get_response.status_code == 404
+
+@pytest.fixture
+def enable_snapshot(monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_ENABLED", True)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_serves_reads_and_tracks_writes(enable_snapshot, client):
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    await client.post("/v1/swift-codes", json=BRANCH_PAYLOAD)
+    assert snapshot.loaded
+
+    hq_response = await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")
+    assert [branch["swiftCode"] for branch in hq_response.json()["branches"]] == [BRANCH_PAYLOAD["swiftCode"]]
+
+    await client.delete(f"/v1/swift-codes/{BRANCH_PAYLOAD['swiftCode']}")
+
+    branch_response = await client.get(f"/v1/swift-codes/{BRANCH_PAYLOAD['swiftCode']}")
+    assert branch_response.status_code == 404
+
+    country_response = await client.get(f"/v1/swift-codes/country/{HQ_PAYLOAD['countryISO2']}")
+    assert len(country_response.json()["swiftCodes"]) == 1
+
+
+def session_factory(db_engine):
+    """
+    get_db-like session generator on db_engine, for calling SnapshotFollower.check directly.
+    """
+    async def sessions():
+        async with AsyncSession(db_engine) as session:
+            yield session
+    return sessions
+
+
+async def insert_out_of_band(db_engine, payload: dict) -> None:
+    """
+    Inserts an entry and bumps the dataset version without the API, like another worker would.
+    """
+    async with db_engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO swift_codes (swift_code, bank_name, address, country_iso2, country_name, is_headquarter) "
+                "VALUES (:swift_code, :bank_name, :address, :country_iso2, :country_name, :is_headquarter)"
+            ),
+            {
+                "swift_code": payload["swiftCode"], "bank_name": payload["bankName"],
+                "address": payload["address"], "country_iso2": payload["countryISO2"],
+                "country_name": payload["countryName"], "is_headquarter": payload["isHeadquarter"],
+            }
+        )
+        await bump_version(conn)
+
+
+@pytest.fixture
+def follow_snapshot(enable_snapshot, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_REFRESH_INTERVAL", 0.05)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_follows_writes_of_other_processes(follow_snapshot, db_engine, client):
+    assert (await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")).status_code == 404
+
+    # Another worker or a `swift-ingest` command writes, this process's snapshot doesn't see it
+    await insert_out_of_band(db_engine, HQ_PAYLOAD)
+
+    for _ in range(100):
+        response = await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")
+        if response.status_code == 200:
+            break
+        await asyncio.sleep(0.05)
+    assert response.status_code == 200
+    assert response.json()["bankName"] == HQ_PAYLOAD["bankName"]
+    assert snapshot_follower.reloads >= 1
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reloads_after_a_write_that_skipped_a_version(enable_snapshot, db_engine, client):
+    sessions = session_factory(db_engine)
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    await insert_out_of_band(db_engine, BRANCH_PAYLOAD)
+    await client.post("/v1/swift-codes", json={**BRANCH_PAYLOAD, "swiftCode": "TEATUS33DEF"})
+
+    # The second write's version skipped the out-of-band one, the snapshot stays behind
+    async with db_engine.connect() as conn:
+        assert snapshot.version == await get_version(conn) - 2
+    assert (await client.get(f"/v1/swift-codes/{BRANCH_PAYLOAD['swiftCode']}")).status_code == 404
+
+    assert await snapshot_follower.check(sessions)
+    assert (await client.get(f"/v1/swift-codes/{BRANCH_PAYLOAD['swiftCode']}")).status_code == 200
+    assert not await snapshot_follower.check(sessions)
+
+
+@pytest.fixture
+def enable_snapshot_file(enable_snapshot, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "SNAPSHOT_FILE", str(tmp_path / "swift_codes.snap"))
+    monkeypatch.setattr(settings, "SNAPSHOT_FILE_CHECK_INTERVAL", 0)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_file_serves_reads_and_follows_exports(enable_snapshot_file, client, db_engine):
+    # Exported from the empty table at startup, the writes are overlaid on it
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    await client.post("/v1/swift-codes", json=BRANCH_PAYLOAD)
+
+    hq_response = await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")
+    assert [branch["swiftCode"] for branch in hq_response.json()["branches"]] == [BRANCH_PAYLOAD["swiftCode"]]
+
+    # Changed outside the API, then exported by another process
+    async with db_engine.begin() as conn:
+        await conn.execute(text("DELETE FROM swift_codes WHERE swift_code = :code"), {"code": BRANCH_PAYLOAD["swiftCode"]})
+    assert await export_snapshot(db_engine, settings.SNAPSHOT_FILE) == 1
+
+    assert (await client.get(f"/v1/swift-codes/{BRANCH_PAYLOAD['swiftCode']}")).status_code == 404
+    country_response = await client.get(f"/v1/swift-codes/country/{HQ_PAYLOAD['countryISO2']}")
+    assert [code["swiftCode"] for code in country_response.json()["swiftCodes"]] == [HQ_PAYLOAD["swiftCode"]]
+
+
+@pytest.fixture
+def checked_snapshot_file(enable_snapshot_file, monkeypatch):
+    # Checks are called by the test
+    monkeypatch.setattr(settings, "SNAPSHOT_REFRESH_INTERVAL", 0)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_file_is_exported_for_other_workers_after_api_writes(checked_snapshot_file, client, db_engine):
+    sessions = session_factory(db_engine)
+    # Another worker of the host, mapping the file exported at startup
+    other_worker = SwiftCodeSnapshot()
+    other_worker.map_file(settings.SNAPSHOT_FILE, check_interval=0)
+    other_follower = SnapshotFollower(other_worker)
+
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    assert other_worker.get(HQ_PAYLOAD["swiftCode"]) is None
+
+    # The export is skipped while another worker holds the lock
+    async with db_engine.connect() as conn:
+        await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": EXPORT_LOCK_KEY})
+        assert not await snapshot_follower.check(sessions)
+        await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": EXPORT_LOCK_KEY})
+    assert other_worker.get(HQ_PAYLOAD["swiftCode"]) is None
+
+    assert await snapshot_follower.check(sessions)
+    assert other_worker.get(HQ_PAYLOAD["swiftCode"]).bank_name == HQ_PAYLOAD["bankName"]
+    # Both workers now map the current version, nothing left to export
+    assert not await other_follower.check(sessions)
+    assert not await snapshot_follower.check(sessions)
+    other_worker.clear()
+
+
+@pytest.mark.asyncio
+async def test_hq_lookup_ignores_other_banks_and_missing_hq(client):
+    other_bank = {**BRANCH_PAYLOAD, "swiftCode": "TEATUS34ABC"}
+    await client.post("/v1/swift-codes", json=BRANCH_PAYLOAD)
+    await client.post("/v1/swift-codes", json=other_bank)
+
+    # Only branches exist for this prefix, so the HQ itself is missing
+    missing = await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")
+    assert missing.status_code == 404
+
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    response = await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode'].lower()}")
+    assert [branch["swiftCode"] for branch in response.json()["branches"]] == [BRANCH_PAYLOAD["swiftCode"]]
+
+
+@pytest.mark.asyncio
+async def test_lookup_many_swift_codes(client):
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    await client.post("/v1/swift-codes", json=BRANCH_PAYLOAD)
+
+    response = await client.post("/v1/swift-codes/lookup", json={
+        "swiftCodes": [BRANCH_PAYLOAD["swiftCode"], HQ_PAYLOAD["swiftCode"].lower(), "MISSINGCODE", BRANCH_PAYLOAD["swiftCode"]]
+    })
+    body = response.json()
+
+    assert response.status_code == 200
+    assert [entry["swiftCode"] for entry in body["swiftCodes"]] == [BRANCH_PAYLOAD["swiftCode"], HQ_PAYLOAD["swiftCode"]]
+    assert body["swiftCodes"][0]["countryName"] == HQ_PAYLOAD["countryName"]
+    assert [branch["swiftCode"] for branch in body["swiftCodes"][1]["branches"]] == [BRANCH_PAYLOAD["swiftCode"]]
+    assert body["notFound"] == ["MISSINGCODE"]
+
+
+@pytest.mark.asyncio
+async def test_lookup_rejects_oversized_batch(client):
+    codes = [f"BANK{i:07d}" for i in range(settings.LOOKUP_MAX_BATCH_SIZE + 1)]
+
+    response = await client.post("/v1/swift-codes/lookup", json={"swiftCodes": codes})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "too_long"
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_reports_per_item_status(client):
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+
+    response = await client.post("/v1/swift-codes/bulk", json={"swiftCodes": [
+        HQ_PAYLOAD,
+        BRANCH_PAYLOAD,
+        BRANCH_PAYLOAD,
+        {**BRANCH_PAYLOAD, "swiftCode": "teatus33low"},
+        {**BRANCH_PAYLOAD, "swiftCode": "TEATUS"},
+        # Malformed entries fail on their own, not the whole batch
+        {**BRANCH_PAYLOAD, "swiftCode": "TEATUS33DEF", "isHeadquarter": "maybe"},
+        {"swiftCode": "TEATUS33GHI"},
+        "TEATUS33JKL",
+    ]})
+    body = response.json()
+
+    assert response.status_code == 200
+    assert [item["status"] for item in body["results"]] == [
+        "duplicate", "created", "duplicate", "invalid", "invalid", "invalid", "invalid", "invalid"
+    ]
+    assert body["summary"] == {"duplicate": 2, "created": 1, "invalid": 5}
+    assert body["results"][5]["swiftCode"] == "TEATUS33DEF"
+    assert body["results"][5]["detail"].startswith("isHeadquarter:")
+    assert "bankName: Field required" in body["results"][6]["detail"]
+    assert body["results"][7]["swiftCode"] == ""
+
+    hq_response = await client.get(f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}")
+    assert len(hq_response.json()["branches"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_reports_per_item_status(client):
+    await client.post("/v1/swift-codes/bulk", json={"swiftCodes": [HQ_PAYLOAD, BRANCH_PAYLOAD]})
+
+    response = await client.request("DELETE", "/v1/swift-codes/bulk", json={
+        "swiftCodes": [HQ_PAYLOAD["swiftCode"], "MISSINGCODE", BRANCH_PAYLOAD["swiftCode"].lower(), 42]
+    })
+
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["results"]] == ["deleted", "not_found", "deleted", "invalid"]
+
+    country_response = await client.get(f"/v1/swift-codes/country/{HQ_PAYLOAD['countryISO2']}")
+    assert country_response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_by_country_keyset_pagination(client):
+    codes = [f"TEATUS33{suffix}" for suffix in ["AAA", "BBB", "CCC", "XXX"]]
+    for code in reversed(codes):
+        await client.post("/v1/swift-codes", json={**HQ_PAYLOAD, "swiftCode": code, "isHeadquarter": code.endswith("XXX")})
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        body = (await client.get("/v1/swift-codes/country/us", params=params)).json()
+        pages.append([entry["swiftCode"] for entry in body["swiftCodes"]])
+        cursor = body["nextCursor"]
+        if cursor is None:
+            break
+
+    assert pages == [codes[:3], codes[3:]]
+
+
+@pytest.mark.asyncio
+async def test_get_by_country_ndjson_stream(client):
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    await client.post("/v1/swift-codes", json=BRANCH_PAYLOAD)
+
+    headers = {"Accept": "application/x-ndjson"}
+    response = await client.get(f"/v1/swift-codes/country/{HQ_PAYLOAD['countryISO2']}", headers=headers)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [line["swiftCode"] for line in lines] == [BRANCH_PAYLOAD["swiftCode"], HQ_PAYLOAD["swiftCode"]]
+
+    missing = await client.get("/v1/swift-codes/country/ZZ", headers=headers)
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_ndjson_stream_fetches_rows_in_batches(client, db_engine, monkeypatch):
+    codes = [f"TEATUS33{suffix}" for suffix in ["AAA", "BBB", "CCC", "DDD", "XXX"]]
+    await client.post("/v1/swift-codes/bulk", json={"swiftCodes": [
+        {**HQ_PAYLOAD, "swiftCode": code, "isHeadquarter": code.endswith("XXX")} for code in codes
+    ]})
+    monkeypatch.setattr(swift_codes_api, "STREAM_BATCH_SIZE", 2)
+
+    # Server-side cursor fetches and sent lines, in the order they happen
+    events = []
+    fetchmany = AsyncAdapt_asyncpg_ss_cursor.fetchmany
+
+    def spy_fetchmany(self, size=None):
+        rows = fetchmany(self, size)
+        events.append(("fetch", size, len(rows)))
+        return rows
+
+    def fail_fetchall(self):
+        raise AssertionError("the stream materialized the whole result")
+
+    monkeypatch.setattr(AsyncAdapt_asyncpg_ss_cursor, "fetchmany", spy_fetchmany)
+    monkeypatch.setattr(AsyncAdapt_asyncpg_ss_cursor, "fetchall", fail_fetchall)
+
+    response = await swift_codes_api.stream_country_codes(ReadConnection(db_engine), HQ_PAYLOAD["countryISO2"])
+    async for line in response.body_iterator:
+        events.append(("line", json.loads(line)["swiftCode"]))
+
+    # Lines go out as batches arrive (the first fetch is a single row), never more than STREAM_BATCH_SIZE rows at once
+    assert [event[1] for event in events if event[0] == "line"] == codes
+    assert max(event[1] for event in events if event[0] == "fetch") == 2
+    assert events[:3] == [("fetch", 1, 1), ("line", codes[0]), ("fetch", 2, 2)]
+    assert "content-length" not in response.headers
+
+
+@pytest.fixture
+def snapshot_mode(request, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_ENABLED", request.param)
+    return request.param
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("snapshot_mode", [False, True], indirect=True)
+async def test_conditional_get_revalidates_after_writes(snapshot_mode, client):
+    assert snapshot.loaded == snapshot_mode
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    url = f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}"
+
+    first = await client.get(url)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == settings.CACHE_CONTROL
+
+    not_modified = await client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+
+    await client.post("/v1/swift-codes", json=BRANCH_PAYLOAD)
+
+    modified = await client.get(url, headers={"If-None-Match": etag})
+    assert modified.status_code == 200
+    assert modified.headers["etag"] != etag
+    assert len(modified.json()["branches"]) == 1
+
+    country_url = f"/v1/swift-codes/country/{HQ_PAYLOAD['countryISO2']}"
+    country_etag = (await client.get(country_url)).headers["etag"]
+    assert (await client.get(country_url, headers={"If-None-Match": country_etag})).status_code == 304
+
+
+@pytest.fixture
+def enable_response_cache(monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_BACKEND", "memory")
+
+
+@pytest.mark.asyncio
+async def test_response_cache_serves_hits_and_invalidates_on_writes(enable_response_cache, client):
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    hq_url = f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}"
+    country_url = f"/v1/swift-codes/country/{HQ_PAYLOAD['countryISO2']}"
+
+    first = await client.get(hq_url)
+    second = await client.get(hq_url, headers={"If-None-Match": first.headers["etag"]})
+    assert first.json()["branches"] == []
+    assert second.status_code == 304
+    await client.get(country_url)
+
+    # A new branch invalidates its HQ and its country
+    await client.post("/v1/swift-codes", json=BRANCH_PAYLOAD)
+    assert len((await client.get(hq_url)).json()["branches"]) == 1
+    assert len((await client.get(country_url)).json()["swiftCodes"]) == 2
+
+    await client.delete(f"/v1/swift-codes/{BRANCH_PAYLOAD['swiftCode']}")
+    assert (await client.get(hq_url)).json()["branches"] == []
+    assert (await client.get(f"/v1/swift-codes/{BRANCH_PAYLOAD['swiftCode']}")).status_code == 404
+
+    stats = (await client.get("/v1/cache/stats")).json()
+    assert stats["enabled"] is True
+    assert (stats["hits"], stats["misses"]) == (1, 6)
+
+
+@pytest.fixture
+def enable_coalescing(monkeypatch):
+    monkeypatch.setattr(settings, "COALESCE_LOOKUPS", True)
+    monkeypatch.setattr(settings, "COALESCE_WINDOW_MS", 50)
+    monkeypatch.setattr(settings, "COALESCE_MAX_BATCH", 100)
+
+
+@pytest.mark.asyncio
+async def test_coalesced_lookups_share_one_query(enable_coalescing, client):
+    await client.post("/v1/swift-codes", json=HQ_PAYLOAD)
+    await client.post("/v1/swift-codes", json=BRANCH_PAYLOAD)
+    batches = swift_code_loader.batches
+
+    codes = [HQ_PAYLOAD["swiftCode"], BRANCH_PAYLOAD["swiftCode"], "MISSUS33XXX"] * 5
+    responses = await asyncio.gather(*[client.get(f"/v1/swift-codes/{code.lower()}") for code in codes])
+
+    assert swift_code_loader.batches == batches + 1
+    assert [response.status_code for response in responses] == [200, 200, 404] * 5
+    assert [branch["swiftCode"] for branch in responses[0].json()["branches"]] == [BRANCH_PAYLOAD["swiftCode"]]
+    assert responses[1].json()["swiftCode"] == BRANCH_PAYLOAD["swiftCode"]
+    assert responses[0].headers["etag"] == responses[1].headers["etag"]
+
+    # Answered from the version alone, no batch fetches the row
+    not_modified = await client.get(
+        f"/v1/swift-codes/{HQ_PAYLOAD['swiftCode']}", headers={"If-None-Match": responses[0].headers["etag"]}
+    )
+    assert not_modified.status_code == 304
+    assert swift_code_loader.batches == batches + 1
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from app.services.cache import MemoryBackend, RedisBackend, ResponseCache, invalidation_keys
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_lru_and_expires():
+    """
+    Test that the least recently used entry is evicted first and that expired entries are dropped.
+    """
+    backend = MemoryBackend(max_entries=2)
+    await backend.set("a", b"1", ttl=60)
+    await backend.set("b", b"2", ttl=60)
+    assert await backend.get("a") == b"1"  # "b" is now the least recently used
+
+    await backend.set("c", b"3", ttl=60)
+    assert await backend.get("b") is None
+    assert await backend.get("a") == b"1"
+    assert len(backend) == 2
+
+    await backend.set("d", b"4", ttl=0)
+    assert await backend.get("d") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_are_single_flighted():
+    """
+    Test that concurrent misses on one key run the loader once and share its result.
+    """
+    cache = ResponseCache()
+    cache.configure(MemoryBackend(max_entries=10), ttl=60)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return '"v1"', b'{"swiftCode": "BANKPLPWXXX"}'
+
+    results = await asyncio.gather(*[cache.get_or_load("code:BANKPLPWXXX", loader) for _ in range(5)])
+    assert calls == 1
+    assert all(result == ('"v1"', b'{"swiftCode": "BANKPLPWXXX"}') for result in results)
+
+    assert await cache.get_or_load("code:BANKPLPWXXX", loader) == results[0]
+    assert (cache.hits, cache.misses) == (1, 5)
+
+
+@pytest.mark.asyncio
+async def test_load_overlapping_a_write_is_not_stored_nor_joined():
+    """
+    Test that a load invalidated while it runs answers its waiters, but later requests load again
+    and only their post-write response is cached.
+    """
+    cache = ResponseCache()
+    cache.configure(MemoryBackend(max_entries=10), ttl=60)
+    release = asyncio.Event()
+
+    async def old_loader():
+        await release.wait()
+        return '"v1"', b"old"
+
+    async def new_loader():
+        return '"v2"', b"new"
+
+    first = asyncio.create_task(cache.get_or_load("code:BANKPLPWXXX", old_loader))
+    joined = asyncio.create_task(cache.get_or_load("code:BANKPLPWXXX", new_loader))
+    await asyncio.sleep(0)
+
+    # A write commits & invalidates while the first load is still reading
+    await cache.invalidate(["code:BANKPLPWXXX"])
+    after_write = asyncio.create_task(cache.get_or_load("code:BANKPLPWXXX", new_loader))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await first == await joined == ('"v1"', b"old")
+    assert await after_write == ('"v2"', b"new")
+    assert await cache.get_or_load("code:BANKPLPWXXX", old_loader) == ('"v2"', b"new")
+
+
+@pytest.mark.asyncio
+async def test_loader_failures_reach_waiters_and_are_not_cached():
+    cache = ResponseCache()
+    cache.configure(MemoryBackend(max_entries=10), ttl=60)
+
+    async def failing_loader():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database is down")
+
+    results = await asyncio.gather(
+        *[cache.get_or_load("country:PL", failing_loader) for _ in range(3)], return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def missing_loader():
+        return None
+
+    assert await cache.get_or_load("country:PL", missing_loader) is None
+    assert await cache.backend.get("country:PL") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_round_trip_and_invalidation():
+    """
+    Test the Redis backend against an in-process server stand-in, including invalidation of
+    the code, its HQ and its country.
+    """
+    cache = ResponseCache()
+    cache.configure(RedisBackend(client=FakeAsyncRedis()), ttl=60)
+
+    async def loader():
+        return '"v3"', b"{}"
+
+    for key in ["code:BANKPLPWKRK", "code:BANKPLPWXXX", "country:PL", "code:OTHRDEFFXXX"]:
+        await cache.get_or_load(key, loader)
+    assert await cache.backend.client.ttl("swift-api:country:PL") == 60
+
+    await cache.invalidate(invalidation_keys("BANKPLPWKRK", "PL"))
+
+    assert await cache.backend.get("code:BANKPLPWKRK") is None
+    assert await cache.backend.get("code:BANKPLPWXXX") is None
+    assert await cache.backend.get("country:PL") is None
+    assert await cache.backend.get("code:OTHRDEFFXXX") == b'"v3" {}'
+    await cache.close()
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.ingestion.google_sheet import fetch_sheet, google_sheet_csv_url, mark_loaded
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "GOOGLE_SHEET_RETRY_BACKOFF", 0)
+    monkeypatch.setattr(settings, "GOOGLE_SHEET_FETCH_ATTEMPTS", 3)
+
+
+def test_google_sheet_csv_url():
+    url = "https://docs.google.com/spreadsheets/d/SHEETID/edit?gid=42#gid=42"
+
+    assert google_sheet_csv_url(url) == (
+        "https://docs.google.com/spreadsheets/d/SHEETID/export?format=csv&id=SHEETID&gid=42"
+    )
+    # Any other CSV endpoint is fetched as it is
+    assert google_sheet_csv_url("http://127.0.0.1:8080/sheet.csv") == "http://127.0.0.1:8080/sheet.csv"
+    with pytest.raises(ValueError, match="Couldn't extract spreadsheet ID"):
+        google_sheet_csv_url("https://docs.google.com/spreadsheets/")
+
+
+def test_fetch_sheet_revalidates_with_etag(sheet_server, tmp_path, fast_retries):
+    path = str(tmp_path / "sheet.csv")
+
+    first = asyncio.run(fetch_sheet(sheet_server.url, path))
+    assert (first.status, first.changed) == (200, True)
+    assert open(path, "rb").read() == sheet_server.body
+
+    # Downloaded but never loaded: still a change
+    assert asyncio.run(fetch_sheet(sheet_server.url, path)).changed
+    mark_loaded(path)
+    second = asyncio.run(fetch_sheet(sheet_server.url, path))
+    assert (second.status, second.changed) == (304, False)
+    assert sheet_server.requests[-1]["If-None-Match"] == sheet_server.requests[1]["If-None-Match"]
+
+    sheet_server.body += b"EFGHPLPWXXX,OTHER BANK\n"
+    third = asyncio.run(fetch_sheet(sheet_server.url, path))
+    assert (third.status, third.changed) == (200, True)
+    assert open(path, "rb").read() == sheet_server.body
+
+
+def test_fetch_sheet_retries_server_errors(sheet_server, tmp_path, fast_retries):
+    path = str(tmp_path / "sheet.csv")
+
+    sheet_server.failures = 2
+    assert asyncio.run(fetch_sheet(sheet_server.url, path)).status == 200
+    assert len(sheet_server.requests) == 3
+
+    sheet_server.failures = 3
+    with pytest.raises(RuntimeError, match="503"):
+        asyncio.run(fetch_sheet(sheet_server.url, path))
+    # The failed fetch left the previous copy alone
+    assert open(path, "rb").read() == sheet_server.body
+
+
+def test_fetch_sheet_times_out_stalled_reads(sheet_server, tmp_path, fast_retries, monkeypatch):
+    monkeypatch.setattr(settings, "GOOGLE_SHEET_READ_TIMEOUT", 0.1)
+    monkeypatch.setattr(settings, "GOOGLE_SHEET_FETCH_ATTEMPTS", 2)
+    sheet_server.delay = 0.5
+
+    with pytest.raises(RuntimeError, match="ReadTimeout"):
+        asyncio.run(fetch_sheet(sheet_server.url, str(tmp_path / "sheet.csv")))
+    assert len(sheet_server.requests) == 2
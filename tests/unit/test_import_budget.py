@@ -0,0 +1,48 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Generous enough for slow CI machines, a worker importing pandas again blows the RSS budget
+IMPORT_TIME_BUDGET_S = 3.0
+RSS_BUDGET_MB = 90
+INGESTION_MODULES = ["pandas", "numpy", "openpyxl"]
+
+# Peak RSS comes from VmHWM: ru_maxrss of a spawned child also counts the pytest process it was forked from
+PROBE = """
+import json, re, resource, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+try:
+    with open("/proc/self/status") as status:
+        rss_mb = int(re.search(r"VmHWM:\\s+(\\d+) kB", status.read()).group(1)) / 1024
+except OSError:
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({{"seconds": seconds, "rss_mb": rss_mb, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure_import(module: str) -> dict:
+    """
+    Imports a module in a fresh interpreter, so nothing imported by the test session skews the numbers.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_serving_app_import_budget():
+    probe = measure_import("app.main")
+
+    assert not [module for module in INGESTION_MODULES if module in probe["modules"]]
+    assert probe["seconds"] < IMPORT_TIME_BUDGET_S
+    assert probe["rss_mb"] < RSS_BUDGET_MB
+
+
+@pytest.mark.parametrize("module", ["app.ingestion.cli"])
+def test_ingestion_cli_loads_pandas_lazily(module):
+    probe = measure_import(module)
+    assert "pandas" not in probe["modules"]
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from app.ingestion.load_data import LoadReport, plan_diff, row_hash, to_records
+
+
+def test_to_records_normalizes_and_deduplicates():
+    """
+    Test that to_records uppercases codes and countries, derives is_headquarter,
+    turns empty addresses into None and keeps the last duplicate of a code.
+    """
+    df = pd.DataFrame({
+        "swift_code": [" abcdplpwxxx", "ABCDPLPWKRK", "ABCDPLPWXXX"],
+        "bank_name": ["Old Name", "Branch Bank", "New Name"],
+        "address": ["Street 1", np.nan, "Street 2"],
+        "country_iso2": ["pl", "PL", "PL"],
+        "country_name": ["Poland", "POLAND", "poland"],
+    })
+
+    records = to_records(df)
+
+    assert records == [
+        ("ABCDPLPWKRK", "Branch Bank", None, "PL", "POLAND", False, None),
+        ("ABCDPLPWXXX", "New Name", "Street 2", "PL", "POLAND", True, None),
+    ]
+
+
+def test_load_report_addition():
+    report = LoadReport(inserted=2, updated=1) + LoadReport(unchanged=3)
+    assert (report.inserted, report.updated, report.unchanged, report.total) == (2, 1, 3, 6)
+
+
+def test_plan_diff_sorts_changes():
+    kept = ("ABCDPLPWXXX", "Bank", "Street 1", "PL", "POLAND", True, "WARSZAWA")
+    changed = ("ABCDPLPWKRK", "Bank", None, "PL", "POLAND", False, None)
+    new = ("EFGHPLPWXXX", "Other Bank", None, "PL", "POLAND", True, None)
+    existing = {
+        kept[0]: row_hash(kept),
+        # Same values but an empty address instead of NULL
+        changed[0]: row_hash(changed[:2] + ("",) + changed[3:]),
+        "GONEPLPWXXX": row_hash(new),
+    }
+
+    plan = plan_diff(existing, [kept, changed, new])
+
+    assert (plan.inserts, plan.updates, plan.deletes, plan.unchanged) == ([new], [changed], ["GONEPLPWXXX"], 1)
+    assert plan_diff(existing, [kept], delete_missing=False).deletes == []
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from app.ingestion import parse_cache
+from app.ingestion.parse_cache import cached_parse
+from app.ingestion.parse_data import parse_csv
+from app.ingestion.seed_data import prepare_records
+
+
+class CountingParser:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, file_path: str) -> pd.DataFrame:
+        self.calls += 1
+        return parse_csv(file_path)
+
+
+def test_cached_parse_reuses_entry_until_source_changes(tmp_path, monkeypatch):
+    source = tmp_path / "source.csv"
+    source.write_text("SWIFT CODE,NAME,ADDRESS\nABCDPLPWXXX,BANK,\n")
+    cache_dir = str(tmp_path / "cache")
+    parse = CountingParser()
+
+    first = cached_parse(str(source), "csv", parse, cache_dir)
+    second = cached_parse(str(source), "csv", parse, cache_dir)
+
+    assert parse.calls == 1
+    assert second["NAME"].dtype == pd.StringDtype("pyarrow")
+    assert second["SWIFT CODE"].tolist() == first["SWIFT CODE"].tolist()
+    assert second["ADDRESS"].isna().all()
+
+    source.write_text("SWIFT CODE,NAME,ADDRESS\nEFGHPLPWXXX,OTHER BANK,STREET\n")
+    assert cached_parse(str(source), "csv", parse, cache_dir)["SWIFT CODE"].tolist() == ["EFGHPLPWXXX"]
+
+    monkeypatch.setattr(parse_cache, "PARSER_VERSION", parse_cache.PARSER_VERSION + 1)
+    cached_parse(str(source), "csv", parse, cache_dir)
+
+    assert parse.calls == 3
+    # Only the latest entry is kept
+    assert len(list((tmp_path / "cache").glob("*.arrow"))) == 1
+
+
+def test_cached_frame_loads_the_same_records(tmp_path):
+    source = "data/swift_codes.csv"
+    cache_dir = str(tmp_path / "cache")
+
+    parsed = cached_parse(source, "csv", parse_csv, cache_dir)
+    cached = cached_parse(source, "csv", parse_csv, cache_dir)
+
+    assert prepare_records(cached) == prepare_records(parsed)
@@ -1,6 +1,13 @@
 import pandas as pd
 
-from app.ingestion.parse_data import parse_csv, parse_xlsx, parse_google_sheet
+from app.core.config import settings
+from app.ingestion.parse_data import (
+    parse_csv,
+    parse_csv_chunks,
+    parse_google_sheet,
+    parse_xlsx,
+    parse_xlsx_chunks,
+)
 
 def test_parse_csv(tmp_path):
     """
@@ -41,23 +48,37 @@ def test_parse_xlsx(tmp_path):
     pd.testing.assert_frame_equal(df, expected_df)
 
 
-def test_parse_google_sheet(monkeypatch):
+def test_parse_google_sheet(sheet_server, tmp_path, monkeypatch):
     """
-    Test the Google Sheets parser by monkeypatching pandas.read_csv
+    Test the Google Sheets parser against a local stand-in of the CSV export,
     so that we don’t perform a real network call.
     """
+    monkeypatch.setattr(settings, "GOOGLE_SHEET_CACHE_PATH", str(tmp_path / "sheet.csv"))
+    sheet_server.body = b"col1,col2\n5,7\n6,8\n"
     dummy_df = pd.DataFrame({
         "col1": [5, 6],
         "col2": [7, 8]
     })
-    
-    def fake_read_csv(url, *args, **kwargs):
-        # Verify that URL was correctly converted to an export format
-        assert "export?format=csv" in url
-        return dummy_df
 
-    monkeypatch.setattr(pd, "read_csv", fake_read_csv)
-    dummy_url = "https://docs.google.com/spreadsheets/d/TESTSPREADSHEETID/expsort?format=cXsv&id=TESTSPREADSHEETID&gid=0"
-    df = parse_google_sheet(dummy_url)
+    df = parse_google_sheet(sheet_server.url)
+
+    pd.testing.assert_frame_equal(df, dummy_df)
+
+def test_parse_chunks_keep_continuous_index(tmp_path):
+    """
+    Test that streamed CSV and XLSX chunks respect chunk_size and, concatenated,
+    match the DataFrame returned by the non-streaming parsers.
+    """
+    expected_df = pd.DataFrame({
+        "col1": list(range(5)),
+        "col2": [f"value {i}" for i in range(5)]
+    })
+    csv_file = tmp_path / "test.csv"
+    xlsx_file = tmp_path / "test.xlsx"
+    expected_df.to_csv(csv_file, index=False)
+    expected_df.to_excel(xlsx_file, index=False, engine='openpyxl')
 
-    pd.testing.assert_frame_equal(df, dummy_df)
\ No newline at end of file
+    for chunks in (parse_csv_chunks(str(csv_file), 2), parse_xlsx_chunks(str(xlsx_file), 2)):
+        chunks = list(chunks)
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        pd.testing.assert_frame_equal(pd.concat(chunks), expected_df)
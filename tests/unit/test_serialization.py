@@ -0,0 +1,30 @@
+from app.schemas.swift_code import (
+    CountrySwiftCodesResponse,
+    FullBranchSwiftCodeResponse,
+    HeadquarterSwiftCodeResponse,
+)
+from app.services.serialization import country_dict, swift_code_dict
+from app.services.snapshot import SwiftCodeRecord
+
+HQ = SwiftCodeRecord("TESTPLPWXXX", "Test Bank", "Street 1", "PL", "POLAND", True)
+BRANCH = SwiftCodeRecord("TESTPLPWKRK", "Test Bank", None, "PL", "POLAND", False)
+
+
+def test_fast_serialization_matches_response_schemas():
+    """
+    Test that the fast path produces exactly what the Pydantic schemas would,
+    including key order, for HQ, branch and country responses.
+    """
+    hq_expected = HeadquarterSwiftCodeResponse.model_validate(
+        {**HQ.__dict__, "branches": [BRANCH.__dict__]}
+    ).model_dump(by_alias=False)
+    branch_expected = FullBranchSwiftCodeResponse.model_validate(BRANCH).model_dump(by_alias=False)
+    country_expected = CountrySwiftCodesResponse.model_validate({
+        "countryISO2": "PL",
+        "countryName": "POLAND",
+        "swiftCodes": [HQ.__dict__, BRANCH.__dict__],
+    }).model_dump(by_alias=False)
+
+    assert list(swift_code_dict(HQ, [BRANCH]).items()) == list(hq_expected.items())
+    assert list(swift_code_dict(BRANCH).items()) == list(branch_expected.items())
+    assert list(country_dict("PL", [HQ, BRANCH]).items()) == list(country_expected.items())
@@ -0,0 +1,133 @@
+from app.models.swift_code import SwiftCode
+from app.services.snapshot import SwiftCodeRecord, SwiftCodeSnapshot
+from app.services.snapshot_file import write_snapshot_file
+
+
+def make_code(swift_code: str, country_iso2: str = "PL") -> SwiftCode:
+    return SwiftCode(
+        swift_code=swift_code,
+        bank_name="Test Bank",
+        address="Test Street 1",
+        country_iso2=country_iso2,
+        country_name="POLAND" if country_iso2 == "PL" else "GERMANY",
+        is_headquarter=swift_code.endswith("XXX"),
+    )
+
+
+def test_snapshot_branches_and_country_buckets():
+    """
+    Test that HQ expansion only returns codes sharing the 8-char prefix,
+    and that country buckets are kept sorted.
+    """
+    snapshot = SwiftCodeSnapshot()
+    for code in ["BANKPLPWXXX", "BANKPLPWKRK", "BANKPLPWAAA", "BANKPLPXXXX", "OTHRDEFFXXX"]:
+        snapshot.add(make_code(code, "DE" if code.startswith("OTHR") else "PL"))
+
+    branches = [record.swift_code for record in snapshot.branches("bankplpwxxx")]
+    assert branches == ["BANKPLPWAAA", "BANKPLPWKRK"]
+
+    country_codes = [record.swift_code for record in snapshot.by_country("pl")]
+    assert country_codes == ["BANKPLPWAAA", "BANKPLPWKRK", "BANKPLPWXXX", "BANKPLPXXXX"]
+    assert snapshot.get("othrdeffxxx").country_iso2 == "DE"
+
+    page = [record.swift_code for record in snapshot.by_country("PL", after="BANKPLPWAAA", limit=2)]
+    assert page == ["BANKPLPWKRK", "BANKPLPWXXX"]
+
+
+def test_snapshot_discard_and_replace():
+    """
+    Test that discard removes a code from every index and that re-adding
+    a code replaces the previous record instead of duplicating it.
+    """
+    snapshot = SwiftCodeSnapshot()
+    snapshot.add(make_code("BANKPLPWXXX"))
+    snapshot.add(make_code("BANKPLPWKRK"))
+    snapshot.add(make_code("BANKPLPWKRK", "DE"))
+
+    assert [record.swift_code for record in snapshot.by_country("PL")] == ["BANKPLPWXXX"]
+    assert [record.swift_code for record in snapshot.by_country("DE")] == ["BANKPLPWKRK"]
+
+    snapshot.discard("BANKPLPWKRK")
+    snapshot.discard("MISSINGCODE")
+
+    assert snapshot.get("BANKPLPWKRK") is None
+    assert snapshot.branches("BANKPLPWXXX") == []
+    assert snapshot.by_country("DE") == []
+
+
+def write_file(path, codes, version=1) -> None:
+    write_snapshot_file(
+        str(path),
+        [SwiftCodeRecord.from_model(make_code(code, code[4:6])) for code in codes],
+        version
+    )
+
+
+def test_mapped_file_matches_in_memory_snapshot(tmp_path):
+    """
+    Test that a snapshot file answers lookups, HQ expansion and country pages
+    exactly like the in-memory snapshot holding the same records.
+    """
+    codes = ["BANKPLPWXXX", "BANKPLPWKRK", "BANKPLPWAAA", "BANKPLPXXXX", "OTHRDEFFXXX", "OTHRDEFF123"]
+    in_memory = SwiftCodeSnapshot()
+    for code in codes:
+        in_memory.add(make_code(code, code[4:6]))
+    write_file(tmp_path / "codes.snap", codes, version=7)
+
+    mapped = SwiftCodeSnapshot()
+    assert mapped.map_file(str(tmp_path / "codes.snap")) == len(codes)
+    assert mapped.version == 7
+
+    for code in codes + ["MISSINGCODE", "BANKPLPW"]:
+        assert mapped.get(code.lower()) == in_memory.get(code)
+        assert mapped.branches(code) == in_memory.branches(code)
+    for country, after, limit in [("pl", None, None), ("PL", "BANKPLPWAAA", 2), ("DE", None, 1), ("FR", None, None)]:
+        assert mapped.by_country(country, after, limit) == in_memory.by_country(country, after, limit)
+
+
+def test_mapped_file_round_trips_8_character_codes(tmp_path):
+    """
+    Test that 8-character codes (valid BICs, padded in the file) are written, found and ordered like the others.
+    """
+    codes = ["BANKPLPW", "BANKPLPWXXX", "BANKPLPWKRK", "BANKPLPA", "OTHRDEFF"]
+    in_memory = SwiftCodeSnapshot()
+    for code in codes:
+        in_memory.add(make_code(code, code[4:6]))
+    write_file(tmp_path / "codes.snap", codes)
+
+    mapped = SwiftCodeSnapshot()
+    assert mapped.map_file(str(tmp_path / "codes.snap")) == len(codes)
+
+    assert mapped.get("BANKPLPW").swift_code == "BANKPLPW"
+    assert mapped.get("BANKPLP") is None
+    for code in codes:
+        assert mapped.get(code) == in_memory.get(code)
+        assert mapped.branches(code) == in_memory.branches(code)
+    for country, after, limit in [("PL", None, None), ("PL", "BANKPLPW", 2), ("DE", None, None)]:
+        assert mapped.by_country(country, after, limit) == in_memory.by_country(country, after, limit)
+
+
+def test_mapped_file_overlays_local_writes_until_a_newer_file(tmp_path):
+    """
+    Test that writes of the process are served on top of the file,
+    and that a newer file renamed over it replaces file and writes.
+    """
+    path = tmp_path / "codes.snap"
+    write_file(path, ["BANKPLPWXXX", "BANKPLPWKRK"])
+    snapshot = SwiftCodeSnapshot()
+    snapshot.map_file(str(path), check_interval=0)
+
+    snapshot.discard("BANKPLPWKRK")
+    snapshot.add(make_code("BANKPLPWAAA"))
+    snapshot.version = 2
+
+    assert snapshot.get("BANKPLPWKRK") is None
+    assert [record.swift_code for record in snapshot.branches("BANKPLPWXXX")] == ["BANKPLPWAAA"]
+    assert [record.swift_code for record in snapshot.by_country("PL")] == ["BANKPLPWAAA", "BANKPLPWXXX"]
+
+    # Exported by another process after these writes
+    write_file(path, ["BANKPLPWXXX", "BANKPLPWAAA", "OTHRDEFFXXX"], version=3)
+
+    assert snapshot.version == 3
+    assert [record.swift_code for record in snapshot.by_country("PL")] == ["BANKPLPWAAA", "BANKPLPWXXX"]
+    assert snapshot.get("OTHRDEFFXXX").country_iso2 == "DE"
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.ingestion.sources import SourceConflictError, SourceUnit, expand_sources, parse_sources
+from app.ingestion.validate_data import DataValidationError
+
+COLUMNS = ["SWIFT CODE", "NAME", "ADDRESS", "TOWN NAME", "COUNTRY ISO2 CODE", "COUNTRY NAME"]
+
+
+def write_workbook(path, sheets: dict) -> None:
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for name, rows in sheets.items():
+            pd.DataFrame(rows, columns=COLUMNS).to_excel(writer, sheet_name=name, index=False)
+
+
+@pytest.fixture
+def regions(tmp_path, monkeypatch):
+    """
+    A regional workbook with two sheets, a second workbook and a CSV delta changing one of their codes.
+    """
+    monkeypatch.setattr(settings, "PARSE_CACHE_DIR", str(tmp_path / "cache"))
+    write_workbook(tmp_path / "europe.xlsx", {
+        "PL": [["ABCDPLPWXXX", "POLISH BANK", "STREET 1", "WARSAW", "PL", "POLAND"]],
+        "DE": [["ABCDDEFFXXX", "GERMAN BANK", None, "FRANKFURT", "DE", "GERMANY"]],
+    })
+    write_workbook(tmp_path / "latam.xlsx", {
+        "CL": [
+            ["ABCDCLRMXXX", "CHILEAN BANK", None, "SANTIAGO", "CL", "CHILE"],
+            # Also in the PL sheet, with identical values
+            ["ABCDPLPWXXX", "POLISH BANK", "STREET 1", "WARSAW", "PL", "POLAND"],
+        ],
+    })
+    (tmp_path / "delta.csv").write_text(
+        ",".join(COLUMNS) + "\nABCDDEFFXXX,RENAMED GERMAN BANK,,FRANKFURT,DE,GERMANY\n"
+    )
+    return tmp_path
+
+
+def test_expand_sources_lists_every_sheet_in_order(regions):
+    units = expand_sources(f"{regions}/*.xlsx, {regions}/delta.csv")
+
+    assert units == [
+        SourceUnit(f"{regions}/europe.xlsx", "xlsx", "PL"),
+        SourceUnit(f"{regions}/europe.xlsx", "xlsx", "DE"),
+        SourceUnit(f"{regions}/latam.xlsx", "xlsx", "CL"),
+        SourceUnit(f"{regions}/delta.csv", "csv"),
+    ]
+
+    with pytest.raises(ValueError, match="No source file matches"):
+        expand_sources(f"{regions}/*.ods")
+
+
+@pytest.mark.parametrize("workers, engine", [(1, "openpyxl"), (2, "calamine")])
+def test_parse_sources_merges_with_later_sources_winning(regions, monkeypatch, workers, engine):
+    monkeypatch.setattr(settings, "XLSX_ENGINE", engine)
+    monkeypatch.setattr(settings, "INGEST_CONFLICTS", "last")
+
+    records = parse_sources(f"{regions}/*.xlsx,{regions}/delta.csv", workers)
+
+    assert sorted(records) == [
+        ("ABCDCLRMXXX", "CHILEAN BANK", None, "CL", "CHILE", True, "SANTIAGO"),
+        ("ABCDDEFFXXX", "RENAMED GERMAN BANK", None, "DE", "GERMANY", True, "FRANKFURT"),
+        ("ABCDPLPWXXX", "POLISH BANK", "STREET 1", "PL", "POLAND", True, "WARSAW"),
+    ]
+
+
+def test_parse_sources_reports_conflicts(regions):
+    with pytest.raises(SourceConflictError) as exc_info:
+        parse_sources(f"{regions}/*.xlsx,{regions}/delta.csv", 1)
+
+    assert exc_info.value.conflicts == [("ABCDDEFFXXX", f"{regions}/europe.xlsx[DE]", f"{regions}/delta.csv")]
+
+
+def test_parse_sources_names_the_source_of_invalid_rows(regions):
+    (regions / "bad.csv").write_text(",".join(COLUMNS) + "\nABCDDEFFXXX,BANK,,TOWN,PL,POLAND\n")
+
+    with pytest.raises(DataValidationError, match=r"bad\.csv row 0: 'swift_code' characters 5-6"):
+        parse_sources(f"{regions}/europe.xlsx,{regions}/bad.csv", 1)
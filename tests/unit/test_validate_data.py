@@ -1,12 +1,13 @@
 import pandas as pd
-from app.ingestion.validate_data import validate_data
+import pytest
+from app.ingestion.validate_data import DataValidationError, validate_data, validate_frame
 
 def test_validate_data_valid():
     """
     Test that valid data is returned unchanged (except for cleaning).
     """
     df = pd.DataFrame({
-        "swift_code": ["ABC12345XYZ", "DEF67890UVW"],
+        "swift_code": ["ABCDUS33XYZ", "DEFGCAT1UVW"],
         "bank_name": ["  Test Bank  ", "Another Bank"],
         "country_iso2": ["us", "ca"],
         "country_name": [" United States ", "Canada"]
@@ -15,10 +16,54 @@ def test_validate_data_valid():
     validated_df = validate_data(df)
     
     expected_df = pd.DataFrame({
-        "swift_code": ["ABC12345XYZ", "DEF67890UVW"],
+        "swift_code": ["ABCDUS33XYZ", "DEFGCAT1UVW"],
         "bank_name": ["Test Bank", "Another Bank"],
         "country_iso2": ["US", "CA"],
         "country_name": ["United States", "Canada"]
     })
 
-    pd.testing.assert_frame_equal(validated_df, expected_df)
\ No newline at end of file
+    pd.testing.assert_frame_equal(validated_df, expected_df)
+
+
+def invalid_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "swift_code": ["ABCDUS33XXX", "abcdus3", "ABCDDE33XXX", "AB-DUS33XXX"],
+        "bank_name": ["Test Bank", "Short Code Bank", "  ", "Dash Bank"],
+        "country_iso2": ["US", "US", "US", "US"],
+        "country_name": ["United States", None, "United States", "United States"]
+    })
+
+
+def test_validate_data_structured_errors():
+    """
+    Test that every failed rule is reported as a (row, column, rule) entry.
+    """
+    with pytest.raises(DataValidationError) as exc_info:
+        validate_data(invalid_df())
+
+    errors = exc_info.value.errors
+    assert list(errors.itertuples(index=False, name=None)) == [
+        (1, "country_name", "empty"),
+        (1, "swift_code", "length"),
+        (2, "bank_name", "empty"),
+        (2, "swift_code", "country_mismatch"),
+        (3, "swift_code", "format"),
+    ]
+    assert "Row 2: 'swift_code' characters 5-6 must match 'country_iso2'" in str(exc_info.value)
+
+
+def test_validate_data_quarantine():
+    """
+    Test that quarantine mode keeps the valid rows and reports the rejected ones.
+    """
+    assert validate_data(invalid_df(), quarantine=True)["swift_code"].tolist() == ["ABCDUS33XXX"]
+
+    result = validate_frame(invalid_df())
+    assert result.quarantined.index.tolist() == [1, 2, 3]
+    assert result.quarantined.loc[1, "swift_code"] == "ABCDUS3"
+    assert result.quarantined.loc[1, "errors"] == "country_name:empty; swift_code:length"
+
+
+def test_validate_data_missing_column():
+    with pytest.raises(ValueError, match="Missing required column: country_name"):
+        validate_data(invalid_df().drop(columns="country_name"))
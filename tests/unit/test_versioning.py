@@ -0,0 +1,15 @@
+from app.services.versioning import etag_matches, make_etag
+
+
+def test_etag_matches():
+    etag = make_etag(7)
+    assert etag == '"v7"'
+
+    assert etag_matches('"v7"', etag)
+    assert etag_matches('W/"v7"', etag)
+    assert etag_matches('"v6", "v7"', etag)
+    assert etag_matches("*", etag)
+
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"v6"', etag)
+    assert not etag_matches('"v70"', etag)